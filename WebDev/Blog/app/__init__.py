@@ -10,14 +10,15 @@ import logging
 from pathlib import Path
 
 import sentry_sdk
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g
 from flask_login import current_user
-from flask_wtf.csrf import CSRFError, generate_csrf
+from flask_login.config import COOKIE_NAME as REMEMBER_COOKIE_NAME
+from flask_wtf.csrf import CSRFError
 from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime, timezone
 
 from app.extensions import db, migrate, login_manager, csrf, cache, limiter, mail, compress
-from app.helpers import markdown_safe, render_body, strip_gallery_tokens, post_excerpt
+from app.helpers import markdown_safe, render_body, strip_gallery_tokens, post_excerpt, get_markdown_renderer, LazyCsrfToken
 
 
 def create_app(config_filename='config.py'):
@@ -35,6 +36,8 @@ def create_app(config_filename='config.py'):
     # Load configuration
     config_path = os.path.join(project_root, config_filename)
     app.config.from_pyfile(config_path)
+    # Fail at startup on a mistyped MARKDOWN_BACKEND, not on the first page render.
+    get_markdown_renderer(app.config.get('MARKDOWN_BACKEND'))
 
     # --- Sentry Error Monitoring ---
     sentry_dsn = os.environ.get('SENTRY_DSN', '').strip()
@@ -63,6 +66,12 @@ def create_app(config_filename='config.py'):
     mail.init_app(app)
     compress.init_app(app)
 
+    from app.utils.purge import init_purge_backend
+    init_purge_backend(app)
+
+    from app import metrics
+    metrics.init_app(app)
+
     # --- Upload folder config ---
     upload_folder = os.path.join(app.static_folder, 'images')
     app.config['UPLOAD_FOLDER'] = upload_folder
@@ -114,21 +123,23 @@ def create_app(config_filename='config.py'):
     from app.utils.image_utils import USING_SPACES, SPACES_URL, get_srcset, get_picture_data
     from app.utils.minify_utils import asset_url
 
+    # A global rather than a context-processor value so imported macros
+    # (_responsive_image.html, _gallery_figure.html) can call it too.
+    app.jinja_env.globals["get_picture_data"] = get_picture_data
+
     @app.context_processor
     def inject_now():
         return {'datetime': datetime, 'timezone': timezone, 'current_user': current_user}
 
     @app.context_processor
     def inject_csrf_token():
-        token = generate_csrf()
-        return dict(csrf_token=token)
+        return dict(csrf_token=LazyCsrfToken())
 
     @app.context_processor
     def optimization_utils():
         return dict(
             asset_url=asset_url,
             get_srcset=get_srcset,
-            get_picture_data=get_picture_data,
             USING_SPACES=USING_SPACES,
             SPACES_URL=SPACES_URL
         )
@@ -153,11 +164,55 @@ def create_app(config_filename='config.py'):
             "Tag": Tag
         }
 
+    # --- Anonymous fast path ---
+    # A GET without a session or remember-me cookie comes from a logged-out
+    # reader. It is answered without loading or writing the session, so the
+    # response sets no cookie and can be marked public for proxies and CDNs.
+    # Forms on such pages fetch their CSRF token lazily (static/js/csrf.js).
+    session_cookie = app.config['SESSION_COOKIE_NAME']
+    remember_cookie = app.config.get('REMEMBER_COOKIE_NAME', REMEMBER_COOKIE_NAME)
+
+    def is_anonymous_read():
+        return (app.config.get('ANONYMOUS_FAST_PATH', True)
+                and request.method in ('GET', 'HEAD')
+                and session_cookie not in request.cookies
+                and remember_cookie not in request.cookies)
+
     # --- Before Request ---
     @app.before_request
     def make_session_permanent():
+        if is_anonymous_read():
+            g.anonymous_read = True
+            # Flask-Login reads g._login_user before touching the session.
+            g._login_user = login_manager.anonymous_user()
+            return
         session.permanent = True
 
+    from app.caching import EDGE_TTL_HEADERS
+
+    @app.after_request
+    def mark_anonymous_response_public(response):
+        cache_control = response.cache_control
+        if (g.get('anonymous_read') and response.status_code in (200, 304)
+                and not session.modified and 'Set-Cookie' not in response.headers
+                and not (cache_control.private or cache_control.no_store)):
+            cache_control.public = True
+            # Browsers revalidate, unless the view set a lifetime. A CDN keeps
+            # cached_view pages for the edge lifetime they carry (app.caching).
+            if cache_control.max_age is None and not cache_control.no_cache:
+                cache_control.no_cache = True
+            # Logged-in visitors send a cookie and must never get this copy.
+            response.vary.add('Cookie')
+        else:
+            # Only an anonymous, cookie-free response may be kept at the edge.
+            for name in EDGE_TTL_HEADERS:
+                response.headers.pop(name, None)
+        return response
+
+    # --- Cache warm-up: remember which detail pages visitors read ---
+    from app.warmup import track_detail_visits
+    app.after_request(track_detail_visits)
+
     # --- Error Handlers ---
     @app.errorhandler(404)
     def page_not_found(e):
@@ -190,23 +245,27 @@ def create_app(config_filename='config.py'):
         return render_template('500.html'), 429
 
     # --- Security Headers ---
+    # Built once at startup rather than on every response.
+    csp_directives = {
+        'default-src': "'self'",
+        'script-src': "'self' 'unsafe-inline' https://sdk.scdn.co https://cdn.jsdelivr.net",
+        'style-src': "'self' 'unsafe-inline' https://cdnjs.cloudflare.com https://fonts.googleapis.com https://cdn.jsdelivr.net",
+        'font-src': "'self' https://fonts.gstatic.com https://cdnjs.cloudflare.com",
+        'img-src': "'self' data: https://*.digitaloceanspaces.com https://i.scdn.co",
+        'connect-src': "'self' https://*.spotify.com wss://*.spotify.com https://accounts.spotify.com",
+        'media-src': "'self'",
+        'frame-src': "https://www.youtube.com https://www.youtube-nocookie.com https://player.vimeo.com https://open.spotify.com https://sdk.scdn.co",
+    }
+    security_headers = {
+        'Content-Security-Policy': '; '.join(f"{k} {v}" for k, v in csp_directives.items()),
+        'X-Content-Type-Options': 'nosniff',
+        'X-Frame-Options': 'SAMEORIGIN',
+        'Referrer-Policy': 'strict-origin-when-cross-origin',
+    }
+
     @app.after_request
     def set_security_headers(response):
-        csp_directives = {
-            'default-src': "'self'",
-            'script-src': "'self' 'unsafe-inline' https://sdk.scdn.co https://cdn.jsdelivr.net",
-            'style-src': "'self' 'unsafe-inline' https://cdnjs.cloudflare.com https://fonts.googleapis.com https://cdn.jsdelivr.net",
-            'font-src': "'self' https://fonts.gstatic.com https://cdnjs.cloudflare.com",
-            'img-src': "'self' data: https://*.digitaloceanspaces.com https://i.scdn.co",
-            'connect-src': "'self' https://*.spotify.com wss://*.spotify.com https://accounts.spotify.com",
-            'media-src': "'self'",
-            'frame-src': "https://www.youtube.com https://www.youtube-nocookie.com https://player.vimeo.com https://open.spotify.com https://sdk.scdn.co",
-        }
-        csp = '; '.join(f"{k} {v}" for k, v in csp_directives.items())
-        response.headers['Content-Security-Policy'] = csp
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'SAMEORIGIN'
-        response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
+        response.headers.update(security_headers)
         return response
 
     # --- CLI Commands ---
@@ -260,4 +319,35 @@ def create_app(config_filename='config.py'):
         for u in users:
             click.echo(f'  ID: {u.id}  Username: {u.username}')
 
+    @app.cli.group()
+    def content():
+        """Content maintenance commands."""
+        pass
+
+    @content.command('prerender')
+    def prerender_content():
+        """Backfill stored body HTML and excerpts for posts and projects.  Usage: flask content prerender"""
+        from app.models import Post, Project
+        from app.helpers import prerender_body
+        rendered = 0
+        for model in (Post, Project):
+            for item in model.query.options(db.undefer(model.body_html)).all():
+                if prerender_body(item):
+                    rendered += 1
+        db.session.commit()
+        click.echo(f'Rendered {rendered} item(s); the rest were already current.')
+
+    @content.command('warm')
+    @click.option('--base-url', help='Public site URL to render for (default: CACHE_WARMUP_BASE_URL).')
+    def warm_content(base_url):
+        """Render the public pages into the cache once.  Usage: flask content warm"""
+        from app.warmup import CacheWarmer
+        report = CacheWarmer(app, base_url=base_url).warm()
+        if report is None:
+            click.echo('Error: pass --base-url or set CACHE_WARMUP_BASE_URL.')
+            return
+        for path, status, ms in report['pages']:
+            click.echo(f'  {status or "ERR":>4}  {ms:8.1f} ms  {path}')
+        click.echo(f'Warmed {len(report["pages"])} page(s) in {report["total_ms"]:.0f} ms.')
+
     return app
@@ -0,0 +1,577 @@
+"""
+Dependency-tracked view caching.
+
+Cached views declare the content they show as tags:
+
+    'post'              any post, whatever its type
+    'post:<type>'       posts of one polymorphic type ('post:music_item', ...)
+    'project', 'photo', 'tag'
+    'post/{post_id}'    one row; {placeholders} are filled from the view arguments
+
+When a response is stored its cache key is recorded under each tag. SQLAlchemy
+session hooks turn the rows changed by a flush into the same tags, and once the
+transaction commits only the keys registered under those tags are evicted, so
+editing one review no longer clears the project or photo pages.
+
+Entries that list posts ('post', 'post:<type>') expire no later than the
+next scheduled published_at of a post they would show, so a scheduled post
+appears on time; app.publish_scheduler also evicts, purges and re-warms those
+pages at that instant.
+
+Stored responses also carry their tags in Surrogate-Key and Cache-Tag
+headers and their cache lifetime in Surrogate-Control and CDN-Cache-Control,
+so a CDN in front of the app keeps them as long as this cache does. Evicted
+tags are purged from it through app.utils.purge.
+
+The tag registry lives in the cache backend next to the responses it points
+at, under TAG_KEY_PREFIX. Each registry entry maps a response key to its
+expiry time and outlives the longest-lived key it lists. A registry entry
+must not be evicted before the responses it lists, so the bounded in-process
+backend (app.utils.memory_cache) keeps it, and the render claims, outside
+its byte budget.
+"""
+import os
+import gzip
+import math
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from hashlib import md5
+
+import sqlalchemy as sa
+from blinker import Namespace
+from flask import request, session, make_response, has_app_context, current_app, g
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import HTTPException
+
+from app import metrics
+from app.extensions import cache
+from app.conditional import (conditional_view, content_validators, _as_utc, _is_conditional,
+                             _not_modified, _set_validators)
+from app.utils.single_flight import SingleFlight
+from app.utils.purge import purge_backend
+
+VIEW_KEY_PREFIX = 'view/'
+TAG_KEY_PREFIX = 'tags/'
+REFRESH_KEY_PREFIX = 'refreshing/'
+PUBLISH_SCHEDULE_KEY = 'schedule/next-publish'
+COMPUTING_KEY_PREFIX = 'computing/'
+# Seconds a request waits for another thread or worker to render the same
+# page before rendering it itself, and how often a worker checks.
+SINGLE_FLIGHT_WAIT = 5.0
+SINGLE_FLIGHT_POLL = 0.05
+# Bodies at least this large are stored gzip-compressed, at this level.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 6
+# Seconds a worker's claim on a background refresh lasts if it never finishes.
+REFRESH_CLAIM_TIMEOUT = 60
+# Seconds the next scheduled publish times are cached. Commits in this worker
+# drop them at once; this bounds how long another worker's commit goes unseen.
+PUBLISH_SCHEDULE_RECHECK = 60
+# A tag's registry is checked for responses already evicted (for space) once
+# it lists more than this many; otherwise it only drops expired ones.
+REGISTRY_PRUNE_SIZE = 256
+# Session.info key holding the tags collected from flushes until commit.
+_PENDING_TAGS = 'cache_tags'
+# Headers that belong to one client's response and are never replayed.
+_UNCACHED_HEADERS = {'set-cookie'}
+# How long a CDN may keep a response. Fastly, Akamai and Varnish read
+# Surrogate-Control, Cloudflare reads CDN-Cache-Control (RFC 9213); browsers
+# ignore both and keep revalidating through `Cache-Control: no-cache`.
+EDGE_TTL_HEADERS = ('Surrogate-Control', 'CDN-Cache-Control')
+
+_registry_lock = threading.Lock()
+
+# Sent with the evicted tags after a commit has invalidated cached views.
+content_changed = Namespace().signal('content-changed')
+
+
+def _registry_guard():
+    """Lock for registry read-modify-write cycles.
+
+    Backends shared between processes (app.utils.shared_cache) provide a
+    cross-process lock(); in-process backends only need the thread lock.
+    """
+    backend_lock = getattr(cache.cache, 'lock', None)
+    return backend_lock() if backend_lock is not None else _registry_lock
+
+
+def _view_cache_key(query_string):
+    key = VIEW_KEY_PREFIX + request.path
+    if query_string:
+        args = sorted(request.args.items(multi=True))
+        key += '?' + md5(repr(args).encode('utf-8')).hexdigest()
+    return key
+
+
+def _endpoint_for_key(key):
+    """Endpoint that serves the response cached under view key `key`."""
+    path = key[len(VIEW_KEY_PREFIX):].split('?', 1)[0].split('@', 1)[0]
+    try:
+        return current_app.url_map.bind('localhost').match(path)[0]
+    except HTTPException:
+        return 'unmatched'
+
+
+def _register(key, tags, timeout):
+    """Record `key` under every tag in `tags` until it expires."""
+    now = time.time()
+    expires = now + timeout if timeout else now + 365 * 24 * 3600
+    with _registry_guard():
+        for tag in tags:
+            registry_key = TAG_KEY_PREFIX + tag
+            keys = cache.get(registry_key) or {}
+            keys = {k: exp for k, exp in keys.items() if exp > now}
+            if len(keys) > REGISTRY_PRUNE_SIZE:
+                # Every distinct query string adds a key; keep only those still cached.
+                keys = {k: exp for k, exp in keys.items() if cache.has(k)}
+            keys[key] = expires
+            cache.set(registry_key, keys, timeout=int(max(keys.values()) - now) + 1)
+
+
+def invalidate_tags(tags):
+    """Evict every cached response registered under any of `tags`."""
+    with _registry_guard():
+        registry_keys = [TAG_KEY_PREFIX + tag for tag in tags]
+        keys = set()
+        for registry_key in registry_keys:
+            keys.update(cache.get(registry_key) or ())
+        # Not delete_many(): BaseCache stops at the first key that is already
+        # gone unless CACHE_IGNORE_ERRORS is set.
+        for key in keys:
+            if cache.delete(key):
+                metrics.inc('view_cache_evictions_total', endpoint=_endpoint_for_key(key))
+        for registry_key in registry_keys:
+            cache.delete(registry_key)
+    if any(tag.partition('/')[0].partition(':')[0] == 'post' for tag in tags):
+        # A post may have been scheduled, rescheduled or published.
+        cache.delete(PUBLISH_SCHEDULE_KEY)
+    # After the origin copies are gone, so the CDN cannot refetch a stale one.
+    purge_backend().purge(tags)
+    return keys
+
+
+def _with_bulk_tags(tags):
+    """Add '<kind>/*' for each per-row tag: bulk updates change rows without
+    telling us which ones, so they evict the wildcard instead."""
+    return tags | {tag.split('/', 1)[0] + '/*' for tag in tags if '/' in tag}
+
+
+def _render_and_store(view, kwargs, key, depends_on, ttl, validators=None):
+    """Run the view and cache a 200 response under `key` and its tags.
+
+    The response is stored with its (etag, last_modified) `validators`. When
+    the caller has none they are read before the view runs, so an edit made
+    during the render leaves the ETag older than the body, never newer.
+    """
+    tags = {tag.format(**kwargs) for tag in depends_on}
+    if validators is None:
+        validators = content_validators(tags)
+    response = make_response(view(**kwargs))
+    if response.status_code != 200 or response.is_streamed:
+        return response
+
+    _set_validators(response, *validators)
+    tags = _with_bulk_tags(tags)
+    ttl = _cap_at_next_publish(ttl, tags)
+    _set_surrogate_keys(response, tags | _with_bulk_tags(g.get('surrogate_keys', set())))
+    _set_edge_ttl(response, ttl)
+
+    headers = [(name, value) for name, value in response.headers.items()
+               if name.lower() not in _UNCACHED_HEADERS]
+    body, encoding = response.get_data(), None
+    if (len(body) >= COMPRESS_MIN_BYTES and 'Content-Encoding' not in response.headers
+            and response.mimetype in current_app.config.get('COMPRESS_MIMETYPES', ())):
+        body, encoding = gzip.compress(body, compresslevel=COMPRESS_LEVEL), 'gzip'
+    cache.set(key, (body, response.status_code, headers, time.time(), encoding, validators[0]), timeout=ttl)
+    _register(key, tags, ttl)
+    return response
+
+
+def add_surrogate_keys(*keys):
+    """Name more content the current page shows, beyond its cached_view tags.
+
+    For rows that reach the page without being one of its tags, such as a
+    post's cover photo: a CDN copy is then purged when they change, too.
+    """
+    g.setdefault('surrogate_keys', set()).update(keys)
+
+
+def _set_surrogate_keys(response, keys):
+    """Label a cacheable response with its tags for CDN purging (app.utils.purge)."""
+    keys = sorted(keys)
+    # Fastly and others read Surrogate-Key, Cloudflare reads Cache-Tag.
+    response.headers['Surrogate-Key'] = ' '.join(keys)
+    response.headers['Cache-Tag'] = ','.join(keys)
+
+
+def _set_edge_ttl(response, ttl):
+    """Let a CDN keep the response for `ttl` seconds; purging evicts it sooner."""
+    for name in EDGE_TTL_HEADERS:
+        if ttl:
+            response.headers[name] = f'max-age={int(ttl)}'
+        else:
+            response.headers.pop(name, None)
+
+
+def _response_from(entry):
+    """Build a response from a stored (body, status, headers, stored_at, encoding, etag) entry.
+
+    The stored headers carry the ETag and Last-Modified the body was rendered
+    with. A gzip-compressed body goes out as-is to clients that accept gzip
+    (Flask-Compress leaves responses with a Content-Encoding alone) and is
+    decompressed for the rest.
+    """
+    body, status, headers, stored_at, *rest = entry
+    # Entries stored before bodies were compressed have no encoding field.
+    encoding = rest[0] if rest else None
+    gzipped = encoding == 'gzip' and request.accept_encodings['gzip']
+    if encoding == 'gzip' and not gzipped:
+        body = gzip.decompress(body)
+    response = current_app.response_class(body, status=status, headers=headers)
+    if gzipped:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+    # A CDN counts the time spent here against the stored edge lifetime.
+    response.headers['Age'] = str(max(0, int(time.time() - stored_at)))
+    return response
+
+
+# ──────────────────────────────────────────────
+#  Single-flight misses
+# ──────────────────────────────────────────────
+
+# Coalesces concurrent misses between threads of this worker.
+_view_flight = SingleFlight(wait_timeout=SINGLE_FLIGHT_WAIT)
+_cross_worker = {'coalesced': 0, 'timed_out': 0}
+_cross_worker_lock = threading.Lock()
+
+
+def _count_cross_worker(outcome):
+    with _cross_worker_lock:
+        _cross_worker[outcome] += 1
+
+
+def _render_once(view, kwargs, key, depends_on, ttl, validators=None):
+    """Render `key` unless another worker sharing the cache backend already is.
+
+    A claim key added to the cache marks the render in progress; other workers
+    poll for its result for up to SINGLE_FLIGHT_WAIT seconds and render it
+    themselves only if it does not appear. With an in-process backend the
+    claim always succeeds, and the thread-level single-flight does the work.
+    """
+    claim = COMPUTING_KEY_PREFIX + key
+    if cache.add(claim, os.getpid(), timeout=int(SINGLE_FLIGHT_WAIT) + 1):
+        try:
+            return _render_and_store(view, kwargs, key, depends_on, ttl, validators)
+        finally:
+            cache.delete(claim)
+
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL)
+        hit = cache.get(key)
+        if hit is not None:
+            _count_cross_worker('coalesced')
+            return _response_from(hit)
+        if cache.get(claim) is None:
+            break
+    _count_cross_worker('timed_out')
+    return _render_and_store(view, kwargs, key, depends_on, ttl, validators)
+
+
+def single_flight_stats():
+    """How many view renders and helper computations were coalesced.
+
+    'views' covers threads of this worker; 'views_cross_worker' counts misses
+    served from another worker's render through a shared backend.
+    """
+    from app.helpers import _markdown_block_cache, _highlight_cache
+
+    with _cross_worker_lock:
+        cross_worker = dict(_cross_worker)
+    return {
+        'views': _view_flight.stats(),
+        'views_cross_worker': cross_worker,
+        'markdown_blocks': {'coalesced': _markdown_block_cache.stats()['coalesced']},
+        'highlight': {'coalesced': _highlight_cache.stats()['coalesced']},
+    }
+
+
+# ──────────────────────────────────────────────
+#  Background refresh (stale-while-revalidate)
+# ──────────────────────────────────────────────
+
+_refresh_queue = queue.Queue()
+_refreshing = set()
+_refresh_lock = threading.Lock()
+_refresh_thread = None
+
+
+def _refresh_worker():
+    while True:
+        key, job = _refresh_queue.get()
+        try:
+            job()
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+
+def _schedule_refresh(view, kwargs, key, depends_on, ttl):
+    """Queue one background re-render of `key`, unless one is already pending.
+
+    The claim key in the cache stops other workers sharing the backend from
+    refreshing the same page at the same time.
+    """
+    global _refresh_thread
+
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        claim = REFRESH_KEY_PREFIX + key
+        if not cache.add(claim, os.getpid(), timeout=REFRESH_CLAIM_TIMEOUT):
+            return
+        _refreshing.add(key)
+        # Also after a fork: the child inherits the Thread object, not the thread.
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_worker, name='view-cache-refresh', daemon=True)
+            _refresh_thread.start()
+
+    app = current_app._get_current_object()
+    path, query_string, base_url = request.path, request.query_string, request.host_url
+
+    def job():
+        with app.test_request_context(path, base_url=base_url, query_string=query_string):
+            try:
+                _render_and_store(view, kwargs, key, depends_on, ttl)
+            except Exception:
+                app.logger.exception(f"Background refresh of {path} failed")
+            finally:
+                cache.delete(claim)
+
+    _refresh_queue.put((key, job))
+
+
+def cached_view(*depends_on, timeout=None, soft_timeout=None, query_string=False, versioned=False):
+    """Cache a GET view's response, evicted when the content it depends on changes.
+
+    `depends_on` are the tags described in the module docstring. Only 200
+    responses are stored; the timeout still applies as an upper bound. The
+    same tags drive conditional GET (app.conditional): each stored response
+    keeps the ETag it was rendered with, and the validator query only runs
+    for requests that send If-None-Match or If-Modified-Since. A hit whose
+    ETag no longer matches the content is served once more and re-rendered in
+    the background. Pages for a logged-in user carry admin controls, and
+    pending flash messages are consumed by rendering, so neither is served
+    from or stored in the cache.
+
+    With `versioned`, the key also carries the content's ETag, which hashes
+    the updated_at columns behind `depends_on`. Detail pages use it: a new
+    version is a new key, so no worker can serve a copy older than the row,
+    even one whose in-process cache never saw the eviction. That costs the
+    validator query on every request.
+
+    With `soft_timeout` (stale-while-revalidate), an entry older than
+    `soft_timeout` seconds is still served straight away while a background
+    thread re-renders it; only once `timeout` (the hard TTL) has passed does a
+    reader wait for a render.
+    """
+    def decorator(view):
+        validated_view = conditional_view(*depends_on)(view)
+
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                metrics.inc('view_cache_requests_total', endpoint=request.endpoint, result='bypass')
+                return view(*args, **kwargs)
+            if current_user.is_authenticated:
+                metrics.inc('view_cache_requests_total', endpoint=request.endpoint, result='bypass')
+                return validated_view(*args, **kwargs)
+
+            validators = None
+            if versioned or _is_conditional():
+                validators = content_validators({tag.format(**kwargs) for tag in depends_on})
+                if _not_modified(*validators):
+                    return _set_validators(current_app.response_class(status=304), *validators)
+
+            key = _view_cache_key(query_string)
+            if versioned:
+                key += '@' + validators[0]
+            ttl = timeout if timeout is not None else current_app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+            hit = cache.get(key)
+            if hit is not None:
+                result = 'hit'
+                # Entries stored before ETags were kept have no etag field.
+                stored_etag = hit[5] if len(hit) > 5 else None
+                if ((validators is not None and stored_etag != validators[0])
+                        or (soft_timeout is not None and time.time() - hit[3] > soft_timeout)):
+                    result = 'stale'
+                    _schedule_refresh(view, kwargs, key, depends_on, ttl)
+                metrics.inc('view_cache_requests_total', endpoint=request.endpoint, result=result)
+                response = _response_from(hit)
+                if result == 'stale':
+                    # Being replaced here, so a CDN must not keep it either.
+                    _set_edge_ttl(response, None)
+                return response
+
+            metrics.inc('view_cache_requests_total', endpoint=request.endpoint, result='miss')
+            response, shared = _view_flight.do(
+                key, lambda: _render_once(view, kwargs, key, depends_on, ttl, validators)
+            )
+            if not shared:
+                return response
+            # Another thread rendered it: serve its cached copy, not its Response.
+            hit = cache.get(key)
+            if hit is not None:
+                return _response_from(hit)
+            return _render_and_store(view, kwargs, key, depends_on, ttl, validators)
+        return decorated
+    return decorator
+
+
+# ──────────────────────────────────────────────
+#  Scheduled publishing
+# ──────────────────────────────────────────────
+
+def next_publish_times():
+    """Map each post type to the epoch time its next scheduled post goes live."""
+    from app.extensions import db
+    from app.models import Post
+
+    schedule = cache.get(PUBLISH_SCHEDULE_KEY)
+    if schedule is not None:
+        return schedule
+    now = datetime.now(timezone.utc)
+    rows = db.session.execute(
+        sa.select(Post.type, sa.func.min(Post.published_at))
+        .where(Post.published_at > now)
+        .group_by(Post.type)
+    ).all()
+    schedule = {post_type: _as_utc(published_at).timestamp() for post_type, published_at in rows}
+    timeout = PUBLISH_SCHEDULE_RECHECK
+    if schedule:
+        # Never outlive the first publish time, or it would be served past it.
+        timeout = max(1, min(timeout, math.ceil(min(schedule.values()) - now.timestamp())))
+    cache.set(PUBLISH_SCHEDULE_KEY, schedule, timeout=timeout)
+    return schedule
+
+
+def _cap_at_next_publish(ttl, tags):
+    """Shorten `ttl` so an entry listing posts expires when the next one it would show goes live."""
+    if 'post' in tags:
+        post_types = None
+    else:
+        post_types = {tag.partition(':')[2] for tag in tags if tag.startswith('post:')}
+        if not post_types:
+            return ttl
+    schedule = next_publish_times()
+    due = [at for post_type, at in schedule.items() if post_types is None or post_type in post_types]
+    if not due:
+        return ttl
+    remaining = max(1, math.ceil(min(due) - time.time()))
+    return min(ttl, remaining) if ttl else remaining
+
+
+# ──────────────────────────────────────────────
+#  Changed rows → tags
+# ──────────────────────────────────────────────
+
+def _post_types():
+    from app.models import Post
+    return list(Post.__mapper__.polymorphic_map)
+
+
+def _history_values(obj, attr):
+    """Current and pre-flush values of a column attribute, ignoring None."""
+    history = sa.inspect(obj).attrs[attr].history
+    values = {*history.added, *history.deleted, *history.unchanged}
+    values.add(getattr(obj, attr, None))
+    values.discard(None)
+    return values
+
+
+def _post_tags(post_type, post_ids):
+    types = [post_type] if post_type else _post_types()
+    return {'post', *(f'post:{t}' for t in types), *(f'post/{i}' for i in post_ids)}
+
+
+def tags_for_row(obj):
+    """Return the cache tags affected by a change to one model instance."""
+    from app.models import Post, Project, Photo, Tag, PostImage, ProjectImage
+
+    if isinstance(obj, Post):
+        tags = _post_tags(sa.inspect(obj).mapper.polymorphic_identity, _history_values(obj, 'id'))
+        # The parent project's page lists its items.
+        return tags | {f'project/{i}' for i in _history_values(obj, 'project_id')}
+    if isinstance(obj, Project):
+        return {'project', *(f'project/{i}' for i in _history_values(obj, 'id'))}
+    if isinstance(obj, Photo):
+        return {'photo', *(f'photo/{i}' for i in _history_values(obj, 'id'))}
+    if isinstance(obj, Tag):
+        return {'tag'}
+    if isinstance(obj, PostImage):
+        # The parent's type is only known without a query if it is loaded.
+        post = sa.inspect(obj).dict.get('post')
+        post_type = sa.inspect(post).mapper.polymorphic_identity if post is not None else None
+        return (_post_tags(post_type, _history_values(obj, 'post_id'))
+                | {'photo', *(f'photo/{i}' for i in _history_values(obj, 'photo_id'))})
+    if isinstance(obj, ProjectImage):
+        return ({'project', *(f'project/{i}' for i in _history_values(obj, 'project_id'))}
+                | {'photo', *(f'photo/{i}' for i in _history_values(obj, 'photo_id'))})
+    return set()
+
+
+def tags_for_mapper(mapper):
+    """Tags for a bulk UPDATE/DELETE on `mapper`, where the rows are unknown."""
+    from app.models import Post, Project, Photo, Tag, PostImage, ProjectImage
+
+    cls = mapper.class_
+    if issubclass(cls, (Post, PostImage)):
+        post_type = mapper.polymorphic_identity if issubclass(cls, Post) and cls is not Post else None
+        tags = _post_tags(post_type, ()) | {'post/*', 'project/*'}
+        return tags | ({'photo', 'photo/*'} if cls is PostImage else set())
+    if issubclass(cls, (Project, ProjectImage)):
+        tags = {'project', 'project/*'}
+        return tags | ({'photo', 'photo/*'} if cls is ProjectImage else set())
+    if issubclass(cls, Photo):
+        return {'photo', 'photo/*'}
+    if issubclass(cls, Tag):
+        return {'tag'}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tags(session, flush_context):
+    """Note which tags this flush touched; they are evicted on commit."""
+    pending = session.info.setdefault(_PENDING_TAGS, set())
+    for obj in [*session.new, *session.deleted]:
+        pending |= tags_for_row(obj)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            pending |= tags_for_row(obj)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tags(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(_PENDING_TAGS, set()).update(tags_for_mapper(mapper))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_tags(session):
+    tags = session.info.pop(_PENDING_TAGS, None)
+    if tags and has_app_context():
+        invalidate_tags(tags)
+        content_changed.send(current_app._get_current_object(), tags=tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tags(session):
+    session.info.pop(_PENDING_TAGS, None)
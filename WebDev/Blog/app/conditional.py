@@ -0,0 +1,210 @@
+"""
+Conditional GET (ETag / Last-Modified) for public pages.
+
+A view's validator is derived from the same tags it declares for the view
+cache (see app.caching): every tag becomes a few scalar subqueries over the
+indexed updated_at columns, all sent as one SELECT. The row is hashed into a
+weak ETag, so an unchanged page costs that one query and a 304, before the
+view or any template runs. Pages of single rows ('post/{id}', 'photo/{id}')
+also get the newest timestamp as Last-Modified. Lists and project pages do
+not: deleting one of their rows changes a count in the ETag but moves no
+timestamp forward, so If-Modified-Since would wrongly answer 304.
+cached_view() stores the ETag with each response it caches and only runs the
+query for requests that send If-None-Match or If-Modified-Since.
+
+    'post', 'post:<type>'  count and newest updated_at/published_at of visible posts
+    'project', 'photo'     count and newest updated_at of the table
+    'tag'                  tag count (renaming or deleting a tag also touches its posts)
+    'post/{post_id}'       the post, its project, cover and gallery photos
+    'project/{project_id}' the project, its items, and the cover and gallery
+                           photos of both
+    'photo/{photo_id}'     the photo
+"""
+import os
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps, lru_cache
+
+import sqlalchemy as sa
+from flask import request, session, current_app, make_response
+from flask_login import current_user
+from werkzeug.http import parse_date
+
+from app.extensions import db
+
+# Flask-Compress appends ':<algorithm>' inside the quotes of a response ETag.
+_COMPRESSION_SUFFIXES = ('', ':gzip', ':br', ':deflate', ':zstd')
+
+
+def _post_scope(post_type=None):
+    from app.models import Post
+    from app.helpers import published_filter
+
+    def scoped(*columns):
+        return published_filter(sa.select(*columns), post_type).scalar_subquery()
+
+    return [
+        scoped(sa.func.count(Post.id)),
+        scoped(sa.func.max(Post.updated_at)),
+        scoped(sa.func.max(Post.published_at)),
+    ]
+
+
+def _table_scope(model):
+    return [
+        sa.select(sa.func.count(model.id)).scalar_subquery(),
+        sa.select(sa.func.max(model.updated_at)).scalar_subquery(),
+    ]
+
+
+def _photos_of(item_id, cover_model, image_model, fk):
+    from app.models import Photo
+
+    photo_ids = sa.union(
+        sa.select(cover_model.photo_id).where(cover_model.id == item_id),
+        sa.select(image_model.photo_id).where(getattr(image_model, fk) == item_id),
+    )
+    return sa.select(sa.func.max(Photo.updated_at)).where(Photo.id.in_(photo_ids)).scalar_subquery()
+
+
+def _item_photos_of(project_id):
+    from app.models import Post, Photo, PostImage
+
+    item_ids = sa.select(Post.id).where(Post.project_id == project_id)
+    photo_ids = sa.union(
+        sa.select(Post.photo_id).where(Post.project_id == project_id),
+        sa.select(PostImage.photo_id).where(PostImage.post_id.in_(item_ids)),
+    )
+    return sa.select(sa.func.max(Photo.updated_at)).where(Photo.id.in_(photo_ids)).scalar_subquery()
+
+
+def _validator_columns(tag):
+    """Scalar subqueries whose values change whenever content behind `tag` does."""
+    from app.models import Post, Project, Photo, Tag, PostImage, ProjectImage
+
+    kind, _, ident = tag.partition('/')
+    if ident:
+        item_id = int(ident)
+        if kind == 'post':
+            return [
+                sa.select(Post.updated_at).where(Post.id == item_id).scalar_subquery(),
+                sa.select(Project.updated_at).join(Post, Post.project_id == Project.id)
+                  .where(Post.id == item_id).scalar_subquery(),
+                _photos_of(item_id, Post, PostImage, 'post_id'),
+            ]
+        if kind == 'project':
+            return [
+                sa.select(Project.updated_at).where(Project.id == item_id).scalar_subquery(),
+                sa.select(sa.func.count(Post.id)).where(Post.project_id == item_id).scalar_subquery(),
+                sa.select(sa.func.max(Post.updated_at)).where(Post.project_id == item_id).scalar_subquery(),
+                _photos_of(item_id, Project, ProjectImage, 'project_id'),
+                # The item cards show their cover and gallery photos too.
+                _item_photos_of(item_id),
+            ]
+        if kind == 'photo':
+            return [sa.select(Photo.updated_at).where(Photo.id == item_id).scalar_subquery()]
+        raise ValueError(f"No validator for cache tag {tag!r}")
+
+    kind, _, post_type = kind.partition(':')
+    if kind == 'post':
+        return _post_scope(post_type or None)
+    if kind == 'project':
+        return _table_scope(Project)
+    if kind == 'photo':
+        return _table_scope(Photo)
+    if kind == 'tag':
+        return [sa.select(sa.func.count(Tag.id)).scalar_subquery()]
+    raise ValueError(f"No validator for cache tag {tag!r}")
+
+
+@lru_cache(maxsize=None)
+def _deploy_salt(*folders):
+    """Changes when templates or static assets are redeployed."""
+    newest = 0.0
+    for folder in folders:
+        for root, _, files in os.walk(folder):
+            for name in files:
+                newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return repr(newest)
+
+
+def _as_utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _timestamped(tag):
+    """Whether every change behind `tag` advances one of its timestamps."""
+    kind, _, ident = tag.partition('/')
+    return bool(ident) and kind in ('post', 'photo')
+
+
+def content_validators(tags):
+    """Return (etag, last_modified) for the content behind `tags`, in one query.
+
+    last_modified is None unless every tag is one _timestamped() accepts.
+    """
+    from app.helpers import BODY_RENDER_VERSION
+
+    columns = [column for tag in sorted(tags) for column in _validator_columns(tag)]
+    row = db.session.execute(sa.select(*columns)).one()
+
+    timestamps = [_as_utc(value) for value in row if isinstance(value, datetime)]
+    last_modified = None
+    if timestamps and all(_timestamped(tag) for tag in tags):
+        last_modified = max(timestamps).replace(microsecond=0)
+
+    static = current_app.static_folder
+    salt = _deploy_salt(current_app.template_folder, os.path.join(static, 'css'), os.path.join(static, 'js'))
+    # Logged-in pages carry admin controls, so they never share an ETag with anonymous ones.
+    viewer = current_user.get_id() if current_user.is_authenticated else ''
+    payload = repr((sorted(tags), tuple(row), salt, BODY_RENDER_VERSION, viewer, request.full_path))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest(), last_modified
+
+
+def _is_conditional():
+    """Whether the request sends a validator to check."""
+    return bool(request.if_none_match or request.headers.get('If-Modified-Since'))
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 §13.2.2).
+        return any(request.if_none_match.contains_weak(etag + suffix) for suffix in _COMPRESSION_SUFFIXES)
+    since = parse_date(request.headers.get('If-Modified-Since'))
+    return bool(since and last_modified and last_modified <= since)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_view(*depends_on):
+    """Answer GETs with 304 when the content behind `depends_on` is unchanged.
+
+    Tags take the same {placeholders} as cached_view(). Full responses get
+    ETag, Last-Modified and `Cache-Control: no-cache`, so browsers revalidate
+    on every visit instead of guessing a freshness lifetime.
+    """
+    def decorator(view):
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            # Flashed messages are consumed by rendering; never skip it for them.
+            if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return view(*args, **kwargs)
+
+            etag, last_modified = content_validators({tag.format(**kwargs) for tag in depends_on})
+            if _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            return _set_validators(response, etag, last_modified)
+        return decorated
+    return decorator
@@ -6,29 +6,62 @@ import re
 import json
 import time
 import base64
+import hashlib
+import html
+import threading
+from functools import lru_cache
+from html.parser import HTMLParser
 from io import BytesIO
 from datetime import datetime, timezone
 import markdown
+from markdown.extensions import Extension
+from markdown.postprocessors import Postprocessor
 import bleach
+import sqlalchemy as sa
+from markdown_it import MarkdownIt
+from pygments import highlight as pygments_highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.token import STANDARD_TYPES
+from pygments.util import ClassNotFound
 from markupsafe import Markup
-from bs4 import BeautifulSoup, NavigableString, Comment
+from sqlalchemy import event
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 from werkzeug.utils import secure_filename
 from uuid import uuid4
-from flask import current_app, render_template
+from flask import current_app, has_app_context
+from flask_wtf.csrf import generate_csrf
 
 from app.extensions import db, cache
+from app.utils.lru import LRUCache
+
+_CODE_LANGUAGE_CLASS_RE = re.compile(r'^language-[\w+#.-]+$')
+_PYGMENTS_CLASSES = frozenset(STANDARD_TYPES.values()) - {''}
+
+
+def _allow_highlight_class(tag, name, value):
+    """Keep the classes syntax highlighting needs (see highlight_code) and no others."""
+    if name != 'class':
+        return False
+    if tag == 'code':
+        return bool(_CODE_LANGUAGE_CLASS_RE.match(value))
+    return value in _PYGMENTS_CLASSES
+
 
 # Allowed HTML tags and attributes for Bleach sanitization
 ALLOWED_TAGS = [
     'p', 'br', 'strong', 'em', 'ul', 'ol', 'li',
     'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-    'a', 'img', 'blockquote', 'code', 'pre'
+    'a', 'img', 'blockquote', 'code', 'pre', 'span'
 ]
 
 ALLOWED_ATTRIBUTES = {
     'a': ['href', 'title', 'target'],
-    'img': ['src', 'alt', 'title', 'width', 'height', 'style']
+    'img': ['src', 'alt', 'title', 'width', 'height', 'style'],
+    # Fenced code: its language, and the Pygments token spans inside it.
+    'code': _allow_highlight_class,
+    'span': _allow_highlight_class,
 }
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -49,6 +82,14 @@ MAX_GALLERY_IMAGES = 30
 MAX_GALLERY_CAPTION_LEN = 512
 MAX_GALLERY_ALT_LEN = 512
 
+# Version of the body-rendering pipeline baked into every stored body_html_key.
+# Bump it whenever markdown_safe() can produce different HTML for the same input
+# (extensions, allow-lists, library upgrades) so stale stored HTML is ignored.
+BODY_RENDER_VERSION = 3
+# Excerpt lengths the templates and /api/posts ask for; these are stored per row
+# on save so cards never re-render Markdown. Other lengths render live.
+STORED_EXCERPT_LENGTHS = (200, 300)
+
 
 class GalleryValidationError(Exception):
     """Raised when a submitted gallery manifest fails validation.
@@ -74,20 +115,284 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def markdown_safe(text):
+class MarkdownRenderer:
+    """A Markdown engine plus the Bleach pass that makes its output safe.
+
+    Parsers and Cleaners are built once per thread and reused: neither library
+    promises that one instance can be shared across threads, and rebuilding them
+    (extension loading, html5lib setup) used to dominate small renders.
+    """
+
+    #: Value of the MARKDOWN_BACKEND setting that selects this renderer.
+    name = None
+    #: Short tag baked into body_render_key() so switching backends re-renders.
+    key = None
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _build_parser(self):
+        raise NotImplementedError
+
+    def _to_html(self, parser, text):
+        raise NotImplementedError
+
+    def _parser(self):
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = self._build_parser()
+        return parser
+
+    def _cleaner(self):
+        cleaner = getattr(self._local, "cleaner", None)
+        if cleaner is None:
+            cleaner = self._local.cleaner = bleach.sanitizer.Cleaner(
+                tags=ALLOWED_TAGS,
+                attributes=ALLOWED_ATTRIBUTES,
+                strip=True,
+            )
+        return cleaner
+
+    def render(self, text):
+        """Convert Markdown text to sanitized HTML (a plain str)."""
+        return self._cleaner().clean(self._to_html(self._parser(), text))
+
+
+# --- Syntax-highlight cache ---
+# Pygments output per code block, keyed by language and a digest of the code.
+# Shared by every render path (body, excerpts, editor preview) and both
+# engines, so re-rendering a post whose code did not change skips Pygments.
+HIGHLIGHT_CACHE_SIZE = 1024
+_highlight_cache = LRUCache(HIGHLIGHT_CACHE_SIZE)
+
+_HIGHLIGHT_FORMATTER = HtmlFormatter(nowrap=True)
+# A fenced block as Python-Markdown's fenced_code writes it (code escaped, so no '<').
+_FENCED_CODE_RE = re.compile(r'<pre><code class="language-([^"]+)">([^<]*)</code></pre>')
+
+
+@lru_cache(maxsize=64)
+def _lexer_for(lang):
+    try:
+        return get_lexer_by_name(lang)
+    except ClassNotFound:
+        return None
+
+
+def highlight_code(code, lang):
+    """Pygments token spans for `code` in language `lang`, or "" if Pygments does not know it.
+
+    Both engines wrap the result in <pre><code class="language-...">; Bleach
+    keeps the spans' token classes (see ALLOWED_ATTRIBUTES), which the
+    .post-content styles colour.
+    """
+    lexer = _lexer_for(lang) if lang else None
+    if lexer is None:
+        return ""
+    key = (lang, hashlib.sha1(code.encode("utf-8")).hexdigest())
+    return _highlight_cache.get_or_compute(key, lambda: pygments_highlight(code, lexer, _HIGHLIGHT_FORMATTER))
+
+
+def _highlight_fenced_block(match):
+    lang, escaped = match.groups()
+    spans = highlight_code(html.unescape(escaped), lang)
+    return f'<pre><code class="language-{lang}">{spans}</code></pre>' if spans else match.group(0)
+
+
+class _HighlightPostprocessor(Postprocessor):
+    def run(self, text):
+        return _FENCED_CODE_RE.sub(_highlight_fenced_block, text)
+
+
+class HighlightExtension(Extension):
+    """Highlight fenced_code blocks through highlight_code(), once raw HTML is restored."""
+
+    def extendMarkdown(self, md):
+        md.postprocessors.register(_HighlightPostprocessor(md), 'highlight_code', 25)
+
+
+def highlight_cache_stats():
+    """Hit/miss counters of the shared syntax-highlight cache."""
+    return _highlight_cache.stats()
+
+
+class PythonMarkdownRenderer(MarkdownRenderer):
+    """Python-Markdown with fenced_code, tables and Pygments highlighting (the original engine)."""
+
+    name = "markdown"
+    key = "pm"
+
+    def _build_parser(self):
+        return markdown.Markdown(extensions=['fenced_code', 'tables', HighlightExtension()])
+
+    def _to_html(self, parser, text):
+        return parser.reset().convert(text)
+
+
+def _highlight_fence(code, lang, attrs):
+    """markdown-it highlight hook; returning "" lets markdown-it escape the code itself."""
+    return highlight_code(code, lang)
+
+
+def _mdit_render_text(self, tokens, idx, options, env):
+    return _escape_html_text(tokens[idx].content)
+
+
+def _mdit_render_code_inline(self, tokens, idx, options, env):
+    return f"<code>{_escape_html_text(tokens[idx].content)}</code>"
+
+
+def _mdit_render_image(self, tokens, idx, options, env):
+    token = tokens[idx]
+    token.attrs = dict(sorted(token.attrs.items()))
+    return self.image(tokens, idx, options, env)
+
+
+class MarkdownItRenderer(MarkdownRenderer):
+    """markdown-it-py (CommonMark plus tables), raw HTML allowed as with Python-Markdown."""
+
+    name = "markdown-it"
+    key = "mi"
+
+    def _build_parser(self):
+        parser = MarkdownIt("commonmark", {"html": True, "highlight": _highlight_fence}).enable("table")
+        # Match Python-Markdown's serialization so switching engines does not
+        # churn stored HTML: quotes stay literal in text and code spans, and
+        # image attributes come out sorted.
+        parser.add_render_rule("text", _mdit_render_text)
+        parser.add_render_rule("code_inline", _mdit_render_code_inline)
+        parser.add_render_rule("image", _mdit_render_image)
+        return parser
+
+    def _to_html(self, parser, text):
+        # Python-Markdown output has no trailing newline; keep stored HTML comparable.
+        return parser.render(text).rstrip("\n")
+
+
+MARKDOWN_RENDERERS = {
+    renderer.name: renderer for renderer in (PythonMarkdownRenderer(), MarkdownItRenderer())
+}
+DEFAULT_MARKDOWN_BACKEND = PythonMarkdownRenderer.name
+
+
+def get_markdown_renderer(backend=None):
+    """Return the renderer for `backend`, defaulting to the MARKDOWN_BACKEND setting."""
+    if backend is None:
+        backend = DEFAULT_MARKDOWN_BACKEND
+        if has_app_context():
+            backend = current_app.config.get("MARKDOWN_BACKEND") or backend
+    try:
+        return MARKDOWN_RENDERERS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown MARKDOWN_BACKEND {backend!r}; expected one of {sorted(MARKDOWN_RENDERERS)}"
+        ) from None
+
+
+def markdown_safe(text, backend=None):
     """Convert Markdown text to sanitized HTML."""
     if not text:
         return Markup('')
-    html_content = markdown.markdown(
-        text, extensions=['fenced_code', 'tables', 'codehilite']
-    )
-    safe_html = bleach.clean(
-        html_content,
-        tags=ALLOWED_TAGS,
-        attributes=ALLOWED_ATTRIBUTES,
-        strip=True
-    )
-    return Markup(safe_html)
+    return Markup(get_markdown_renderer(backend).render(text))
+
+
+# --- Incremental (block-level) rendering ---
+# Sanitized HTML per Markdown block, keyed by (engine, block hash). Editing one
+# paragraph of a long post re-renders that paragraph only.
+MARKDOWN_BLOCK_CACHE_SIZE = 4096
+# Characters of cached HTML per worker; one huge fenced block can't pin more.
+MARKDOWN_BLOCK_CACHE_BYTES = 8 * 1024 * 1024
+_markdown_block_cache = LRUCache(MARKDOWN_BLOCK_CACHE_SIZE, maxbytes=MARKDOWN_BLOCK_CACHE_BYTES)
+
+_FENCE_OPEN_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+# A list item or blockquote line, at any indentation.
+_CONTAINER_LINE_RE = re.compile(r'^\s*(?:>|(?:[-*+]|\d+[.)])(?:\s|$))')
+# Constructs that tie distant blocks together; bodies using them render whole.
+_LINK_REFERENCE_RE = re.compile(r'(?m)^ {0,3}\[[^\]]+\]:')
+_HTML_BLOCK_RE = re.compile(r'(?m)^ {0,3}<[A-Za-z!?/]')
+
+
+def split_markdown_blocks(text):
+    """Split Markdown into top-level blocks that render the same on their own.
+
+    Boundaries are blank lines outside fenced code, as with the gallery-token
+    normalization in _render_body_html(), and only where the last construct
+    before them is one a blank line closes for good: a paragraph, heading,
+    table or fence. A list or blockquote run may continue past blank lines
+    (as a loose list, or a quote Python-Markdown merges with the next), so it
+    stays in one block with whatever follows it, as does an indented line.
+    Merging is always safe; splitting only at clean boundaries. Returns None
+    when the text uses link reference definitions or raw HTML blocks, which
+    can span boundaries.
+    """
+    if _LINK_REFERENCE_RE.search(text) or _HTML_BLOCK_RE.search(text):
+        return None
+
+    blocks = []
+    current = []
+    fence = None
+    after_blank = False
+    # Whether the lines since the last blank line hold no list or blockquote.
+    closed = True
+    for line in text.split("\n"):
+        if fence:
+            current.append(line)
+            if line.lstrip(" ").startswith(fence) and not line.strip().strip(fence[0]):
+                fence = None
+            continue
+        if not line.strip():
+            after_blank = bool(current)
+            continue
+        if after_blank:
+            indented = line[:1].isspace()
+            if closed and not indented:
+                blocks.append("\n".join(current))
+                current = []
+            else:
+                current.append("")
+            # An indented line continues whatever came before it.
+            closed = closed or not indented
+            after_blank = False
+        if _CONTAINER_LINE_RE.match(line):
+            closed = False
+        match = _FENCE_OPEN_RE.match(line)
+        if match:
+            fence = match.group(1)
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def render_markdown_incremental(text, backend=None):
+    """Render Markdown like markdown_safe(), reusing cached HTML for unchanged blocks.
+
+    Returns (html, rendered): the sanitized HTML as a str and how many blocks
+    actually went through the Markdown engine on this call.
+    """
+    if not text:
+        return "", 0
+    renderer = get_markdown_renderer(backend)
+    blocks = split_markdown_blocks(text)
+    if blocks is None:
+        return renderer.render(text), 1
+
+    parts = []
+    rendered = 0
+
+    def render_block(block):
+        nonlocal rendered
+        rendered += 1
+        return renderer.render(block)
+
+    for block in blocks:
+        key = (renderer.key, hashlib.sha1(block.encode("utf-8")).hexdigest())
+        parts.append(_markdown_block_cache.get_or_compute(key, lambda: render_block(block)))
+    return "\n".join(parts), rendered
+
+
+def markdown_block_cache_stats():
+    """Hit/miss counters of the block cache behind render_markdown_incremental()."""
+    return _markdown_block_cache.stats()
 
 
 def retry_database_operation(func, *args, **kwargs):
@@ -106,26 +411,200 @@ def retry_database_operation(func, *args, **kwargs):
             db.session.rollback()
 
 
-def invalidate_content_caches(content_type=None):
-    """Clear all cached page data after any content change."""
+def invalidate_content_caches():
+    """Clear every cached page at once, here and on the CDN (the admin "clear cache" action).
+
+    Content edits do not need this: app.caching evicts and purges just the
+    pages that depend on the rows a commit changed.
+    """
+    from app.utils.purge import purge_backend
+
     cache.clear()
+    purge_backend().purge_all()
+
+
+class LazyCsrfToken:
+    """The request's CSRF token, generated only when a template prints it.
+
+    generate_csrf() stores a secret in the session, so generating it for every
+    render would give each anonymous reader a session cookie. Most pages only
+    print the token inside admin-only forms.
+    """
+
+    def __str__(self):
+        return generate_csrf()
+
+    __html__ = __str__
 
 
-def published_filter(query):
+def published_filter(query, post_type=None):
     """Filter a Post query to exclude scheduled (future) posts.
 
     Posts with published_at=NULL are treated as immediately published.
     Posts with published_at in the future are hidden from all list pages.
     (Admins can view scheduled posts individually or via the admin dashboard.)
+    Both cases are one test on effective_published_at, which the feed indexes
+    carry. `post_type` keeps only that section's posts: a subclass query
+    (MusicItem.query, ...) should pass its own, so the database can walk
+    ix_posts_type_feed in date order instead of sorting the section.
     """
     from app.models import Post
 
-    now = datetime.now(timezone.utc)
-    return query.filter(
-        db.or_(Post.published_at.is_(None), Post.published_at <= now)
+    query = query.filter(Post.effective_published_at <= datetime.now(timezone.utc))
+    if post_type is not None:
+        query = query.filter(Post.type == post_type)
+    return query
+
+
+def encode_feed_cursor(date_posted, post_id):
+    """Opaque /api/posts cursor: the feed continues after this (date_posted, id)."""
+    if date_posted.tzinfo is None:
+        # SQLite hands back naive datetimes; stored values are UTC.
+        date_posted = date_posted.replace(tzinfo=timezone.utc)
+    raw = f"{date_posted.astimezone(timezone.utc).isoformat()}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_feed_cursor(cursor):
+    """Return the (date_posted, id) in a cursor; raises ValueError if it is malformed."""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+    date_posted, post_id = raw.split('|')
+    return datetime.fromisoformat(date_posted), int(post_id)
+
+FEED_PAGE_SIZE = 10
+
+
+def listing_loaders(*options):
+    """Loader options for a list query: `options`, plus raiseload('*') when
+    SQLALCHEMY_RAISELOAD is set, so a relationship they leave out fails loudly
+    instead of lazy-loading once per row.
+    """
+    if current_app.config.get('SQLALCHEMY_RAISELOAD'):
+        options += (db.raiseload('*'),)
+    return options
+
+
+def post_card_loaders(*extra, entity=None):
+    """Loader options for Post cards: cover photo, project and gallery photos.
+
+    `entity` is what the query selects when it is not Post itself (e.g.
+    PostWithSubtypes); `extra` options must name the same entity.
+    """
+    from app.models import Post, PostImage
+
+    entity = entity or Post
+    return listing_loaders(
+        db.joinedload(entity.photo),
+        db.joinedload(entity.project),
+        db.selectinload(entity.images).joinedload(PostImage.photo),
+        *extra,
+    )
+
+
+def project_card_loaders(*extra):
+    """Loader options for Project cards: cover photo and gallery photos."""
+    from app.models import Project, ProjectImage
+
+    return listing_loaders(
+        db.joinedload(Project.photo),
+        db.selectinload(Project.images).joinedload(ProjectImage.photo),
+        *extra,
     )
 
 
+def serialize_feed_post(post_item):
+    """JSON-ready card data for one post, as /api/posts and the index's first page send it."""
+    truncated_content = str(post_excerpt(post_item, length=300))
+
+    card_photo = post_item.photo
+    if card_photo is None:
+        first_inline = next(
+            (
+                image
+                for image in sorted(post_item.images, key=lambda image: image.position or 0)
+                if image.photo and image.photo.filename
+            ),
+            None
+        )
+        card_photo = first_inline.photo if first_inline else None
+
+    item_data = {
+        'id': post_item.id,
+        'type': post_item.type,
+        'title': post_item.title,
+        'content': truncated_content,
+        'date_posted': post_item.date_posted.strftime('%Y-%m-%d'),
+        'photo_filename': card_photo.filename if card_photo else None,
+        'photo_is_inline_fallback': bool(card_photo and post_item.photo is None),
+        'github_link': post_item.github_link,
+        'project_id': post_item.project_id,
+        'project_title': post_item.project.title if post_item.project else None,
+        'tags': [tag.name for tag in post_item.tags] if post_item.tags else []
+    }
+
+    if post_item.type == 'music_item':
+        item_data.update({
+            'item_type': post_item.item_type,
+            'artist': post_item.artist,
+            'album_title': post_item.album_title,
+            'spotify_link': post_item.spotify_link,
+            'youtube_link': post_item.youtube_link,
+        })
+
+    elif post_item.type == 'video':
+        item_data.update({
+            'video_url': post_item.video_url,
+            'embed_code': post_item.embed_code,
+            'source_type': post_item.source_type,
+            'duration': post_item.duration,
+        })
+
+    elif post_item.type == 'review':
+        item_data.update({
+            'item_title': post_item.item_title,
+            'category': post_item.category,
+            'rating': post_item.rating,
+            'year_released': post_item.year_released,
+            'director_author': post_item.director_author,
+            'item_link': post_item.item_link,
+        })
+
+    return item_data
+
+
+def feed_page(limit=FEED_PAGE_SIZE, after=None, offset=None):
+    """One page of the published feed, newest first, as the /api/posts payload.
+
+    `after` is the (date_posted, id) of a previous page's next_cursor (see
+    decode_feed_cursor); the query seeks past it through ix_posts_feed.
+    `offset` is the deprecated alternative and makes the database walk past
+    every earlier row.
+    """
+    from app.models import Post, PostWithSubtypes
+
+    # The cards carry music, video and review fields, so join their tables.
+    query = (
+        published_filter(db.session.query(PostWithSubtypes))
+        .options(*post_card_loaders(db.selectinload(PostWithSubtypes.tags), entity=PostWithSubtypes))
+        .order_by(Post.date_posted.desc(), Post.id.desc())
+    )
+    if after is not None:
+        query = query.filter(sa.tuple_(Post.date_posted, Post.id) < after)
+    elif offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row so we can determine whether more posts exist.
+    posts = query.limit(limit + 1).all()
+    has_next = len(posts) > limit
+    posts = posts[:limit]
+    return {
+        'posts': [serialize_feed_post(post_item) for post_item in posts],
+        'has_next': has_next,
+        'limit': limit,
+        'next_cursor': encode_feed_cursor(posts[-1].date_posted, posts[-1].id) if has_next else None,
+    }
+
+
 def sync_tags(post, tag_string):
     """Parse a comma-separated tag string and sync with the post's tags.
 
@@ -502,6 +981,63 @@ def _body_text_for_render(item):
     return ""
 
 
+def body_render_key(body):
+    """Return the key identifying a rendering of `body` by the current pipeline."""
+    digest = hashlib.sha256((body or "").encode("utf-8")).hexdigest()
+    return f"v{BODY_RENDER_VERSION}:{get_markdown_renderer().key}:{digest}"
+
+
+def normalize_block_tokens(body):
+    """Put each block gallery token in its own Markdown paragraph."""
+    # Without this, two tokens on adjacent lines collapse into one
+    # <p>...two tokens...</p>, which the per-<p> render regex in render_body()
+    # cannot match, so neither image expands even though validation (which
+    # checks per line) accepted them.
+    return GALLERY_BLOCK_TOKEN_RE.sub(lambda m: "\n\n" + m.group(0).strip() + "\n\n", body)
+
+
+def _render_body_html(body):
+    """Render a Markdown body to sanitized HTML with gallery tokens left unexpanded."""
+    html, _ = render_markdown_incremental(normalize_block_tokens(body))
+    return html
+
+
+def prerender_body(item):
+    """Store the sanitized body HTML and card excerpts on a Post/Project if stale.
+
+    Returns True when the item was (re-)rendered, False when the stored copies
+    were already current for this content and BODY_RENDER_VERSION.
+    """
+    body = _body_text_for_render(item)
+    key = body_render_key(body)
+    if item.body_html_key == key and item.body_html is not None and item.excerpt_html is not None:
+        return False
+    item.body_html = _render_body_html(body)
+    item.excerpt_html = {
+        str(length): str(excerpt) for length, excerpt in _render_excerpts(body, STORED_EXCERPT_LENGTHS).items()
+    }
+    item.body_html_key = key
+    return True
+
+
+@event.listens_for(Session, "before_flush")
+def _prerender_bodies_before_flush(session, flush_context, instances):
+    """Render bodies once per edit, when new or changed items are flushed."""
+    from app.models import Post, Project
+
+    for obj in [*session.new, *session.dirty]:
+        if isinstance(obj, (Post, Project)):
+            prerender_body(obj)
+
+
+def _stored_body_html(item):
+    """Return the item's stored body HTML, rendering live if it is missing or stale."""
+    body = _body_text_for_render(item)
+    if getattr(item, "body_html_key", None) == body_render_key(body) and item.body_html is not None:
+        return item.body_html
+    return _render_body_html(body)
+
+
 def render_body(item):
     """
     Render Markdown content/description and expand block gallery tokens.
@@ -512,16 +1048,15 @@ def render_body(item):
 
     The token must be alone in its Markdown paragraph. Inline token placement is
     intentionally not supported.
+
+    The Markdown pass is served from the item's stored body_html (filled on save);
+    only the gallery expansion runs per request.
     """
-    body = _body_text_for_render(item)
-    # Guarantee each block token sits in its own Markdown paragraph. Without this,
-    # two tokens on adjacent lines collapse into one <p>...two tokens...</p>, which
-    # the per-<p> render regex below cannot match, so neither image expands even
-    # though validation (which checks per line) accepted them.
-    body = GALLERY_BLOCK_TOKEN_RE.sub(lambda m: "\n\n" + m.group(0).strip() + "\n\n", body)
-    html = str(markdown_safe(body))
+    html = _stored_body_html(item)
 
     images_by_key = _gallery_items_by_key(item)
+    # Call the compiled macro directly: no template context is built per token.
+    gallery_figure = current_app.jinja_env.get_template("_gallery_figure.html").module.gallery_figure
 
     def replace_token(match):
         key = match.group(1)
@@ -529,10 +1064,7 @@ def render_body(item):
         if not gallery_item or not gallery_item.photo or not gallery_item.photo.filename:
             return ""
 
-        return render_template(
-            "_gallery_figure.html",
-            gallery_item=gallery_item,
-        )
+        return str(gallery_figure(gallery_item))
 
     return Markup(GALLERY_RENDER_TOKEN_RE.sub(replace_token, html))
 
@@ -588,10 +1120,135 @@ def strip_gallery_tokens_preserve_blocks(text):
     cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
     return cleaned.strip()
 
+
+# Void elements close immediately and serialize as <tag/>, matching the
+# BeautifulSoup-based truncator this parser replaced.
+_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer',
+})
+_RAW_TEXT_ELEMENTS = frozenset({'script', 'style'})
+_PRESERVE_WHITESPACE_ELEMENTS = frozenset({'pre', 'textarea'})
+_ASCII_WHITESPACE = frozenset(' \n\t\f\r')
+# Bytes handed to the parser per step; once the budget is spent the rest of the
+# document is never tokenized.
+_TRUNCATE_FEED_CHUNK = 1024
+
+
+def _escape_html_text(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _format_start_tag(tag, attrs, self_closing=False):
+    parts = [tag]
+    # Later duplicates win; attributes come out sorted, as they always have.
+    for name, value in sorted(dict(attrs).items()):
+        value = _escape_html_text(value or "")
+        if '"' in value:
+            if "'" in value:
+                value = '"' + value.replace('"', "&quot;") + '"'
+            else:
+                value = "'" + value + "'"
+        else:
+            value = '"' + value + '"'
+        parts.append(f"{name}={value}")
+    return "<" + " ".join(parts) + ("/>" if self_closing else ">")
+
+
+class _TruncatingHTMLParser(HTMLParser):
+    """Single-pass event handler behind truncate_html().
+
+    Copies tags and text to the output until `length` visible characters have
+    been emitted, then ignores every further event. Adjacent text events are
+    merged first so a cut lands exactly where it would on a whole text node.
+    """
+
+    def __init__(self, length, ellipsis):
+        super().__init__(convert_charrefs=True)
+        self.remaining = length
+        self.ellipsis = ellipsis
+        self.done = False
+        self.out = []
+        self.open_tags = []
+        self._text = []
+
+    def _flush_text(self):
+        if not self._text:
+            return
+        text = "".join(self._text)
+        self._text.clear()
+        # Whitespace-only runs between tags collapse to one newline or space,
+        # except inside <pre>/<textarea>.
+        if not _PRESERVE_WHITESPACE_ELEMENTS.intersection(self.open_tags) and _ASCII_WHITESPACE.issuperset(text):
+            text = "\n" if "\n" in text else " "
+        raw = bool(self.open_tags) and self.open_tags[-1] in _RAW_TEXT_ELEMENTS
+        escape = (lambda value: value) if raw else _escape_html_text
+        if len(text) <= self.remaining:
+            self.remaining -= len(text)
+            self.out.append(escape(text))
+            return
+        self.out.append(escape(text[:self.remaining].rstrip() + self.ellipsis))
+        self.remaining = 0
+        self.done = True
+
+    def handle_data(self, data):
+        if not self.done:
+            self._text.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if self.done:
+            return
+        if tag in _VOID_ELEMENTS:
+            self.out.append(_format_start_tag(tag, attrs, self_closing=True))
+        else:
+            self.out.append(_format_start_tag(tag, attrs))
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+        if self.done:
+            return
+        if tag in _VOID_ELEMENTS:
+            self.out.append(_format_start_tag(tag, attrs, self_closing=True))
+        else:
+            self.out.append(_format_start_tag(tag, attrs) + f"</{tag}>")
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if self.done or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_comment(self, data):
+        # Comments are dropped, but still split the text on either side.
+        self._flush_text()
+
+    def handle_decl(self, decl):
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def unknown_decl(self, data):
+        self._flush_text()
+
+    def result(self):
+        self._flush_text()
+        closing = [f"</{tag}>" for tag in reversed(self.open_tags)]
+        return "".join(self.out) + "".join(closing)
+
+
 def truncate_html(html, length=250, ellipsis="…"):
     """Truncate sanitized HTML by visible text length while preserving valid HTML.
     This expects HTML that has already gone through markdown_safe()/Bleach.
-    It counts only visible text, not tags, and removes nodes after the cutoff.
+    It counts only visible text, not tags, stops reading the input once the
+    budget is spent, and closes whatever tags are still open at the cutoff.
 
     """
     if html is None:
@@ -606,53 +1263,50 @@ def truncate_html(html, length=250, ellipsis="…"):
     if length <= 0:
         return Markup("")
 
-    soup = BeautifulSoup(str(html), "html.parser")
-    remaining = length
-    truncated = False
-
-    def walk(node):
-        nonlocal remaining, truncated
-        for child in list(getattr(node, "contents", [])):
-
-            if isinstance(child, Comment):
-                child.extract()
-                continue
-
-            if truncated:
-                child.extract()
-                continue
-
-            if isinstance(child, NavigableString):
-                text = str(child)
-                if len(text) <= remaining:
-                    remaining -= len(text)
-                    continue
+    source = str(html)
+    parser = _TruncatingHTMLParser(length, ellipsis)
+    for start in range(0, len(source), _TRUNCATE_FEED_CHUNK):
+        parser.feed(source[start:start + _TRUNCATE_FEED_CHUNK])
+        if parser.done:
+            break
+    else:
+        parser.close()
 
-                cut = text[:remaining].rstrip()
-                child.replace_with(cut + ellipsis)
-                remaining = 0
-                truncated = True
-                continue
-            walk(child)
-    walk(soup)
+    return Markup(parser.result())
 
-    # Return only the fragment contents, not an artificial <html>/<body> wrapper.
-    return Markup("".join(str(child) for child in soup.contents))
+def _render_excerpts(body, lengths):
+    """Render card excerpts of each of `lengths` from a raw Markdown body.
 
-def post_excerpt(item, length=250):
-    """Single source of truth for card/list excerpts.
     Pipeline:
-    - choose content/description body
     - strip inline-gallery tokens
-    - render Markdown safely
+    - render Markdown safely, once for all lengths
     - truncate sanitized HTML without breaking block-level markup
     """
-    source = strip_gallery_tokens_preserve_blocks(_item_body_for_gallery(item) or "")
+    source = strip_gallery_tokens_preserve_blocks(body or "")
 
     if not source:
-        return Markup("")
+        return {length: Markup("") for length in lengths}
     rendered = markdown_safe(source)
-    return truncate_html(rendered, length=length)
+    return {length: truncate_html(rendered, length=length) for length in lengths}
+
+
+def _render_excerpt(body, length):
+    """Render one card excerpt from a raw Markdown body (see _render_excerpts)."""
+    return _render_excerpts(body, (length,))[length]
+
+
+def post_excerpt(item, length=250):
+    """Single source of truth for card/list excerpts.
+
+    Served from the item's stored excerpt_html (filled on save for
+    STORED_EXCERPT_LENGTHS) when it matches the current body; rows that have not
+    been backfilled, and any other length, render live.
+    """
+    body = _item_body_for_gallery(item)
+    stored = getattr(item, "excerpt_html", None)
+    if stored and str(length) in stored and item.body_html_key == body_render_key(body):
+        return Markup(stored[str(length)])
+    return _render_excerpt(body, length)
 
 def sync_inline_images(item, form, files, association_cls):
     """Create/update/delete inline image association rows for a Post or Project.
@@ -0,0 +1,351 @@
+"""
+In-process metrics, aggregated across workers and exposed in Prometheus text format.
+
+Each worker counts into module-level counters and histograms:
+
+    http_request_duration_seconds   request time by endpoint, method and status
+    view_cache_requests_total       cached_view lookups by endpoint and result
+                                    (hit, stale, miss, bypass)
+    view_cache_evictions_total      responses evicted by content changes, by endpoint
+    db_statements_total             SQL statements by endpoint
+    db_statement_duration_seconds   SQL statement time by endpoint
+    db_connections_opened_total     new DB connections (each may wake Neon)
+    template_render_seconds         render_template() time by template
+    image_processing_seconds        resize + encode + store time by image tier
+    outbound_request_seconds        calls to Brevo, Spotify and S3 by service
+
+Every FLUSH_INTERVAL seconds (and before each scrape) a worker writes its
+samples into one SQLite file under METRICS_DIR, one row per series and
+process. /metrics and the admin dashboard sum those rows, so they show the
+whole host whatever worker answers. Rows of processes that have exited are
+folded into an 'archive' process, so counters never go backwards.
+"""
+import os
+import time
+import sqlite3
+import threading
+from uuid import uuid4
+from bisect import bisect_left
+from contextlib import contextmanager
+from collections import defaultdict
+
+from flask import request, g, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds between a worker's writes to the shared file.
+FLUSH_INTERVAL = 5.0
+# Fold rows of exited processes into the archive every this many flushes.
+COMPACT_EVERY = 60
+
+# name -> (type, help)
+DEFINITIONS = {
+    'http_request_duration_seconds': ('histogram', 'Time to handle a request.'),
+    'view_cache_requests_total': ('counter', 'View cache lookups by result.'),
+    'view_cache_evictions_total': ('counter', 'Cached responses evicted because their content changed.'),
+    'db_statements_total': ('counter', 'SQL statements executed.'),
+    'db_statement_duration_seconds': ('histogram', 'Time spent executing SQL statements.'),
+    'db_connections_opened_total': ('counter', 'Database connections opened.'),
+    'template_render_seconds': ('histogram', 'Time to render a template with render_template().'),
+    'image_processing_seconds': ('histogram', 'Time to resize, encode and store one image tier.'),
+    'outbound_request_seconds': ('histogram', 'Latency of calls to external services.'),
+}
+
+_lock = threading.Lock()
+_counters = defaultdict(float)    # (name, labels) -> value
+_histograms = {}                  # (name, labels) -> [bucket counts..., +Inf, sum]
+_store = None
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    """Add `amount` to a counter."""
+    with _lock:
+        _counters[(name, _labels(labels))] += amount
+
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram."""
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        histogram[bisect_left(LATENCY_BUCKETS, value)] += 1
+        histogram[-1] += value
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the time spent in the block, even when it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def current_endpoint():
+    """Endpoint label for work done now: the request's endpoint, or 'background'."""
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'
+
+
+def _format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+def _local_samples():
+    """This process's samples as (name, labels, suffix, le, position, value) rows."""
+    rows = []
+    with _lock:
+        for (name, labels), value in _counters.items():
+            rows.append((name, _format_labels(labels), '', '', 0, value))
+        for (name, labels), histogram in _histograms.items():
+            label_text = _format_labels(labels)
+            cumulative = 0
+            for position, bound in enumerate((*LATENCY_BUCKETS, '+Inf')):
+                cumulative += histogram[position]
+                rows.append((name, label_text, '_bucket', str(bound), position, cumulative))
+            rows.append((name, label_text, '_sum', '', position + 1, histogram[-1]))
+            rows.append((name, label_text, '_count', '', position + 2, cumulative))
+    return rows
+
+
+class MetricsStore:
+    """The SQLite file every worker on the host flushes its samples into."""
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self._db_path = os.path.join(path, 'metrics.sqlite3')
+        self._thread = threading.local()
+        self._pid = None
+        self._process = None
+        self._last_flush = 0.0
+        self._flushes = 0
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS samples ('
+                ' process TEXT NOT NULL, pid INTEGER NOT NULL, name TEXT NOT NULL,'
+                ' labels TEXT NOT NULL, suffix TEXT NOT NULL, le TEXT NOT NULL,'
+                ' position INTEGER NOT NULL, value REAL NOT NULL,'
+                ' PRIMARY KEY (process, name, labels, suffix, le))'
+            )
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            # A forked worker writes its own rows: it must not overwrite the parent's.
+            self._pid = os.getpid()
+            self._process = f'{self._pid}-{uuid4().hex[:8]}'
+            self._thread = threading.local()
+        conn = getattr(self._thread, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._thread.conn = conn
+        return conn
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        conn = self._connection()
+        rows = [(self._process, self._pid, *row) for row in _local_samples()]
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self._flushes += 1
+        if self._flushes % COMPACT_EVERY == 0:
+            self._compact(conn)
+
+    def _compact(self, conn):
+        """Fold the rows of processes that have exited into the archive rows."""
+        processes = conn.execute("SELECT DISTINCT process, pid FROM samples WHERE process != 'archive'").fetchall()
+        for process, pid in processes:
+            if process == self._process or _alive(pid):
+                continue
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute(
+                    "INSERT INTO samples SELECT 'archive', 0, name, labels, suffix, le, position, value"
+                    ' FROM samples WHERE process = ?'
+                    ' ON CONFLICT (process, name, labels, suffix, le) DO UPDATE SET value = value + excluded.value',
+                    (process,),
+                )
+                conn.execute('DELETE FROM samples WHERE process = ?', (process,))
+
+    def totals(self):
+        """Samples summed over every process, ordered for exposition."""
+        self.flush(force=True)
+        return self._connection().execute(
+            'SELECT name, labels, suffix, le, SUM(value) FROM samples'
+            ' GROUP BY name, labels, suffix, le ORDER BY name, labels, MIN(position)'
+        ).fetchall()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _reset_after_fork():
+    # Counts inherited from the parent are the parent's to report.
+    global _lock
+    _lock = threading.Lock()
+    _counters.clear()
+    _histograms.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def render_prometheus(rows):
+    """Prometheus text exposition (format 0.0.4) of summed sample rows."""
+    lines = []
+    current = None
+    for name, labels, suffix, le, value in rows:
+        if name != current:
+            current = name
+            kind, help_text = DEFINITIONS.get(name, ('untyped', ''))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+        label_text = labels
+        if le:
+            label_text = f'{labels},le="{le}"' if labels else f'le="{le}"'
+        series = f'{name}{suffix}{{{label_text}}}' if label_text else f'{name}{suffix}'
+        lines.append(f'{series} {value:g}' if value != int(value) else f'{series} {int(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def summary(rows):
+    """Dashboard tables from summed rows.
+
+    'endpoints' has one row per endpoint with its request count, mean latency,
+    view cache hit ratio, evictions and SQL statements per request; 'timings'
+    has count and mean time per template, image tier and outbound service.
+    """
+    endpoints = defaultdict(lambda: defaultdict(float))
+    timings = defaultdict(lambda: defaultdict(float))
+    for name, labels, suffix, le, value in rows:
+        fields = dict(part.split('=', 1) for part in labels.split(',')) if labels else {}
+        fields = {key: text.strip('"') for key, text in fields.items()}
+        if name == 'http_request_duration_seconds' and suffix in ('_sum', '_count'):
+            endpoints[fields['endpoint']]['requests' if suffix == '_count' else 'seconds'] += value
+        elif name == 'view_cache_requests_total':
+            endpoints[fields['endpoint']][fields['result']] += value
+        elif name == 'view_cache_evictions_total':
+            endpoints[fields['endpoint']]['evictions'] += value
+        elif name == 'db_statements_total':
+            endpoints[fields['endpoint']]['statements'] += value
+        elif name in ('template_render_seconds', 'image_processing_seconds', 'outbound_request_seconds') \
+                and suffix in ('_sum', '_count'):
+            timings[(name, next(iter(fields.values()), ''))]['count' if suffix == '_count' else 'seconds'] += value
+
+    def mean_ms(values, count_field):
+        return 1000 * values['seconds'] / values[count_field] if values[count_field] else None
+
+    endpoint_rows = []
+    for endpoint, values in sorted(endpoints.items()):
+        lookups = values['hit'] + values['stale'] + values['miss']
+        endpoint_rows.append({
+            'endpoint': endpoint,
+            'requests': int(values['requests']),
+            'mean_ms': mean_ms(values, 'requests'),
+            'cache_hit_ratio': (values['hit'] + values['stale']) / lookups if lookups else None,
+            'cache_evictions': int(values['evictions']),
+            'statements_per_request': values['statements'] / values['requests'] if values['requests'] else None,
+        })
+    timing_rows = [
+        {'kind': name.rsplit('_', 1)[0].replace('_', ' '), 'label': label,
+         'count': int(values['count']), 'mean_ms': mean_ms(values, 'count')}
+        for (name, label), values in sorted(timings.items())
+    ]
+    return {'endpoints': endpoint_rows, 'timings': timing_rows}
+
+
+def collect():
+    """Summed rows for the whole host, or this process's alone without a store."""
+    if _store is not None:
+        return _store.totals()
+    rows = [(name, labels, suffix, le, value) for name, labels, suffix, le, _, value in _local_samples()]
+    return sorted(rows, key=lambda row: (row[0], row[1]))
+
+
+# ──────────────────────────────────────────────
+#  Instrumentation hooks
+# ──────────────────────────────────────────────
+
+def _count_connection(dbapi_connection, connection_record):
+    inc('db_connections_opened_total')
+
+
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if not started:
+        return
+    endpoint = current_endpoint()
+    inc('db_statements_total', endpoint=endpoint)
+    observe('db_statement_duration_seconds', time.perf_counter() - started.pop(), endpoint=endpoint)
+
+
+def _start_template(app, template, context, **extra):
+    g.setdefault('metrics_templates', []).append(time.perf_counter())
+
+
+def _end_template(app, template, context, **extra):
+    started = g.get('metrics_templates')
+    if started:
+        observe('template_render_seconds', time.perf_counter() - started.pop(), template=template.name)
+
+
+def init_app(app):
+    """Time requests and templates, and flush to the shared file under METRICS_DIR."""
+    global _store
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    _store = MetricsStore(app.config.get('METRICS_DIR') or os.path.join(app.instance_path, 'metrics'))
+
+    # Engine and Pool listeners apply to every engine, so add them only once.
+    if not event.contains(Engine, 'after_cursor_execute', _end_statement):
+        event.listen(Pool, 'connect', _count_connection)
+        event.listen(Engine, 'before_cursor_execute', _start_statement)
+        event.listen(Engine, 'after_cursor_execute', _end_statement)
+
+    before_render_template.connect(_start_template, app)
+    template_rendered.connect(_end_template, app)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('metrics_request_started')
+        if started is not None:
+            observe('http_request_duration_seconds', time.perf_counter() - started,
+                    endpoint=current_endpoint(), method=request.method, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def flush_metrics(exc):
+        try:
+            _store.flush()
+        except sqlite3.Error as e:
+            app.logger.warning(f"Could not write metrics: {e}")
@@ -32,6 +32,9 @@ class Photo(db.Model):
     # Low-Quality Image Placeholder: tiny base64-encoded JPEG data URI
     # Generated during upload, used as blurred placeholder while full image loads
     lqip: so.Mapped[Optional[str]] = so.mapped_column(sa.Text, nullable=True)
+    # Bumped on every change to the row or its gallery/tags (see _touch_updated_at);
+    # the basis of conditional GET validators (app.conditional).
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.now(timezone.utc))
     linked_posts: so.Mapped[list["Post"]] = so.relationship("Post", foreign_keys="Post.photo_id", back_populates="photo")
     linked_projects: so.Mapped[list["Project"]] = so.relationship("Project", foreign_keys="Project.photo_id", back_populates="photo")
     post_gallery_links: so.Mapped[list["PostImage"]] = so.relationship(
@@ -59,6 +62,15 @@ class Project(db.Model):
     date_posted: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), index=True, default=lambda: datetime.now(timezone.utc))
     github_link: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256), nullable=True)
     is_featured: so.Mapped[bool] = so.mapped_column(sa.Boolean, nullable=False, default=False, server_default=sa.false(), index=True)
+    # Bumped on every change to the row or its gallery/tags (see _touch_updated_at);
+    # the basis of conditional GET validators (app.conditional).
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.now(timezone.utc))
+    # Sanitized description HTML, filled on save (see app.helpers.prerender_body).
+    # Deferred so listing queries don't haul it around; detail views undefer it.
+    body_html: so.Mapped[Optional[str]] = so.mapped_column(sa.Text, nullable=True, deferred=True)
+    # Card excerpts keyed by length ({"200": html, "300": html}), same freshness key.
+    excerpt_html: so.Mapped[Optional[dict]] = so.mapped_column(sa.JSON, nullable=True)
+    body_html_key: so.Mapped[Optional[str]] = so.mapped_column(sa.String(80), nullable=True)
     photo_id: so.Mapped[Optional[int]] = so.mapped_column(sa.ForeignKey("photos.id", name=naming_convention["fk"] % {"table_name": "projects", "column_0_name": "photo_id", "referred_table_name": "photos"}, ondelete="SET NULL"), nullable=True, index=True)
     photo: so.Mapped[Optional["Photo"]] = so.relationship("Photo", foreign_keys=[photo_id], back_populates="linked_projects", innerjoin=False)
     items: so.Mapped[list["Post"]] = so.relationship("Post", back_populates="project", cascade="all, delete-orphan")
@@ -86,20 +98,48 @@ class Tag(db.Model):
 class Post(db.Model):
     __tablename__ = "posts"
     id: so.Mapped[int] = so.mapped_column(sa.Integer, primary_key=True)
-    type: so.Mapped[str] = so.mapped_column(sa.String(50), index=True)
+    type: so.Mapped[str] = so.mapped_column(sa.String(50))
     title: so.Mapped[str] = so.mapped_column(sa.String(120), nullable=False)
     content: so.Mapped[Optional[str]] = so.mapped_column(sa.Text, nullable=True)
-    date_posted: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), index=True, default=lambda: datetime.now(timezone.utc))
+    # Indexed with id by ix_posts_feed, the feed's keyset order.
+    date_posted: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     # Scheduling: if set to a future datetime, post is hidden from public until then
-    published_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime(timezone=True), nullable=True, index=True)
+    published_at: so.Mapped[Optional[datetime]] = so.mapped_column(sa.DateTime(timezone=True), nullable=True)
+    # When the post goes (or went) live: published_at, else date_posted. Never
+    # NULL, so published_filter() is one range test the feed indexes can hold.
+    effective_published_at: so.Mapped[datetime] = so.mapped_column(
+        sa.DateTime(timezone=True), sa.Computed("coalesce(published_at, date_posted)", persisted=True), nullable=False
+    )
+    # Bumped on every change to the row or its gallery/tags (see _touch_updated_at);
+    # the basis of conditional GET validators (app.conditional).
+    updated_at: so.Mapped[datetime] = so.mapped_column(sa.DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.now(timezone.utc))
     github_link: so.Mapped[Optional[str]] = so.mapped_column(sa.String(256), nullable=True)
+    # Sanitized content HTML, filled on save (see app.helpers.prerender_body).
+    # Deferred so listing queries don't haul it around; detail views undefer it.
+    body_html: so.Mapped[Optional[str]] = so.mapped_column(sa.Text, nullable=True, deferred=True)
+    # Card excerpts keyed by length ({"200": html, "300": html}), same freshness key.
+    excerpt_html: so.Mapped[Optional[dict]] = so.mapped_column(sa.JSON, nullable=True)
+    body_html_key: so.Mapped[Optional[str]] = so.mapped_column(sa.String(80), nullable=True)
     photo_id: so.Mapped[Optional[int]] = so.mapped_column(sa.ForeignKey("photos.id", name=naming_convention["fk"] % {"table_name": "posts", "column_0_name": "photo_id", "referred_table_name": "photos"}, ondelete="SET NULL"), nullable=True)
     photo: so.Mapped[Optional["Photo"]] = so.relationship("Photo", back_populates="linked_posts", foreign_keys=[photo_id], innerjoin=False)
     project_id: so.Mapped[Optional[int]] = so.mapped_column(sa.ForeignKey("projects.id", name=naming_convention["fk"] % {"table_name": "posts", "column_0_name": "project_id", "referred_table_name": "projects"}, ondelete="SET NULL"), nullable=True, index=True)
     project: so.Mapped[Optional["Project"]] = so.relationship("Project", back_populates="items", foreign_keys=[project_id])
     tags: so.Mapped[list["Tag"]] = so.relationship("Tag", secondary=post_tags, back_populates="posts")
     images: so.Mapped[list["PostImage"]] = so.relationship("PostImage", back_populates="post", cascade="all, delete-orphan", order_by="PostImage.position")
-    __mapper_args__ = {"polymorphic_on": type, "polymorphic_identity": "post", "with_polymorphic": "*"}
+    __table_args__ = (
+        # /api/posts pages by (date_posted, id) cursors, newest first (scanned
+        # backwards); the trailing column answers published_filter() in the index.
+        sa.Index("ix_posts_feed", "date_posted", "id", "effective_published_at"),
+        # The same order within one section, for the section pages.
+        sa.Index("ix_posts_type_feed", "type", "date_posted", "id", "effective_published_at"),
+        # Only scheduled posts; the scheduler's lookups (next_publish_times, _due_posts).
+        sa.Index("ix_posts_scheduled", "published_at", "type",
+                 postgresql_where=sa.text("published_at IS NOT NULL"),
+                 sqlite_where=sa.text("published_at IS NOT NULL")),
+    )
+    # Plain Post queries read the posts table alone; queries whose rows need
+    # subclass columns select from PostWithSubtypes (below) instead.
+    __mapper_args__ = {"polymorphic_on": type, "polymorphic_identity": "post"}
 
 
 class MusicItem(Post):
@@ -200,3 +240,52 @@ class ProjectImage(db.Model):
         sa.CheckConstraint("alignment IN ('left', 'right', 'center', 'full')", name="ck_project_images_alignment"),
         sa.Index("ix_project_images_project_id_position", "project_id", "position"),
     )
+
+
+# ──────────────────────────────────────────────
+#  updated_at maintenance
+# ──────────────────────────────────────────────
+
+@sa.event.listens_for(so.Session, "before_flush")
+def _touch_updated_at(session, flush_context, instances):
+    """Bump updated_at on changed rows, on the parent of a changed gallery row,
+    and on the posts of a renamed or deleted tag.
+
+    Covers collection changes too (tags, gallery images), which emit no UPDATE
+    on the parent row and so would slip past a column onupdate.
+    """
+    now = datetime.now(timezone.utc)
+    touched = set()
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        if isinstance(obj, PostImage):
+            parents = [obj.post or (obj.post_id and session.get(Post, obj.post_id))]
+        elif isinstance(obj, ProjectImage):
+            parents = [obj.project or (obj.project_id and session.get(Project, obj.project_id))]
+        elif isinstance(obj, Tag) and (obj in session.deleted or session.is_modified(obj)):
+            # Every post showing the tag shows its new name, or no longer shows it.
+            parents = obj.posts
+        elif isinstance(obj, (Post, Project, Photo)) and obj in session.dirty and session.is_modified(obj):
+            parents = [obj]
+        else:
+            continue
+        for parent in parents:
+            if parent and parent not in session.deleted and id(parent) not in touched:
+                touched.add(id(parent))
+                parent.updated_at = now
+
+
+@sa.event.listens_for(so.Session, "do_orm_execute")
+def _touch_updated_at_on_bulk_update(orm_execute_state):
+    """Bulk query updates (e.g. Project.query.update(...)) bump updated_at as well."""
+    if not orm_execute_state.is_update:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and 'updated_at' in mapper.local_table.c:
+        orm_execute_state.statement = orm_execute_state.statement.values(
+            updated_at=datetime.now(timezone.utc)
+        )
+
+
+# Post with every subclass table LEFT OUTER JOINed in, so music, video and
+# review columns load with the row instead of by one query per item.
+PostWithSubtypes = so.with_polymorphic(Post, [MusicItem, Video, Review])
@@ -0,0 +1,117 @@
+"""
+Exact-time activation of scheduled posts.
+
+published_filter() hides a post until its published_at, and app.caching caps
+the TTL of cached lists at the next such time. The scheduler puts the rest
+on the same clock: a background thread sleeps until the next published_at,
+then evicts the lists that gain a post ('post' and 'post:<type>': the home
+feed, its section page, /api/posts with any tag filter and the sitemap),
+purges those tags from the CDN and sends content_changed, so the cache
+warmer re-renders them before a visitor asks. Pages that do not list
+published posts are left alone.
+
+start_publish_scheduler() runs it in each Gunicorn worker (see
+gunicorn.conf.py). The thread rereads the schedule at least every
+PUBLISH_SCHEDULE_RECHECK seconds, and at once after a commit in its worker
+changes a post. With a shared cache backend, the first worker to reach a
+publish time handles it and the others find its claim.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+
+from app.caching import (content_changed, invalidate_tags, next_publish_times,
+                         PUBLISH_SCHEDULE_RECHECK)
+from app.conditional import _as_utc
+from app.extensions import cache, db
+
+CLAIM_KEY_PREFIX = 'publishing/'
+# Seconds a claim on one publish time is kept, so slower workers still see it.
+CLAIM_TIMEOUT = 3600
+# Sleep this much past a publish time, so `published_at <= now` already holds.
+WAKE_MARGIN = 0.05
+
+
+def _due_posts(since, until):
+    """(post type, epoch time) of every post whose published_at is in (since, until]."""
+    from app.models import Post
+
+    rows = db.session.execute(
+        sa.select(Post.type, Post.published_at).distinct()
+        .where(Post.published_at > since, Post.published_at <= until)
+    ).all()
+    return {(post_type, _as_utc(published_at).timestamp()) for post_type, published_at in rows}
+
+
+class PublishScheduler:
+    """Evicts one app's cached lists at each scheduled publish time."""
+
+    def __init__(self, app):
+        self.app = app
+        # Posts published before this were handled already (or before the
+        # worker existed, when their lists could not be cached here).
+        self.published_through = datetime.now(timezone.utc)
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='publish-scheduler', daemon=True)
+                self._thread.start()
+
+    def reschedule(self):
+        """Make the thread reread the schedule now."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                delay = self.run_due()
+            except Exception:
+                self.app.logger.exception("Scheduled publish failed")
+                delay = PUBLISH_SCHEDULE_RECHECK
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def run_due(self):
+        """Evict the lists gaining posts since the last run; return seconds to sleep."""
+        now = datetime.now(timezone.utc)
+        with self.app.app_context():
+            tags = set()
+            for post_type, published_at in sorted(_due_posts(self.published_through, now)):
+                claim = f'{CLAIM_KEY_PREFIX}{post_type}@{published_at}'
+                if cache.add(claim, os.getpid(), timeout=CLAIM_TIMEOUT):
+                    tags |= {'post', f'post:{post_type}'}
+            self.published_through = now
+            if tags:
+                invalidate_tags(tags)
+                self.app.logger.info(f"Scheduled posts went live, evicted: {', '.join(sorted(tags))}")
+                content_changed.send(self.app, tags=tags)
+
+            upcoming = next_publish_times().values()
+        if not upcoming:
+            return PUBLISH_SCHEDULE_RECHECK
+        until_next = min(upcoming) - datetime.now(timezone.utc).timestamp() + WAKE_MARGIN
+        return max(0.0, min(PUBLISH_SCHEDULE_RECHECK, until_next))
+
+
+def start_publish_scheduler(app):
+    """Run the publish scheduler in this worker, unless PUBLISH_SCHEDULER is off."""
+    if not app.config.get('PUBLISH_SCHEDULER', True):
+        return None
+    scheduler = app.extensions.get('publish_scheduler')
+    if scheduler is None:
+        scheduler = app.extensions['publish_scheduler'] = PublishScheduler(app)
+    scheduler.start()
+    return scheduler
+
+
+@content_changed.connect
+def _reschedule_after_change(app, tags):
+    scheduler = app.extensions.get('publish_scheduler')
+    if scheduler is not None and any(tag == 'post' or tag.startswith('post:') for tag in tags):
+        scheduler.reschedule()
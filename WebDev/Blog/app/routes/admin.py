@@ -1,12 +1,14 @@
 """Admin/debug routes (all login_required, gated in production)."""
 import os
+import hmac
 import time
 from io import BytesIO
 from PIL import Image, ImageDraw
-from flask import Blueprint, render_template, url_for, redirect, flash, current_app
+from flask import Blueprint, render_template, url_for, redirect, flash, current_app, request, Response
 from flask_login import login_required, current_user
 
-from app.extensions import db, cache
+from app import metrics
+from app.extensions import db, cache, limiter
 from app.models import User, Photo, Post, Project, MusicItem, Video, Review
 from app.helpers import invalidate_content_caches
 from app.utils.image_utils import process_upload_image, USING_SPACES, SPACES_URL, IMAGE_SIZES
@@ -38,7 +40,8 @@ def admin_dashboard():
     return render_template('admin/dashboard.html',
                            counts=counts,
                            recent_posts=recent_posts,
-                           recent_projects=recent_projects)
+                           recent_projects=recent_projects,
+                           metrics=metrics.summary(metrics.collect()))
 
 
 @admin_bp.route('/admin/clear-cache', methods=['POST'])
@@ -50,6 +53,22 @@ def admin_clear_cache():
     return redirect(url_for('admin_dashboard'))
 
 
+@admin_bp.route('/metrics')
+@limiter.exempt
+def prometheus_metrics():
+    """Metrics in Prometheus text format, for admins or `Authorization: Bearer METRICS_TOKEN`."""
+    token = current_app.config.get('METRICS_TOKEN')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (current_user.is_authenticated
+            or (token and hmac.compare_digest(supplied.encode(), token.encode()))):
+        return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'}, mimetype='text/plain')
+
+    response = Response(metrics.render_prometheus(metrics.collect()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
+    response.cache_control.no_store = True
+    return response
+
+
 # ──────────────────────────────────────────────
 #  Debug / Diagnostic Endpoints
 # ──────────────────────────────────────────────
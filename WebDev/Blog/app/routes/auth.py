@@ -1,5 +1,5 @@
 """Authentication routes: login, logout."""
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_user, logout_user, current_user
 from flask_wtf.csrf import generate_csrf
 
@@ -16,10 +16,9 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('index'))
 
-    form = LoginForm()
-
-    if request.method == 'GET':
-        form.csrf_token.data = generate_csrf()
+    # The token field is rendered by _csrf_field.html; building the form's own
+    # on GET would start a session for every anonymous visit to this page.
+    form = LoginForm(meta={'csrf': False}) if request.method == 'GET' else LoginForm()
 
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
@@ -37,3 +36,11 @@ def logout():
     logout_user()
     flash('You have been logged out successfully!', 'success')
     return redirect(url_for('index'))
+
+
+@auth_bp.route('/csrf-token')
+def csrf_token():
+    """Token for forms on cookie-free public pages (static/js/csrf.js); starts the session."""
+    response = jsonify(csrf_token=generate_csrf())
+    response.cache_control.no_store = True
+    return response
@@ -6,26 +6,29 @@ from sqlalchemy.exc import OperationalError
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
-from app.extensions import db, cache, limiter
+from app import metrics
+from app.extensions import db, limiter
+from app.caching import cached_view
 from app.models import Post, Project
-from app.helpers import retry_database_operation, published_filter
+from app.helpers import retry_database_operation, published_filter, feed_page
 
 main_bp = Blueprint('main', __name__)
 
 
 @main_bp.route('/')
-@cache.cached()
+@cached_view('post', 'project', 'photo', 'tag', soft_timeout=300, timeout=3600)
 def index():
     try:
-        posts = retry_database_operation(
-            lambda: published_filter(Post.query).order_by(Post.date_posted.desc()).all()
-        )
+        # The first feed page rides along as inline JSON, so main.js renders
+        # it without a second round trip and scrolls on from its cursor. An
+        # empty page doubles as the "no posts yet" check.
+        first_page = retry_database_operation(feed_page)
         featured_project = Project.query.filter_by(is_featured=True).first()
-        return render_template('index.html', posts=posts, featured_project=featured_project)
+        return render_template('index.html', first_page=first_page, featured_project=featured_project)
     except OperationalError as e:
         current_app.logger.error(f"Database connection error: {str(e)}")
         flash('Database connection issue. Please try again in a moment.', 'error')
-        return render_template('index.html', posts=[])
+        return render_template('index.html', first_page=None)
 
 
 @main_bp.route('/about')
@@ -77,7 +80,8 @@ def contact():
                 reply_to=reply_to, subject=f"Pending Neurascape Transmission: {name}"
             )
 
-            api_response = api_instance.send_transac_email(send_smtp_email)
+            with metrics.timed('outbound_request_seconds', service='brevo'):
+                api_response = api_instance.send_transac_email(send_smtp_email)
             current_app.logger.info(f"Email sent successfully. Message ID: {api_response.message_id}")
 
             # ── Send confirmation to the sender ──
@@ -100,7 +104,8 @@ def contact():
                     reply_to={"email": "faust@benamuwo.me", "name": "Ben Amuwo"},
                     subject="Neurascape — Message received"
                 )
-                api_instance.send_transac_email(confirm_email)
+                with metrics.timed('outbound_request_seconds', service='brevo'):
+                    api_instance.send_transac_email(confirm_email)
                 current_app.logger.info(f"Confirmation email sent to {email}")
             except Exception as confirm_err:
                 # Don't fail the whole request if confirmation email fails
@@ -121,7 +126,7 @@ def contact():
 
 
 @main_bp.route('/sitemap.xml')
-@cache.cached(timeout=3600)
+@cached_view('post', 'project', timeout=3600)
 def sitemap():
     """Generate XML sitemap for search engines."""
     base_url = request.host_url.rstrip('/')
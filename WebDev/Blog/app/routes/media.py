@@ -5,9 +5,10 @@ from flask_login import login_required
 from werkzeug.utils import secure_filename
 from uuid import uuid4
 
-from app.extensions import db, cache
+from app.extensions import db
+from app.caching import cached_view
 from app.models import Photo, Post, Project, MusicItem, Video, Review
-from app.helpers import allowed_file, invalidate_content_caches, handle_image_upload, replace_item_image, published_filter, delete_photo_if_unreferenced, generate_lqip_for, _delete_image_files, MAX_UPLOAD_SIZE, sync_post_images, GalleryValidationError
+from app.helpers import allowed_file, handle_image_upload, replace_item_image, published_filter, post_card_loaders, listing_loaders, delete_photo_if_unreferenced, generate_lqip_for, _delete_image_files, MAX_UPLOAD_SIZE, sync_post_images, GalleryValidationError
 from app.utils.image_utils import process_upload_image
 
 media_bp = Blueprint('media', __name__)
@@ -18,9 +19,11 @@ media_bp = Blueprint('media', __name__)
 # ──────────────────────────────────────────────
 
 @media_bp.route('/photo_album')
-@cache.cached()
+@cached_view('photo', 'post', 'project', soft_timeout=300, timeout=3600)
 def photo_album():
-    photos = Photo.query.all()
+    photos = Photo.query.options(
+        *listing_loaders(db.selectinload(Photo.linked_posts), db.selectinload(Photo.linked_projects))
+    ).all()
     return render_template('photo_album.html', photos=photos)
 
 
@@ -42,7 +45,6 @@ def new_photo():
             return redirect(url_for('new_photo'))
 
         db.session.commit()
-        invalidate_content_caches('photo')
 
         flash('Photo uploaded!', 'success')
         return redirect(url_for('new_photo'))
@@ -73,7 +75,6 @@ def bulk_upload_photos():
                 fail_count += 1
 
         db.session.commit()
-        invalidate_content_caches('photo')
 
         if success_count:
             flash(f'{success_count} photo(s) uploaded successfully.', 'success')
@@ -128,7 +129,6 @@ def edit_photo(photo_id):
             _delete_image_files(old_filename)
 
         db.session.commit()
-        invalidate_content_caches('photo')
         flash('Photo updated!', 'success')
         return redirect(url_for('photo_album'))
 
@@ -147,7 +147,6 @@ def delete_photo(photo_id):
 
     if deleted:
         db.session.commit()
-        invalidate_content_caches('photo')
         flash('Photo deleted successfully', 'success')
     else:
         flash(
@@ -163,9 +162,9 @@ def delete_photo(photo_id):
 # ──────────────────────────────────────────────
 
 @media_bp.route('/music')
-@cache.cached()
+@cached_view('post:music_item', 'project', 'photo', soft_timeout=300, timeout=3600)
 def music():
-    items = published_filter(MusicItem.query).order_by(MusicItem.date_posted.desc()).all()
+    items = published_filter(MusicItem.query, 'music_item').options(*post_card_loaders()).order_by(MusicItem.date_posted.desc()).all()
     return render_template('music.html', items=items)
 
 
@@ -207,7 +206,6 @@ def new_music_item():
                 music_item.photo_id = photo.id
 
         db.session.commit()
-        invalidate_content_caches('music_item')
         flash('Music item added!', 'success')
         return redirect(url_for('music'))
 
@@ -246,7 +244,6 @@ def edit_music_item(item_id):
             replace_item_image(item, image_file, description=f"Cover for {item.title}")
 
         db.session.commit()
-        invalidate_content_caches('music_item')
         flash('Music item updated!', 'success')
         return redirect(url_for('post', post_id=item.id))
 
@@ -259,9 +256,9 @@ def edit_music_item(item_id):
 # ──────────────────────────────────────────────
 
 @media_bp.route('/videos')
-@cache.cached()
+@cached_view('post:video', 'project', 'photo', soft_timeout=300, timeout=3600)
 def videos():
-    video_items = published_filter(Video.query).order_by(Video.date_posted.desc()).all()
+    video_items = published_filter(Video.query, 'video').options(*post_card_loaders()).order_by(Video.date_posted.desc()).all()
     return render_template('videos.html', videos=video_items)
 
 
@@ -299,7 +296,6 @@ def new_video_item():
                 video_item.photo_id = photo.id
 
         db.session.commit()
-        invalidate_content_caches('video')
         flash('Video item added!', 'success')
         return redirect(url_for('videos'))
 
@@ -332,7 +328,6 @@ def edit_video_item(item_id):
             replace_item_image(item, image_file, description=f"Thumbnail for {item.title}")
 
         db.session.commit()
-        invalidate_content_caches('video')
         flash('Video updated!', 'success')
         return redirect(url_for('post', post_id=item.id))
 
@@ -344,9 +339,9 @@ def edit_video_item(item_id):
 # ──────────────────────────────────────────────
 
 @media_bp.route('/reviews')
-@cache.cached()
+@cached_view('post:review', 'project', 'photo', soft_timeout=300, timeout=3600)
 def reviews():
-    review_items = published_filter(Review.query).order_by(Review.date_posted.desc()).all()
+    review_items = published_filter(Review.query, 'review').options(*post_card_loaders()).order_by(Review.date_posted.desc()).all()
     return render_template('reviews.html', reviews=review_items)
 
 
@@ -391,7 +386,6 @@ def new_review():
                 review_item.photo_id = photo.id
 
         db.session.commit()
-        invalidate_content_caches('review')
         flash('Review added!', 'success')
         return redirect(url_for('reviews'))
 
@@ -434,7 +428,6 @@ def edit_review(item_id):
             replace_item_image(item, image_file, description=f"Cover for {item.item_title}")
 
         db.session.commit()
-        invalidate_content_caches('review')
         flash('Review updated!', 'success')
         return redirect(url_for('post', post_id=item.id))
 
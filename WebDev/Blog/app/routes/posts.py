@@ -7,9 +7,10 @@ from werkzeug.utils import secure_filename
 from uuid import uuid4
 
 from app.extensions import db
-from app.models import Post, Photo, Project
+from app.caching import cached_view, add_surrogate_keys
+from app.models import Post, PostWithSubtypes, Photo, Project
 from app.helpers import (
-    allowed_file, invalidate_content_caches, handle_image_upload,
+    allowed_file, handle_image_upload,
     replace_item_image, sync_tags, sync_post_images, GalleryValidationError
 )
 from app.utils.image_utils import process_upload_image
@@ -18,11 +19,24 @@ posts_bp = Blueprint('posts', __name__)
 
 
 @posts_bp.route('/post/<int:post_id>')
+@cached_view('post/{post_id}', versioned=True, timeout=3600)
 def post(post_id):
-    post_item = db.session.get(Post, post_id)
+    # The detail templates show subclass fields, so join their tables.
+    post_item = (
+        db.session.query(PostWithSubtypes)
+        .options(db.undefer(PostWithSubtypes.body_html))
+        .filter(PostWithSubtypes.id == post_id)
+        .one_or_none()
+    )
     if not post_item:
         return redirect(url_for('page_not_found_error', path=f'post/{post_id}'))
 
+    # Rows the page shows besides the post itself, for CDN purging.
+    photo_ids = {post_item.photo_id, *(image.photo_id for image in post_item.images)} - {None}
+    add_surrogate_keys(*(f'photo/{photo_id}' for photo_id in photo_ids))
+    if post_item.project_id:
+        add_surrogate_keys(f'project/{post_item.project_id}')
+
     if post_item.type == 'music_item':
         return render_template('music_item_detail.html', item=post_item)
     elif post_item.type == 'video':
@@ -87,7 +101,6 @@ def new_post():
         sync_tags(post_obj, request.form.get('tags', ''))
 
         db.session.commit()
-        invalidate_content_caches('post')
         flash('Post created!', 'success')
         return redirect(url_for('index'))
 
@@ -137,7 +150,6 @@ def edit_post(post_id):
             replace_item_image(post_obj, image_file, description=post_obj.title)
 
         db.session.commit()
-        invalidate_content_caches('post')
         flash('Post updated!', 'success')
         return redirect(url_for('post', post_id=post_obj.id))
 
@@ -157,7 +169,6 @@ def delete_post(post_id):
     post_type = post_obj.type
     db.session.delete(post_obj)
     db.session.commit()
-    invalidate_content_caches(post_type)
 
     flash(f'{post_type.capitalize()} deleted successfully', 'success')
     return redirect(url_for('index'))
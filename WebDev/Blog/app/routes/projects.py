@@ -5,11 +5,13 @@ from flask_login import login_required
 from werkzeug.utils import secure_filename
 from uuid import uuid4
 
-from app.extensions import db, cache
+from app.extensions import db
+from app.caching import cached_view, add_surrogate_keys
 from app.models import Project, Photo
 from app.helpers import (
-    allowed_file, invalidate_content_caches, handle_image_upload,
-    replace_item_image, sync_project_images, GalleryValidationError
+    allowed_file, handle_image_upload,
+    replace_item_image, sync_project_images, GalleryValidationError,
+    post_card_loaders, project_card_loaders,
 )
 from app.utils.image_utils import process_upload_image
 
@@ -17,10 +19,10 @@ projects_bp = Blueprint('projects_bp', __name__)
 
 
 @projects_bp.route('/projects')
-@cache.cached()
+@cached_view('project', 'photo', soft_timeout=300, timeout=3600)
 def projects():
     try:
-        projects_list = Project.query.order_by(Project.date_posted.desc()).all()
+        projects_list = Project.query.options(*project_card_loaders()).order_by(Project.date_posted.desc()).all()
         current_app.logger.info(f"Retrieved {len(projects_list)} projects")
         for project in projects_list:
             current_app.logger.info(f"Project ID: {project.id}, Title: {project.title}, Image: {project.photo_id}")
@@ -32,10 +34,20 @@ def projects():
 
 
 @projects_bp.route('/project/<int:project_id>')
+@cached_view('project/{project_id}', versioned=True, timeout=3600)
 def project_detail(project_id):
-    project = db.session.get(Project, project_id)
+    project = db.session.get(Project, project_id, options=project_card_loaders(
+        db.undefer(Project.body_html),
+        db.selectinload(Project.items).options(*post_card_loaders()),
+    ))
     if not project:
         return redirect(url_for('page_not_found_error', path=f'project/{project_id}'))
+    # Photos the page shows, its items' included, for CDN purging.
+    photo_ids = {project.photo_id, *(image.photo_id for image in project.images)}
+    for item in project.items:
+        photo_ids.update([item.photo_id, *(image.photo_id for image in item.images)])
+    photo_ids.discard(None)
+    add_surrogate_keys(*(f'photo/{photo_id}' for photo_id in photo_ids))
     return render_template('project_detail.html', project=project)
 
 
@@ -67,7 +79,6 @@ def new_project():
                     project.photo = photo
 
             db.session.commit()
-            invalidate_content_caches('project')
             flash('Project created!', 'success')
             return redirect(url_for('projects'))
 
@@ -106,7 +117,6 @@ def edit_project(project_id):
             replace_item_image(project, image_file, description=f"Cover for {project.title}")
 
         db.session.commit()
-        invalidate_content_caches('project')
         flash('Project updated!', 'success')
         return redirect(url_for('project_detail', project_id=project.id))
 
@@ -120,7 +130,6 @@ def set_featured_project(project_id):
     Project.query.update({'is_featured': False})
     project.is_featured = True
     db.session.commit()
-    invalidate_content_caches('project')
     flash(f'"{project.title}" is now featured on the Home Page!', 'success')
     return redirect(url_for('projects'))
 
@@ -130,7 +139,6 @@ def set_featured_project(project_id):
 def unset_featured_project():
     Project.query.update({'is_featured': False})
     db.session.commit()
-    invalidate_content_caches('project')
     flash('Featured project removed', 'success')
     return redirect(url_for('projects'))
 
@@ -144,6 +152,5 @@ def delete_project(project_id):
         return redirect(url_for('projects'))
     db.session.delete(project)
     db.session.commit()
-    invalidate_content_caches('project')
     flash('Project and all associated items deleted successfully', 'success')
     return redirect(url_for('projects'))
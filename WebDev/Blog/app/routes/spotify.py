@@ -5,6 +5,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 import requests as http_requests
 from urllib.parse import urlencode
 
+from app import metrics
 from app.helpers import SPOTIFY_AUTH_URL, SPOTIFY_TOKEN_URL, VISITOR_SPOTIFY_SCOPES
 
 spotify_bp = Blueprint('spotify', __name__)
@@ -64,7 +65,8 @@ def exchange_visitor_code():
     headers = {"Authorization": f"Basic {b64_auth_str}"}
 
     try:
-        post_request = http_requests.post(SPOTIFY_TOKEN_URL, data=payload, headers=headers)
+        with metrics.timed('outbound_request_seconds', service='spotify'):
+            post_request = http_requests.post(SPOTIFY_TOKEN_URL, data=payload, headers=headers)
         post_request.raise_for_status()
         token_info = post_request.json()
         return jsonify({
@@ -94,7 +96,8 @@ def refresh_visitor_token():
     headers = {"Authorization": f"Basic {b64_auth_str}"}
 
     try:
-        r = http_requests.post(SPOTIFY_TOKEN_URL, data=payload, headers=headers)
+        with metrics.timed('outbound_request_seconds', service='spotify'):
+            r = http_requests.post(SPOTIFY_TOKEN_URL, data=payload, headers=headers)
         r.raise_for_status()
         token_info = r.json()
         return jsonify({
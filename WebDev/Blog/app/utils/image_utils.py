@@ -4,7 +4,9 @@ from io import BytesIO
 import re
 from werkzeug.utils import secure_filename
 from .s3_utils import upload_file, get_bucket
+from app import metrics
 import traceback
+from functools import lru_cache
 
 # Define max dimensions for different image sizes
 IMAGE_SIZES = {
@@ -187,7 +189,9 @@ def process_upload_image(uploaded_file, upload_folder, filename=None):
                         size_path = f"{size}/{filename}"
                         print(f"Processing {size} for DO Spaces: {size_path}")
 
-                        if optimize_image(img, size_path, dimensions):
+                        with metrics.timed('image_processing_seconds', tier=size):
+                            saved = optimize_image(img, size_path, dimensions)
+                        if saved:
                             # Store the relative path to be used in templates
                             paths[size] = f"{size}/{filename}"
                             print(f"Successfully saved {size} to Spaces")
@@ -197,7 +201,9 @@ def process_upload_image(uploaded_file, upload_folder, filename=None):
                         size_path = os.path.join(upload_folder, size, filename)
                         print(f"Processing size {size} to path: {size_path}")
 
-                        if optimize_image(img, size_path, dimensions):
+                        with metrics.timed('image_processing_seconds', tier=size):
+                            saved = optimize_image(img, size_path, dimensions)
+                        if saved:
                             # Store the relative path to be used in templates
                             paths[size] = os.path.join(size, filename)
                             print(f"Successfully saved {size} version to {size_path}")
@@ -252,6 +258,7 @@ def get_srcset(filename):
     return ", ".join(srcset)
 
 
+@lru_cache(maxsize=4096)
 def get_picture_data(filename, lqip=None):
     """Return structured data for rendering a <picture> element with WebP + fallback.
 
@@ -266,7 +273,9 @@ def get_picture_data(filename, lqip=None):
         - has_webp: bool indicating if WebP variants exist
         - lqip: base64 data URI placeholder, or empty string
 
-    Templates use this via the _responsive_image.html partial.
+    Templates use this via the _responsive_image.html macro. Results are
+    memoized (URLs depend only on the arguments and the Spaces config fixed at
+    import), so the returned dict is shared and must not be mutated.
     """
     if not filename:
         return {'src': '', 'srcset': '', 'webp_srcset': '', 'has_webp': False, 'lqip': ''}
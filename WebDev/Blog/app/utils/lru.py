@@ -0,0 +1,105 @@
+"""
+In-process LRU cache for derived rendering artefacts.
+
+Used where the value is a pure function of its key (e.g. sanitized HTML for a
+Markdown block hash), so entries never need invalidating, only evicting.
+Thread-safe; keeps hit/miss counters for benchmarks and diagnostics.
+get_or_compute() coalesces concurrent misses on one key into one computation.
+"""
+import threading
+from collections import OrderedDict
+
+from app.utils.single_flight import SingleFlight
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry when full.
+
+    With `maxbytes`, the total len() of the stored values is bounded too, and
+    a value larger than that on its own is returned but not stored.
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return the cached value for `key` (marking it recently used), else `default`."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling compute() and storing it on a miss.
+
+        Threads that miss the same key while it is being computed wait for
+        that result rather than computing it again.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def compute_and_store():
+            # A leader that finished just before we got here already stored it.
+            with self._lock:
+                value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                value = compute()
+                self.set(key, value)
+            return value
+
+        value, _ = self._flight.do(key, compute_and_store)
+        return value
+
+    def set(self, key, value):
+        size = len(value) if self.maxbytes is not None else 0
+        with self._lock:
+            old = self._data.pop(key, _MISSING)
+            if old is not _MISSING and self.maxbytes is not None:
+                self._bytes -= len(old)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+                _, evicted = self._data.popitem(last=False)
+                if self.maxbytes is not None:
+                    self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+        self._flight.reset_stats()
+
+    def stats(self):
+        """Return counters as a dict: hits, misses, size, maxsize, bytes, maxbytes, coalesced."""
+        with self._lock:
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'bytes': self._bytes,
+                'maxbytes': self.maxbytes,
+            }
+        stats['coalesced'] = self._flight.stats()['coalesced']
+        return stats
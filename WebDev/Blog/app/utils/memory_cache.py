@@ -0,0 +1,191 @@
+"""
+In-process Flask-Caching backend bounded by bytes rather than entry count.
+
+SimpleCache caps the number of entries, so a crawler walking /api/posts
+offsets (one entry per query string) can push the homepage out however small
+those entries are. This backend charges each entry its pickled size, evicts
+the least recently used entries once CACHE_MAX_BYTES is exceeded, and keeps
+counters per key prefix ('view', 'tags', ...) to show which kind of entry is
+crowding out the others.
+
+Keys under `pinned_prefixes` (the tag registry and the render claims of
+app.caching) are kept outside the budget and never evicted: a registry entry
+evicted while the pages it lists stay cached would leave those pages beyond
+the reach of invalidation. They are small, and expire or are deleted on
+their own.
+
+Page bodies arrive here already gzip-compressed by app.caching, so entries
+are not compressed again.
+
+Enable with:
+    CACHE_TYPE = 'app.utils.memory_cache.MemoryBudgetCache'
+"""
+import time
+import pickle
+import threading
+from collections import OrderedDict, defaultdict
+
+from flask_caching.backends.base import BaseCache
+
+# Bookkeeping charged per entry on top of its key and pickled value.
+ENTRY_OVERHEAD = 100
+# Drop expired pinned entries every this many pinned writes.
+PINNED_SWEEP_INTERVAL = 100
+
+
+def key_prefix(key):
+    """Statistics bucket for `key`: the text before its first '/'."""
+    prefix, sep, _ = key.partition('/')
+    return prefix if sep else '(other)'
+
+
+class MemoryBudgetCache(BaseCache):
+    """LRU cache holding at most `max_bytes` of pickled values in this process."""
+
+    def __init__(self, default_timeout=300, max_bytes=64 * 1024 * 1024, pinned_prefixes=()):
+        super().__init__(default_timeout=default_timeout)
+        self.max_bytes = max_bytes
+        self.pinned_prefixes = tuple(pinned_prefixes)
+        self.bytes = 0
+        self._data = OrderedDict()  # key -> (expires, blob, size)
+        self._pinned = {}  # the same, for pinned keys; outside the budget
+        self._pinned_writes = 0
+        self._lock = threading.Lock()
+        self._prefix_stats = defaultdict(lambda: dict.fromkeys(
+            ('hits', 'misses', 'sets', 'evictions', 'rejected', 'entries', 'bytes'), 0))
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        from app.caching import TAG_KEY_PREFIX, COMPUTING_KEY_PREFIX, REFRESH_KEY_PREFIX
+
+        kwargs.update(
+            max_bytes=config.get('CACHE_MAX_BYTES', 64 * 1024 * 1024),
+            pinned_prefixes=(TAG_KEY_PREFIX, COMPUTING_KEY_PREFIX, REFRESH_KEY_PREFIX),
+        )
+        return cls(*args, **kwargs)
+
+    # ── helpers ───────────────────────────────
+
+    def _expiry(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout else 0
+
+    def _pinned_key(self, key):
+        return key.startswith(self.pinned_prefixes)
+
+    def _table(self, key):
+        return self._pinned if self._pinned_key(key) else self._data
+
+    def _remove(self, key, evicted=False):
+        """Drop `key` (lock held) and return whether it was present."""
+        pinned = self._pinned_key(key)
+        entry = (self._pinned if pinned else self._data).pop(key, None)
+        if entry is None:
+            return False
+        stats = self._prefix_stats[key_prefix(key)]
+        stats['entries'] -= 1
+        stats['bytes'] -= entry[2]
+        if evicted:
+            stats['evictions'] += 1
+        if not pinned:
+            self.bytes -= entry[2]
+        return True
+
+    def _sweep_pinned(self):
+        """Drop expired pinned entries (lock held); nothing else ever evicts them."""
+        now = time.time()
+        for key in [key for key, entry in self._pinned.items() if entry[0] and entry[0] <= now]:
+            self._remove(key)
+
+    def _live_entry(self, key):
+        """The entry for `key` if present and unexpired (lock held)."""
+        entry = self._table(key).get(key)
+        if entry is not None and entry[0] and entry[0] <= time.time():
+            self._remove(key)
+            entry = None
+        return entry
+
+    # ── BaseCache interface ───────────────────
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live_entry(key)
+            stats = self._prefix_stats[key_prefix(key)]
+            if entry is None:
+                stats['misses'] += 1
+                return None
+            if not self._pinned_key(key):
+                self._data.move_to_end(key)
+            stats['hits'] += 1
+            blob = entry[1]
+        # Unpickled per read so callers never share one mutable object.
+        return pickle.loads(blob)
+
+    def has(self, key):
+        with self._lock:
+            return self._live_entry(key) is not None
+
+    def _store(self, key, value, timeout):
+        """Insert `key` (lock held), evicting LRU entries past the budget."""
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        size = len(blob) + len(key) + ENTRY_OVERHEAD
+        stats = self._prefix_stats[key_prefix(key)]
+        self._remove(key)
+        if self._pinned_key(key):
+            self._pinned[key] = (self._expiry(timeout), blob, size)
+            stats['sets'] += 1
+            stats['entries'] += 1
+            stats['bytes'] += size
+            self._pinned_writes += 1
+            if not self._pinned_writes % PINNED_SWEEP_INTERVAL:
+                self._sweep_pinned()
+            return True
+        if size > self.max_bytes:
+            stats['rejected'] += 1
+            return False
+        self._data[key] = (self._expiry(timeout), blob, size)
+        self.bytes += size
+        stats['sets'] += 1
+        stats['entries'] += 1
+        stats['bytes'] += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._data)), evicted=True)
+        return True
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            return self._store(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            if self._live_entry(key) is not None:
+                return False
+            return self._store(key, value, timeout)
+
+    def delete(self, key):
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pinned.clear()
+            self.bytes = 0
+            for stats in self._prefix_stats.values():
+                stats['entries'] = stats['bytes'] = 0
+        return True
+
+    def stats(self):
+        """Totals plus per-prefix hits, misses, sets, evictions, rejected, entries and bytes.
+
+        'bytes' and 'entries' cover the budgeted entries; pinned ones are
+        counted under their prefixes and in 'pinned_entries'.
+        """
+        with self._lock:
+            return {
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'entries': len(self._data),
+                'pinned_entries': len(self._pinned),
+                'prefixes': {prefix: dict(stats) for prefix, stats in self._prefix_stats.items()},
+            }
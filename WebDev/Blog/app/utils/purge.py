@@ -0,0 +1,135 @@
+"""
+CDN purge backends.
+
+Cached public responses carry Surrogate-Key and Cache-Tag headers that name
+the cache tags they depend on, and an edge lifetime in Surrogate-Control and
+CDN-Cache-Control (see app.caching). When a commit evicts tags from the view
+cache, the same tags are purged from the CDN, so a CDN can keep pages for
+that lifetime and edits still show up at once. PURGE_BACKEND picks the
+backend:
+
+    'null'       does nothing (default: no CDN in front of the app)
+    'http'       POSTs the keys as JSON to PURGE_URL
+    'recording'  keeps every call in memory, for tests and local checks
+
+It can also be a dotted path to a class with the same interface: purge(keys),
+purge_all() and a factory(app) classmethod.
+"""
+import threading
+
+import requests
+from flask import current_app
+from werkzeug.utils import import_string
+
+
+class NullPurgeBackend:
+    """Purges nothing."""
+
+    @classmethod
+    def factory(cls, app):
+        return cls()
+
+    def purge(self, keys):
+        pass
+
+    def purge_all(self):
+        pass
+
+
+class RecordingPurgeBackend:
+    """Remembers every purge instead of sending it anywhere."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, app):
+        return cls()
+
+    def purge(self, keys):
+        with self._lock:
+            self.calls.append(('purge', sorted(keys)))
+
+    def purge_all(self):
+        with self._lock:
+            self.calls.append(('purge_all', None))
+
+    def purged_keys(self):
+        """Every key purged so far."""
+        with self._lock:
+            return {key for action, keys in self.calls if action == 'purge' for key in keys}
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+
+
+class HTTPPurgeBackend:
+    """POSTs `{key_field: [keys...]}`, or `{"purge_everything": true}`, to a purge URL.
+
+    Matches Cloudflare's purge_cache API with PURGE_KEY_FIELD='tags'; other
+    CDNs can sit behind a small proxy that accepts this body. The token goes
+    in an `Authorization: Bearer` header. Failures are logged, not raised: a
+    CDN outage must not fail the commit that triggered the purge.
+    """
+
+    def __init__(self, url, token=None, key_field='keys', batch_size=30, timeout=5, logger=None):
+        self.url = url
+        self.token = token
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.logger = logger
+        self._session = requests.Session()
+
+    @classmethod
+    def factory(cls, app):
+        if not app.config.get('PURGE_URL'):
+            raise ValueError("PURGE_BACKEND='http' needs PURGE_URL")
+        return cls(
+            app.config['PURGE_URL'],
+            token=app.config.get('PURGE_TOKEN'),
+            key_field=app.config.get('PURGE_KEY_FIELD', 'keys'),
+            logger=app.logger,
+        )
+
+    def _post(self, payload):
+        headers = {'Authorization': f'Bearer {self.token}'} if self.token else {}
+        try:
+            response = self._session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if self.logger:
+                self.logger.error(f"CDN purge failed: {e}")
+
+    def purge(self, keys):
+        keys = sorted(keys)
+        # CDNs cap the number of tags per purge call (Cloudflare: 30).
+        for start in range(0, len(keys), self.batch_size):
+            self._post({self.key_field: keys[start:start + self.batch_size]})
+
+    def purge_all(self):
+        self._post({'purge_everything': True})
+
+
+PURGE_BACKENDS = {
+    'null': NullPurgeBackend,
+    'http': HTTPPurgeBackend,
+    'recording': RecordingPurgeBackend,
+}
+
+_null_backend = NullPurgeBackend()
+
+
+def init_purge_backend(app):
+    """Create the backend named by PURGE_BACKEND; fails at startup on a bad name."""
+    name = app.config.get('PURGE_BACKEND') or 'null'
+    backend_cls = PURGE_BACKENDS.get(name) or import_string(name)
+    app.extensions['purge_backend'] = backend_cls.factory(app)
+    return app.extensions['purge_backend']
+
+
+def purge_backend():
+    """The current app's purge backend (a no-op if none was set up)."""
+    return current_app.extensions.get('purge_backend', _null_backend)
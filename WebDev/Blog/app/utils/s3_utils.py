@@ -2,6 +2,8 @@ import os
 import boto3
 from botocore.client import Config
 
+from app import metrics
+
 # Cache the S3 client to avoid creating it multiple times
 _s3_resource = None
 _bucket = None
@@ -75,7 +77,8 @@ def upload_file(file_obj, path, content_type=None, acl='public-read'):
             print(f"Extra args: {extra_args}")
 
             # Try to upload
-            result = bucket.upload_fileobj(file_obj, path, ExtraArgs=extra_args)
+            with metrics.timed('outbound_request_seconds', service='s3'):
+                result = bucket.upload_fileobj(file_obj, path, ExtraArgs=extra_args)
             print(f"Upload successful, result: {result}")
 
             # Verify the upload by checking if the file exists
@@ -0,0 +1,237 @@
+"""
+Flask-Caching backend shared by every worker process on one host.
+
+Entries live in a SQLite database in WAL mode, so readers never block each
+other and one writer at a time does not block readers. A small in-process LRU
+tier in front of it serves hot keys without touching SQLite.
+
+Only keys under `local_prefixes` (the cached responses, 'view/') use the
+tier. Claims, the tag registry and other coordination keys change on every
+miss and are always read from SQLite, so they stay out of the scheme below.
+
+Cross-process invalidation uses a generation counter in a memory-mapped file.
+Every write that can make another worker's tiered copy stale (overwriting or
+deleting a live tiered key, clear, pruning) bumps the counter after the
+SQLite write. Each process checks the counter before using its LRU tier and
+drops the tier when it has moved. Adding a brand-new key does not bump it,
+since no other process can hold a copy of that key.
+
+Enable with:
+    CACHE_TYPE = 'app.utils.shared_cache.SharedFileCache'
+Files go in CACHE_DIR, defaulting to <instance path>/cache.
+"""
+import os
+import time
+import mmap
+import fcntl
+import pickle
+import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
+
+from flask_caching.backends.base import BaseCache
+
+from app.utils.lru import LRUCache
+
+_GENERATION = struct.Struct('Q')
+# Check for expired rows every this many writes.
+PRUNE_INTERVAL = 100
+
+
+class SharedFileCache(BaseCache):
+    """SQLite-WAL cache with a per-process LRU tier and an mmap generation counter."""
+
+    def __init__(self, path, default_timeout=300, threshold=500, local_size=256, local_prefixes=('',),
+                 ignore_errors=False):
+        super().__init__(default_timeout=default_timeout)
+        self.ignore_errors = ignore_errors
+        self.path = path
+        self.threshold = threshold
+        self.local_prefixes = tuple(local_prefixes)
+        os.makedirs(path, exist_ok=True)
+        self._db_path = os.path.join(path, 'cache.sqlite3')
+        self._local = LRUCache(local_size)
+        self._local_generation = None
+        self._thread = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._generation_lock = threading.Lock()
+        self._pid = None
+        self._open_shared_files()
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' key TEXT PRIMARY KEY, expires REAL NOT NULL, value BLOB NOT NULL)'
+            )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        from app.caching import VIEW_KEY_PREFIX
+
+        kwargs.update(
+            path=config.get('CACHE_DIR') or os.path.join(app.instance_path, 'cache'),
+            threshold=config['CACHE_THRESHOLD'],
+            local_size=config.get('CACHE_LOCAL_SIZE', 256),
+            local_prefixes=(VIEW_KEY_PREFIX,),
+            ignore_errors=config['CACHE_IGNORE_ERRORS'],
+        )
+        return cls(*args, **kwargs)
+
+    # ── process-shared state ──────────────────
+
+    def _open_shared_files(self):
+        """(Re)open the generation map and lock file; needed again after fork."""
+        self._generation_file = open(os.path.join(self.path, 'generation'), 'a+b')
+        if os.fstat(self._generation_file.fileno()).st_size < _GENERATION.size:
+            self._generation_file.truncate(_GENERATION.size)
+        self._generation_map = mmap.mmap(self._generation_file.fileno(), _GENERATION.size)
+        self._lock_file = open(os.path.join(self.path, 'lock'), 'a+b')
+        self._pid = os.getpid()
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._thread = threading.local()
+            self._open_shared_files()
+
+    def _connection(self):
+        self._check_fork()
+        conn = getattr(self._thread, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._thread.conn = conn
+        return conn
+
+    def generation(self):
+        return _GENERATION.unpack_from(self._generation_map, 0)[0]
+
+    def _bump_generation(self):
+        # Its own lock, not lock(): writes happen while callers hold lock().
+        with self._generation_lock:
+            fcntl.flock(self._generation_file, fcntl.LOCK_EX)
+            try:
+                _GENERATION.pack_into(self._generation_map, 0, self.generation() + 1)
+            finally:
+                fcntl.flock(self._generation_file, fcntl.LOCK_UN)
+        self._local.clear()
+
+    @contextmanager
+    def lock(self):
+        """Exclusive lock across threads and worker processes on this host."""
+        self._check_fork()
+        with self._lock:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _local_tier(self):
+        """The LRU tier, emptied first if another process has invalidated entries."""
+        current = self.generation()
+        if current != self._local_generation:
+            self._local.clear()
+            self._local_generation = current
+        return self._local
+
+    # ── helpers ───────────────────────────────
+
+    def _tiered(self, key):
+        return key.startswith(self.local_prefixes)
+
+    def _expiry(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout else 0
+
+    @staticmethod
+    def _live(expires, now=None):
+        return expires == 0 or expires > (now or time.time())
+
+    def _prune(self, conn):
+        self._writes += 1
+        if self._writes % PRUNE_INTERVAL:
+            return
+        conn.execute('DELETE FROM cache WHERE expires != 0 AND expires <= ?', (time.time(),))
+        (count,) = conn.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count > self.threshold:
+            conn.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY expires = 0, expires LIMIT ?)',
+                (count - self.threshold,),
+            )
+            self._bump_generation()
+
+    # ── BaseCache interface ───────────────────
+
+    def get(self, key):
+        local = self._local_tier() if self._tiered(key) else None
+        entry = local.get(key) if local is not None else None
+        if entry is None or not self._live(entry[0]):
+            row = self._connection().execute(
+                'SELECT expires, value FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            entry = (row[0], row[1])
+            if local is not None:
+                local.set(key, entry)
+        expires, blob = entry
+        # Unpickled per read so callers never share one mutable object.
+        return pickle.loads(blob) if self._live(expires) else None
+
+    def has(self, key):
+        local = self._local_tier() if self._tiered(key) else None
+        entry = local.get(key) if local is not None else None
+        if entry is None:
+            entry = self._connection().execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+        return entry is not None and self._live(entry[0])
+
+    def set(self, key, value, timeout=None):
+        expires = self._expiry(timeout)
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)',
+                         (key, expires, blob))
+        if self._tiered(key):
+            if row is not None and self._live(row[0]):
+                self._bump_generation()
+            self._local_tier().set(key, (expires, blob))
+        self._prune(conn)
+        return True
+
+    def add(self, key, value, timeout=None):
+        expires = self._expiry(timeout)
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._live(row[0]):
+                return False
+            conn.execute('INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)',
+                         (key, expires, blob))
+        if self._tiered(key):
+            self._local_tier().set(key, (expires, blob))
+        return True
+
+    def delete(self, key):
+        conn = self._connection()
+        deleted = conn.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount > 0
+        if deleted and self._tiered(key):
+            self._bump_generation()
+        return deleted
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+        self._bump_generation()
+        return True
+
+    def stats(self):
+        """In-process tier counters plus the shared row count and generation."""
+        (rows,) = self._connection().execute('SELECT COUNT(*) FROM cache').fetchone()
+        return {**self._local.stats(), 'shared_rows': rows, 'generation': self.generation()}
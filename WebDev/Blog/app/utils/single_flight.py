@@ -0,0 +1,76 @@
+"""
+Per-key single-flight: coalesce concurrent computations of the same value.
+
+When several threads miss the same cache key at once, the first one (the
+leader) computes while the others wait for it and share its result instead of
+repeating the work. A waiter that times out, or whose leader raised, computes
+for itself, so a stuck or failing leader never blocks readers for long.
+Thread-safe; keeps counters for benchmarks and diagnostics.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time within this process."""
+
+    def __init__(self, wait_timeout=5.0):
+        self.wait_timeout = wait_timeout
+        self.computed = 0
+        self.coalesced = 0
+        self.timed_out = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute):
+        """Return (value, shared): `shared` is True when another thread computed it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.value = compute()
+                return call.value, False
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    self.computed += 1
+                    del self._calls[key]
+                call.done.set()
+
+        if call.done.wait(self.wait_timeout) and not call.failed:
+            with self._lock:
+                self.coalesced += 1
+            return call.value, True
+        with self._lock:
+            self.timed_out += 1
+        return compute(), False
+
+    def reset_stats(self):
+        with self._lock:
+            self.computed = 0
+            self.coalesced = 0
+            self.timed_out = 0
+
+    def stats(self):
+        """Return counters as a dict: computed, coalesced, timed_out, in_flight."""
+        with self._lock:
+            return {
+                'computed': self.computed,
+                'coalesced': self.coalesced,
+                'timed_out': self.timed_out,
+                'in_flight': len(self._calls),
+            }
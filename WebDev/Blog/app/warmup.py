@@ -0,0 +1,225 @@
+"""
+Cache warm-up for public pages.
+
+When an admin saves something, dependency tracking (app.caching) evicts the
+affected views, and the next visitor would pay for the cold render. Every
+freshly booted worker also starts with empty caches, which on Neon can add to
+a database wake-up. The warmer requests the public pages through the test
+client from a background thread, so those renders happen before a visitor
+asks:
+
+    section pages   index, projects, photo_album, music, videos, reviews, sitemap
+    /api/posts      the CACHE_WARMUP_API_PAGES pages after the one the index
+                    embeds, with the cursors main.js will send
+    detail pages    this worker's CACHE_WARMUP_DETAIL_PAGES most visited posts and
+                    projects, topped up with the newest ones
+
+A page that is still cached costs one cache hit, so every pass walks the
+whole list. At most CACHE_WARMUP_CONCURRENCY pages render at once, so a pass
+never takes over the database pool.
+
+Warming is enabled per worker by start_warmup(), which the Gunicorn
+post_worker_init hook calls (see gunicorn.conf.py). After that, every commit
+that evicts cached views schedules a pass. Other processes that create the app
+(CLI commands, benchmarks) never warm in the background. `flask content warm`
+runs one pass in the foreground and prints its timing report.
+"""
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from flask import request, url_for, has_request_context
+
+from app.caching import content_changed
+from app.helpers import FEED_PAGE_SIZE
+
+SECTION_ENDPOINTS = ('index', 'projects', 'photo_album', 'music', 'videos', 'reviews', 'sitemap')
+DETAIL_ENDPOINTS = ('posts.post', 'projects_bp.project_detail')
+# Page size main.js asks /api/posts for; the view cache keys on the query string.
+API_PAGE_SIZE = FEED_PAGE_SIZE
+# Marks the warmer's own requests so they are not counted as visits.
+WARMUP_HEADER = 'X-Cache-Warmup'
+# Distinct detail pages whose visits a worker keeps count of.
+MAX_TRACKED_PAGES = 1000
+
+_visits = Counter()
+_visits_lock = threading.Lock()
+
+
+def track_detail_visits(response):
+    """after_request hook: count successful detail page views in this worker."""
+    if (request.endpoint in DETAIL_ENDPOINTS and response.status_code in (200, 304)
+            and WARMUP_HEADER not in request.headers):
+        with _visits_lock:
+            _visits[request.path] += 1
+            if len(_visits) > MAX_TRACKED_PAGES:
+                kept = _visits.most_common(MAX_TRACKED_PAGES // 2)
+                _visits.clear()
+                _visits.update(dict(kept))
+    return response
+
+
+def _detail_paths(limit):
+    """The most visited detail pages, then the newest posts and projects."""
+    from app.extensions import db
+    from app.models import Post, Project
+    from app.helpers import published_filter
+
+    with _visits_lock:
+        paths = [path for path, _ in _visits.most_common(limit)]
+    if len(paths) >= limit:
+        return paths
+
+    post_ids = db.session.scalars(
+        published_filter(sa.select(Post.id)).order_by(Post.date_posted.desc()).limit(limit)
+    ).all()
+    project_ids = db.session.scalars(
+        sa.select(Project.id).order_by(Project.date_posted.desc()).limit(limit)
+    ).all()
+    newest = [url_for('posts.post', post_id=post_id) for post_id in post_ids]
+    newest += [url_for('projects_bp.project_detail', project_id=project_id) for project_id in project_ids]
+    for path in newest:
+        if len(paths) >= limit:
+            break
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
+def _api_paths(pages):
+    """/api/posts URLs for the `pages` feed pages after the index's inline one."""
+    from app.extensions import db
+    from app.models import Post
+    from app.helpers import published_filter, encode_feed_cursor
+
+    rows = db.session.execute(
+        published_filter(sa.select(Post.date_posted, Post.id))
+        .order_by(Post.date_posted.desc(), Post.id.desc())
+        .limit(API_PAGE_SIZE * pages + 1)
+    ).all()
+    # A page's cursor is the last post of the page before it. The extra row
+    # tells whether the final cursor leads to any posts at all.
+    boundaries = rows[API_PAGE_SIZE - 1:len(rows) - 1:API_PAGE_SIZE]
+    return [url_for('api.api_posts', cursor=encode_feed_cursor(date_posted, post_id), limit=API_PAGE_SIZE)
+            for date_posted, post_id in boundaries]
+
+
+def warm_targets(api_pages, detail_pages):
+    """Paths a warm-up pass requests, in order. Needs a request context."""
+    paths = [url_for(endpoint) for endpoint in SECTION_ENDPOINTS]
+    paths += _api_paths(api_pages)
+    paths += _detail_paths(detail_pages)
+    return paths
+
+
+class CacheWarmer:
+    """Re-renders the public pages of one app, on demand or from a background thread."""
+
+    def __init__(self, app, base_url=None):
+        self.app = app
+        # Pages embed absolute URLs (og:image, sitemap), so they must be
+        # rendered for the public host, not the test client's 'localhost'.
+        self.base_url = base_url or app.config.get('CACHE_WARMUP_BASE_URL')
+        self.concurrency = app.config.get('CACHE_WARMUP_CONCURRENCY', 2)
+        self.api_pages = app.config.get('CACHE_WARMUP_API_PAGES', 3)
+        self.detail_pages = app.config.get('CACHE_WARMUP_DETAIL_PAGES', 10)
+        self.delay = app.config.get('CACHE_WARMUP_DELAY', 2.0)
+        self.last_report = None
+        self._wanted = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def schedule(self, base_url=None):
+        """Ask the background thread for a pass; requests made meanwhile share it."""
+        if base_url and not self.app.config.get('CACHE_WARMUP_BASE_URL'):
+            self.base_url = base_url
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='cache-warmup', daemon=True)
+                self._thread.start()
+        self._wanted.set()
+
+    def _run(self):
+        while True:
+            self._wanted.wait()
+            # Lets a burst of commits (bulk uploads, multi-step edits) settle into one pass.
+            time.sleep(self.delay)
+            self._wanted.clear()
+            try:
+                self.warm()
+            except Exception:
+                self.app.logger.exception("Cache warm-up failed")
+
+    def warm(self):
+        """Request every target page once; return the timing report, or None."""
+        if not self.base_url:
+            self.app.logger.warning("Cache warm-up skipped: set CACHE_WARMUP_BASE_URL to the public site URL")
+            return None
+
+        start = time.perf_counter()
+        with self.app.test_request_context(base_url=self.base_url):
+            paths = warm_targets(self.api_pages, self.detail_pages)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='cache-warmup') as pool:
+            pages = list(pool.map(self._fetch, paths))
+
+        report = {
+            'finished_at': datetime.now(timezone.utc),
+            'total_ms': (time.perf_counter() - start) * 1000,
+            'pages': pages,
+        }
+        self.last_report = report
+        self.app.logger.info(summarize(report))
+        return report
+
+    def _fetch(self, path):
+        """GET `path`; return (path, status or None on error, milliseconds)."""
+        client = self.app.test_client()
+        start = time.perf_counter()
+        try:
+            response = client.get(path, base_url=self.base_url, headers={WARMUP_HEADER: '1'})
+            status = response.status_code
+            response.close()
+        except Exception:
+            self.app.logger.exception(f"Cache warm-up of {path} failed")
+            status = None
+        return path, status, (time.perf_counter() - start) * 1000
+
+
+def summarize(report):
+    """One log line: page count, total time, slowest page and failures."""
+    pages = report['pages']
+    failed = [path for path, status, _ in pages if status is None or status >= 500]
+    line = f"Cache warm-up: {len(pages)} pages in {report['total_ms']:.0f} ms"
+    if pages:
+        path, _, ms = max(pages, key=lambda page: page[2])
+        line += f", slowest {path} ({ms:.0f} ms)"
+    if failed:
+        line += f", {len(failed)} failed: {', '.join(failed)}"
+    return line
+
+
+def start_warmup(app):
+    """Enable warming in this worker: one pass now, then one after each content change."""
+    if not app.config.get('CACHE_WARMUP', True):
+        return None
+    warmer = app.extensions.get('cache_warmer')
+    if warmer is None:
+        warmer = app.extensions['cache_warmer'] = CacheWarmer(app)
+    warmer.schedule()
+    return warmer
+
+
+@content_changed.connect
+def _warm_after_change(app, tags):
+    warmer = app.extensions.get('cache_warmer')
+    if warmer is None:
+        return
+    if has_request_context():
+        if WARMUP_HEADER in request.headers:
+            return
+        warmer.schedule(request.host_url)
+    else:
+        warmer.schedule()
@@ -0,0 +1,21 @@
+"""
+Benchmarks for the Neurascape rendering pipeline.
+
+Run from the Blog/ root. The full suite times every rendering helper and page
+render on a synthetic corpus and can gate on a stored baseline:
+    python -m benchmarks.suite --output benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+
+Baselines are machine-specific; record one on the machine that compares.
+
+Focused checks and micro-benchmarks for individual changes:
+    python -m benchmarks.bench_truncate
+    python -m benchmarks.bench_markdown
+    python -m benchmarks.bench_incremental
+    python -m benchmarks.bench_highlight
+    python -m benchmarks.bench_gallery
+    python -m benchmarks.bench_stampede
+    python -m benchmarks.bench_queries
+    python -m benchmarks.bench_polymorphic
+    python -m benchmarks.bench_feed_plans
+"""
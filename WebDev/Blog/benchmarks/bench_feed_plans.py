@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Query plans of the published-feed queries.
+
+Seeds posts (a quarter of each type, one in a hundred scheduled for later),
+runs ANALYZE, then EXPLAINs the queries published_filter() and the publish
+scheduler send and checks each one reads the index built for it:
+
+    feed, feed after cursor, sitemap   ix_posts_feed
+    section page                       ix_posts_type_feed
+    next publish time, due posts       ix_posts_scheduled (partial)
+
+On SQLite a plan that sorts with a temp B-tree also fails: the index order
+went unused. On PostgreSQL the plans are taken with enable_seqscan off, so
+the check is that the planner can serve each query from its index (the
+partial index's predicate included); on a small table it would rightly pick
+a sequential scan. Prints every plan; exits with status 1 on any failure.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_feed_plans
+    python -m benchmarks.bench_feed_plans --database-url postgresql://localhost/blog_scratch
+
+--database-url must name a scratch database: its tables are dropped.
+"""
+import os
+import sys
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+from sqlalchemy import event
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# App modules are imported only once main() has chosen the database.
+
+TYPES = ('post', 'music_item', 'video', 'review')
+
+
+def seed(rows):
+    from app.extensions import db
+    from app.models import Post
+
+    db.drop_all()
+    db.create_all()
+    now = datetime.now(timezone.utc)
+    db.session.execute(sa.insert(Post.__table__), [
+        {'id': n, 'type': TYPES[n % len(TYPES)], 'title': f"Post {n}", 'content': f"Body {n}",
+         'date_posted': now - timedelta(minutes=rows - n), 'updated_at': now,
+         'published_at': now + timedelta(days=n % 7 + 1) if n % 100 == 0 else None}
+        for n in range(1, rows + 1)
+    ])
+    db.session.commit()
+
+
+def statements(rows):
+    """(name, statement, index it should read) for each hot query shape."""
+    from app.helpers import published_filter, FEED_PAGE_SIZE
+    from app.models import Post, PostWithSubtypes, MusicItem
+
+    now = datetime.now(timezone.utc)
+    newest = published_filter(sa.select(PostWithSubtypes)).order_by(Post.date_posted.desc(), Post.id.desc())
+    after = now - timedelta(minutes=rows // 2)
+    return [
+        ('feed', newest.limit(FEED_PAGE_SIZE + 1), 'ix_posts_feed'),
+        ('feed after cursor', newest.filter(sa.tuple_(Post.date_posted, Post.id) < (after, rows // 2))
+                                    .limit(FEED_PAGE_SIZE + 1), 'ix_posts_feed'),
+        ('sitemap', published_filter(sa.select(Post)).order_by(Post.date_posted.desc()), 'ix_posts_feed'),
+        ('section page', published_filter(sa.select(MusicItem), 'music_item')
+                         .order_by(MusicItem.date_posted.desc()), 'ix_posts_type_feed'),
+        ('next publish time', sa.select(Post.type, sa.func.min(Post.published_at))
+                              .where(Post.published_at > now).group_by(Post.type), 'ix_posts_scheduled'),
+        ('due posts', sa.select(Post.type, Post.published_at).distinct()
+                      .where(Post.published_at > now, Post.published_at <= now + timedelta(days=1)),
+         'ix_posts_scheduled'),
+    ]
+
+
+@contextmanager
+def explaining(engine, prefix):
+    """Send every statement as `prefix` + statement, so executing it returns its plan."""
+    def rewrite(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    event.listen(engine, 'before_cursor_execute', rewrite, retval=True)
+    try:
+        yield
+    finally:
+        event.remove(engine, 'before_cursor_execute', rewrite)
+
+
+def plan(engine, statement):
+    """The plan of `statement`, one line per step."""
+    sqlite = engine.dialect.name == 'sqlite'
+    with engine.connect() as conn:
+        if not sqlite:
+            conn.exec_driver_sql('SET enable_seqscan = off')
+        with explaining(engine, 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '):
+            rows = conn.execute(statement).cursor.fetchall()
+    return [row[-1] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the feed queries read their indexes.')
+    parser.add_argument('--database-url', help='Scratch database to plan against (default: a scratch SQLite file)')
+    parser.add_argument('--rows', type=int, default=20000, help='Posts to seed (default: 20000)')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        import benchmarks.suite  # noqa: F401  (points the app at a scratch SQLite database)
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    failures = 0
+    with app.app_context():
+        seed(args.rows)
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+        print(f"{db.engine.dialect.name}, {args.rows} posts")
+        for name, statement, index in statements(args.rows):
+            steps = plan(db.engine, statement)
+            problems = []
+            if not any(index in step for step in steps):
+                problems.append(f"does not read {index}")
+            if any('TEMP B-TREE FOR ORDER BY' in step for step in steps):
+                problems.append("sorts instead of reading index order")
+            failures += bool(problems)
+            print(f"\n{name}: {'; '.join(problems) or 'ok'}")
+            for step in steps:
+                print(f"    {step}")
+    if failures:
+        print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Before/after benchmark for gallery figures and responsive images.
+
+"Before" is the previous partial-based rendering, kept here verbatim: one
+render_template("_gallery_figure.html") per [[img:KEY]] token, each doing
+{% include '_responsive_image.html' %} with an unmemoized get_picture_data().
+"After" is the current code: the gallery_figure / responsive_image macros and
+the memoized get_picture_data().
+
+Measures a post body with MAX_GALLERY_IMAGES (30) gallery tokens and a 50-card
+listing, and checks both versions produce the same markup (ignoring
+whitespace between tags).
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_gallery
+    python -m benchmarks.bench_gallery --repeat 200
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+import timeit
+import warnings
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# A throwaway SQLite file: nothing is queried, but the engine needs a URL.
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+from jinja2 import ChoiceLoader, DictLoader
+from markupsafe import Markup
+
+from app import create_app
+from app.helpers import MAX_GALLERY_IMAGES, GALLERY_RENDER_TOKEN_RE, render_body, prerender_body, _stored_body_html, _gallery_items_by_key
+from app.models import Post, PostImage, Photo
+from app.utils.image_utils import get_picture_data
+
+warnings.filterwarnings('ignore', module='bleach')
+
+OLD_RESPONSIVE_IMAGE = """\
+{% set _sizes = img_sizes | default('(max-width: 600px) 100vw, (max-width: 1200px) 80vw, 800px') %}
+{% set _class = img_class | default('') %}
+{% set _loading = img_loading | default('lazy') %}
+{% if pic and pic.src %}
+{% if pic.lqip and _loading == 'lazy' %}
+<div class="lqip-wrap" style="background:url({{ pic.lqip }}) center/cover no-repeat;position:relative;">
+{% endif %}
+{% if pic.has_webp %}
+<picture>
+    <source type="image/webp"
+            srcset="{{ pic.webp_srcset }}"
+            sizes="{{ _sizes }}">
+    <img src="{{ pic.src }}"
+         srcset="{{ pic.srcset }}"
+         sizes="{{ _sizes }}"
+         alt="{{ img_alt }}"
+         {% if _class %}class="{{ _class }}"{% endif %}
+         loading="{{ _loading }}"
+         {% if pic.lqip and _loading == 'lazy' %}onload="if(this.closest('.lqip-wrap'))this.closest('.lqip-wrap').style.background='none'"{% endif %}>
+</picture>
+{% else %}
+<img src="{{ pic.src }}"
+     srcset="{{ pic.srcset }}"
+     sizes="{{ _sizes }}"
+     alt="{{ img_alt }}"
+     {% if _class %}class="{{ _class }}"{% endif %}
+     loading="{{ _loading }}"
+     {% if pic.lqip and _loading == 'lazy' %}onload="if(this.closest('.lqip-wrap'))this.closest('.lqip-wrap').style.background='none'"{% endif %}>
+{% endif %}
+{% if pic.lqip and _loading == 'lazy' %}
+</div>
+{% endif %}
+{% endif %}
+"""
+
+OLD_GALLERY_FIGURE = """\
+{% if gallery_item and gallery_item.photo and gallery_item.photo.filename %}
+<figure class="post-figure gallery-figure fig-align-{{ gallery_item.alignment|default('center') }}">
+    {% set pic = get_picture_data(gallery_item.photo.filename, gallery_item.photo.lqip) %}
+    {% set img_alt = gallery_item.alt_text or gallery_item.caption or gallery_item.photo.description or 'Inline image' %}
+    {% set img_class = 'post-inline-img gallery-inline-img' %}
+    {% set img_loading = 'lazy' %}
+    {% set img_sizes = '(max-width: 600px) 100vw, (max-width: 1200px) 80vw, 800px' %}
+    {% include '_responsive_image.html' %}
+    {% if gallery_item.caption %}
+    <figcaption>{{ gallery_item.caption }}</figcaption>
+    {% endif %}
+</figure>
+{% endif %}
+"""
+
+# The card image block shared by the listing templates (music.html etc.).
+OLD_LISTING = """\
+{% for item in items %}
+<div class="post-card"><div class="post-image"><a href="/post/{{ item.id }}">
+    {% set pic = get_picture_data(item.photo.filename, item.photo.lqip) %}
+    {% set img_alt = item.photo.description if item.photo.description else item.title %}
+    {% set img_class = 'post-feature-img' %}
+    {% set img_sizes = '(max-width: 600px) 100vw, (max-width: 900px) 50vw, 33vw' %}
+    {% include '_responsive_image.html' %}
+</a></div></div>
+{% endfor %}
+"""
+
+NEW_LISTING = """\
+{% from '_responsive_image.html' import responsive_image %}
+{% for item in items %}
+<div class="post-card"><div class="post-image"><a href="/post/{{ item.id }}">
+    {% set pic = get_picture_data(item.photo.filename, item.photo.lqip) %}
+    {{ responsive_image(
+        pic,
+        item.photo.description if item.photo.description else item.title,
+        img_class='post-feature-img',
+        img_sizes='(max-width: 600px) 100vw, (max-width: 900px) 50vw, 33vw',
+    ) }}
+</a></div></div>
+{% endfor %}
+"""
+
+LQIP = "data:image/jpeg;base64," + "A" * 600
+
+
+def _photo(n):
+    return Photo(filename=f"photo{n:03d}.jpg", description=f"Photo {n}", lqip=LQIP)
+
+
+def build_post():
+    post = Post(title="Gallery post", content="")
+    keys = []
+    for n in range(MAX_GALLERY_IMAGES):
+        key = f"k{n}"
+        keys.append(key)
+        post.images.append(PostImage(photo=_photo(n), placeholder_key=key, caption=f"Caption {n}",
+                                     alignment="center", position=n))
+    post.content = "".join(f"Paragraph {n} of the post.\n\n[[img:{key}]]\n\n" for n, key in enumerate(keys))
+    prerender_body(post)
+    return post
+
+
+def build_listing(cards=50):
+    items = []
+    for n in range(cards):
+        post = Post(title=f"Card {n}", content="")
+        post.id = n + 1
+        post.photo = _photo(n)
+        items.append(post)
+    return items
+
+
+def _normalize(html):
+    return re.sub(r"\s+", " ", re.sub(r">\s+<", "><", str(html))).strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gallery/responsive image rendering.')
+    parser.add_argument('--repeat', type=int, default=50, help='Renders per timing run (default: 50)')
+    args = parser.parse_args()
+
+    app = create_app()
+    old_env = app.jinja_env.overlay(loader=ChoiceLoader([
+        DictLoader({
+            '_responsive_image.html': OLD_RESPONSIVE_IMAGE,
+            '_gallery_figure.html': OLD_GALLERY_FIGURE,
+            'old_listing.html': OLD_LISTING,
+        }),
+        app.jinja_env.loader,
+    ]))
+    old_env.globals['get_picture_data'] = get_picture_data.__wrapped__
+    new_listing = app.jinja_env.from_string(NEW_LISTING)
+
+    post = build_post()
+    items = build_listing()
+
+    with app.test_request_context('/'):
+        def body_before():
+            html = _stored_body_html(post)
+            images_by_key = _gallery_items_by_key(post)
+            figure = old_env.get_template('_gallery_figure.html')
+
+            def replace_token(match):
+                context = {'gallery_item': images_by_key.get(match.group(1))}
+                app.update_template_context(context)
+                return figure.render(context)
+            return Markup(GALLERY_RENDER_TOKEN_RE.sub(replace_token, html))
+
+        def body_after():
+            return render_body(post)
+
+        def listing_before():
+            context = {'items': items}
+            app.update_template_context(context)
+            return old_env.get_template('old_listing.html').render(context)
+
+        def listing_after():
+            context = {'items': items}
+            app.update_template_context(context)
+            return new_listing.render(context)
+
+        cases = [
+            (f"post, {MAX_GALLERY_IMAGES} figures", body_before, body_after),
+            (f"listing, {len(items)} cards", listing_before, listing_after),
+        ]
+        ok = True
+        print(f"{'case':<20} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+        for label, before, after in cases:
+            if _normalize(before()) != _normalize(after()):
+                ok = False
+                print(f"MISMATCH {label}: macro output differs from the include-based output")
+            before_s = min(timeit.repeat(before, number=args.repeat, repeat=3)) / args.repeat
+            after_s = min(timeit.repeat(after, number=args.repeat, repeat=3)) / args.repeat
+            print(f"{label:<20} {before_s * 1000:>12.3f} {after_s * 1000:>11.3f} {before_s / after_s:>7.1f}x")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the syntax-highlight cache.
+
+Renders a code-heavy post with markdown_safe() (whole document, so the block
+cache is not involved) on every backend: once with an empty highlight cache,
+then again with unchanged code, and prints timings with the cache's hit/miss
+counters. Also asserts cached and uncached output are identical.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_highlight
+"""
+import os
+import sys
+import argparse
+import time
+import warnings
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.helpers import MARKDOWN_RENDERERS, markdown_safe, highlight_cache_stats, _highlight_cache
+
+warnings.filterwarnings('ignore', module='bleach')
+
+SNIPPETS = [
+    "```python\ndef handler_{n}(request):\n    items = [x * {n} for x in range(10) if x % 2]\n    return {{'ok': True, 'items': items}}\n```",
+    "```javascript\nfunction render{n}(el) {{\n  const data = JSON.parse(el.dataset.items || '[]');\n  return data.map((d) => `<li>${{d}}</li>`).join('');\n}}\n```",
+    "```sql\nSELECT id, title FROM posts WHERE id > {n} ORDER BY date_posted DESC LIMIT 10;\n```",
+    # No language: left as plain escaped code, never sent to Pygments.
+    "```\n#!/bin/sh\nfor f in *.md; do echo \"$f {n}\"; done\n```",
+]
+
+
+def build_post(sections=40):
+    parts = []
+    for n in range(sections):
+        parts.append(f"## Step {n}\n\nSome explanation for step {n}.\n\n")
+        parts.append(SNIPPETS[n % len(SNIPPETS)].format(n=n) + "\n\n")
+    return "".join(parts)
+
+
+def _ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the syntax-highlight cache.')
+    parser.add_argument('--sections', type=int, default=40, help='Code blocks in the post (default: 40)')
+    args = parser.parse_args()
+
+    body = build_post(args.sections)
+    print(f"Post: {len(body)} bytes, {args.sections} code blocks")
+    print(f"{'backend':<12} {'cold (ms)':>10} {'warm (ms)':>10} {'hits':>6} {'misses':>7}")
+    ok = True
+    for backend in sorted(MARKDOWN_RENDERERS):
+        _highlight_cache.clear()
+        cold_ms, cold = _ms(lambda: markdown_safe(body, backend))
+        warm_ms, warm = _ms(lambda: markdown_safe(body, backend))
+        stats = highlight_cache_stats()
+        if str(cold) != str(warm):
+            ok = False
+            print(f"MISMATCH {backend}: cached output differs from uncached output")
+        print(f"{backend:<12} {cold_ms:>10.1f} {warm_ms:>10.1f} {stats['hits']:>6} {stats['misses']:>7}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
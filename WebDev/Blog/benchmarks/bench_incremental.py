@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Equivalence check + micro-benchmark for block-level incremental rendering.
+
+First checks that render_markdown_incremental() matches a whole-document
+markdown_safe() render (up to whitespace between blocks) on the
+bench_markdown corpus plus block-boundary cases, for every backend. Then times
+a 50 KB body cold, unchanged, and with a single paragraph edited: the case the
+editor preview hits on every keystroke.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_incremental
+"""
+import os
+import sys
+import argparse
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from app.helpers import (
+    MARKDOWN_RENDERERS, markdown_safe, normalize_block_tokens, render_markdown_incremental,
+    split_markdown_blocks, _markdown_block_cache,
+)
+from benchmarks.bench_markdown import CORPUS, _normalize
+
+BOUNDARY_CASES = [
+    ("loose list", "- a\n\n- b\n\n  continued\n\npara"),
+    ("list then ordered", "- a\n\n1. b"),
+    ("quote over blank", "> a\n\n> b\n\nend"),
+    ("fence with blank", "```\na\n\nb\n```\n\nafter"),
+    ("tilde fence", "~~~\nx\n\n~~~\n\ny"),
+    ("unclosed fence", "```\nnever closed\n\nstill code"),
+    ("setext", "Title\n=====\n\ntext"),
+    ("reference link", "[a][1]\n\n[1]: http://example.com"),
+    ("indented after para", "para\n\n    code\n\nmore"),
+    ("list after heading", "## Steps\n1. Install it\n\n2. Run it\n\n3. Done"),
+    ("quote after heading", "## Notes\n> first\n\n> second"),
+    ("paragraph after list", "- a\n\n- b\n\npara\n\n- c"),
+    ("nested item after heading", "## Steps\n\n  - nested\n\n1. Install it"),
+    ("quote then list", "> quote\n\n- item\n\n> again"),
+]
+
+SECTION = (
+    "## Section {n}\n\n"
+    "Paragraph {n} with *emphasis*, **strong** text, `code` and a [link](https://example.com).\n\n"
+    "- first item\n- second item\n\n"
+    "```python\ndef f{n}(x):\n    return x * {n}\n```\n\n"
+    "> A quote.\n\n[[img:abc123]]\n\n"
+)
+
+
+def check_equivalence():
+    failures = 0
+    checked = 0
+    for backend in sorted(MARKDOWN_RENDERERS):
+        for name, body in CORPUS + BOUNDARY_CASES:
+            body = normalize_block_tokens(body)
+            whole = str(markdown_safe(body, backend))
+            incremental, _ = render_markdown_incremental(body, backend)
+            checked += 1
+            if _normalize(whole) != _normalize(incremental):
+                failures += 1
+                print(f"MISMATCH {backend}: {name}\n  whole:       {whole!r}\n  incremental: {incremental!r}")
+    print(f"Equivalence: {checked} cases, {failures} mismatch(es).")
+    return failures == 0
+
+
+def _ms(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run_benchmarks(repeat):
+    # Numbered sections so every block is distinct and a cold render misses throughout.
+    sections = "".join(SECTION.format(n=n) for n in range(50000 // len(SECTION) + 1))
+    body = normalize_block_tokens(sections[:50000])
+    edited = body.replace("Paragraph 7 with", "Edited paragraph 7 with", 1)
+    print(f"\n50 KB body, {len(split_markdown_blocks(body))} blocks")
+    print(f"{'backend':<12} {'whole (ms)':>11} {'cold (ms)':>10} {'unchanged (ms)':>15} {'1 edit (ms)':>12}")
+    for backend in sorted(MARKDOWN_RENDERERS):
+        whole = min(_ms(lambda: markdown_safe(body, backend))[0] for _ in range(repeat))
+        cold = []
+        for _ in range(repeat):
+            _markdown_block_cache.clear()
+            cold.append(_ms(lambda: render_markdown_incremental(body, backend))[0])
+        unchanged = min(_ms(lambda: render_markdown_incremental(body, backend))[0] for _ in range(repeat))
+        edits = []
+        for _ in range(repeat):
+            render_markdown_incremental(body, backend)
+            _markdown_block_cache.clear()
+            render_markdown_incremental(body, backend)
+            edits.append(_ms(lambda: render_markdown_incremental(edited, backend))[0])
+        print(f"{backend:<12} {whole:>11.1f} {min(cold):>10.1f} {unchanged:>15.2f} {min(edits):>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and benchmark incremental Markdown rendering.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per measurement (default: 3)')
+    args = parser.parse_args()
+
+    if not check_equivalence():
+        sys.exit(1)
+    run_benchmarks(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Equivalence check + micro-benchmark for the markdown_safe() backends.
+
+Renders a corpus of gallery-token, excerpt and Markdown edge cases through every
+MARKDOWN_BACKEND (body HTML, card excerpts and stripped previews, the same paths
+the site uses) and compares the sanitized output with Python-Markdown's. Output
+that differs only in whitespace between tags or in how entities are spelled
+(&copy; vs ©) counts as equivalent. Differences listed in KNOWN_DIVERGENCES are
+CommonMark parsing rules that markdown-it follows and Python-Markdown does not;
+they are printed but do not fail the run. Then times both backends on small and
+50 KB bodies.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_markdown
+    python -m benchmarks.bench_markdown --repeat 200
+"""
+import os
+import sys
+import re
+import html
+import argparse
+import timeit
+import warnings
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask
+
+from app.helpers import (
+    MARKDOWN_RENDERERS, DEFAULT_MARKDOWN_BACKEND, markdown_safe, strip_gallery_tokens,
+    _render_body_html, _render_excerpt,
+)
+
+# Bleach warns once per Cleaner about the 'style' attribute; not relevant here.
+warnings.filterwarnings('ignore', module='bleach')
+
+CORPUS = [
+    # --- gallery tokens ---
+    ("token alone", "Intro paragraph.\n\n[[img:abc123]]\n\nOutro."),
+    ("token adjacent lines", "Text\n[[img:a1]]\n[[img:b2]]\nMore text"),
+    ("token indented", "Para\n\n   [[img:x_y-z]]   \n\nEnd"),
+    ("token inline", "Look at [[img:abc]] here, and [[img:def]] there."),
+    ("token only", "[[img:only]]"),
+    ("token bad key", "[[img:this-key-is-way-too-long]]\n\n[[img:bad key]]"),
+    ("token in list", "- item\n- [[img:li1]]\n- item"),
+    ("token in quote", "> quoted\n>\n> [[img:q1]]"),
+    ("token in fence", "```\n[[img:code1]]\n```"),
+    ("token after heading", "## Heading\n[[img:h1]]\nText"),
+    ("token crlf", "Para\r\n\r\n[[img:crlf]]\r\n\r\nEnd"),
+    # --- everyday Markdown ---
+    ("emphasis", "Some *emphasis*, **strong**, `code` & <angle> \"quotes\" — ✓"),
+    ("links", "[link](https://example.com/?a=1&b=2 \"title\") and <https://example.com>"),
+    ("image", "![alt text](/static/img/x.png 'title')"),
+    ("headings", "# One\n## Two\n### Three\n\ntext"),
+    ("hard break", "line one  \nline two"),
+    ("lists", "- a\n- b\n\n1. one\n2. two"),
+    ("blockquote", "> A quote with **bold**\n> over two lines."),
+    ("fenced python", "```python\ndef f(x):\n    return x < 2  # <tag> & co\n```"),
+    ("fenced unknown", "```notalanguage\nplain & <b>\n```"),
+    ("fenced plain", "```\nno language here\n```"),
+    ("indented code", "Para\n\n    indented\n    code block"),
+    ("table", "| a | b |\n|---|---|\n| 1 | 2 |"),
+    ("hr", "above\n\n---\n\nbelow"),
+    ("escapes", r"\*not emphasis\* and 1\. not a list"),
+    # --- raw HTML and sanitization ---
+    ("inline html", 'text <a href="h" onclick="x()">l</a> <script>alert(1)</script>'),
+    ("html block", '<div class="x">\n<p>inside</p>\n</div>'),
+    ("raw img", '<img src="a.png" style="width:1px" onerror="x">'),
+    ("entities", "&amp; &lt; &copy; &#169; &nbsp; AT&T"),
+    # --- structure rules where the two engines disagree ---
+    ("nested list 2-space", "- a\n  - b\n  - c"),
+    ("list no blank", "Para\n- a\n- b"),
+]
+
+KNOWN_DIVERGENCES = {
+    "token in list": "Python-Markdown closes the list at a block token it already split out; CommonMark keeps it in the item",
+    "token crlf": "Python-Markdown keeps \\r in paragraph text, CommonMark normalizes line endings",
+    "links": "autolinks (<https://...>) are CommonMark only",
+    "raw img": "CommonMark treats a lone <img> as an HTML block, Python-Markdown wraps it in <p>",
+    "inline html": "raw HTML spans are tokenized differently before Bleach strips them",
+    "html block": "Python-Markdown keeps a stripped HTML block verbatim, CommonMark re-parses its lines",
+    "nested list 2-space": "Python-Markdown needs 4-space indentation to nest lists",
+    "list no blank": "Python-Markdown needs a blank line before a list",
+    "lists": "Python-Markdown merges a bullet list and the ordered list after it into one list",
+    "token in fence": "the block-token normalization adds blank lines inside the fence; CommonMark keeps them",
+}
+
+
+def _normalize(markup):
+    """Fold differences a browser does not render: entity spelling and whitespace."""
+    text = html.unescape(markup).replace("\xa0", " ")
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r" ?(<[^>]+>) ?", r"\1", text).strip()
+
+
+def _render_paths(body):
+    """Every site rendering path for `body`, under the active backend."""
+    out = {
+        "body": _render_body_html(body),
+        "preview": str(markdown_safe(strip_gallery_tokens(body))),
+    }
+    for length in (200, 300):
+        out[f"excerpt {length}"] = str(_render_excerpt(body, length))
+    return out
+
+
+def _app_for(backend):
+    app = Flask(__name__)
+    app.config['MARKDOWN_BACKEND'] = backend
+    return app
+
+
+def check_equivalence():
+    """Compare every backend against the default on the corpus."""
+    reference = _app_for(DEFAULT_MARKDOWN_BACKEND)
+    failures = 0
+    known = 0
+    equivalent = 0
+    for backend in sorted(MARKDOWN_RENDERERS):
+        if backend == DEFAULT_MARKDOWN_BACKEND:
+            continue
+        candidate = _app_for(backend)
+        for name, body in CORPUS:
+            with reference.app_context():
+                expected = _render_paths(body)
+            with candidate.app_context():
+                actual = _render_paths(body)
+            diffs = [path for path in expected if expected[path] != actual[path]]
+            if not diffs:
+                continue
+            if all(_normalize(expected[path]) == _normalize(actual[path]) for path in diffs):
+                equivalent += 1
+                continue
+            if name in KNOWN_DIVERGENCES:
+                known += 1
+                print(f"known    {backend}: {name} ({', '.join(diffs)}) — {KNOWN_DIVERGENCES[name]}")
+                continue
+            failures += 1
+            for path in diffs:
+                print(f"MISMATCH {backend}: {name} [{path}]\n"
+                      f"  {DEFAULT_MARKDOWN_BACKEND}: {expected[path]!r}\n  {backend}: {actual[path]!r}")
+    print(f"Equivalence corpus: {len(CORPUS)} bodies, {failures} mismatch(es), "
+          f"{equivalent} equivalent up to whitespace/entities, {known} known divergence(s).")
+    return failures == 0
+
+
+def _doc(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def run_benchmarks(repeat):
+    prose = ("Some *emphasis*, **strong** text & a [link](https://example.com) with `code`.\n\n"
+             "- first item\n- second item\n\n> a quote\n\n[[img:abc123]]\n\n")
+    code = "```python\ndef f(x):\n    return x < 2 and x > 0\n```\n\n"
+    inputs = [
+        ("1 KB", _doc(prose, 1024)),
+        ("50 KB", _doc(prose + "| a | b |\n|---|---|\n| 1 | 2 |\n\n", 50000)),
+        ("50 KB code-heavy", _doc(code * 4 + prose, 50000)),
+    ]
+    backends = sorted(MARKDOWN_RENDERERS)
+    header = " ".join(f"{name + ' (ms)':>18}" for name in backends)
+    print(f"\n{'input':<18} {header}")
+    for label, body in inputs:
+        cells = []
+        for backend in backends:
+            seconds = min(timeit.repeat(lambda: markdown_safe(body, backend), number=repeat, repeat=3)) / repeat
+            cells.append(f"{seconds * 1000:>18.3f}")
+        print(f"{label:<18} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare and benchmark the Markdown backends.')
+    parser.add_argument('--repeat', type=int, default=5, help='Calls per timing run (default: 5)')
+    args = parser.parse_args()
+
+    if not check_equivalence():
+        sys.exit(1)
+    run_benchmarks(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Cost of loading Post rows with and without the subclass tables joined in.
+
+Post used to set with_polymorphic='*', so every Post query LEFT OUTER JOINed
+music_items, videos and reviews and read all their columns. Now only queries
+selecting PostWithSubtypes do. For each table size this seeds that many posts
+(a quarter of each type) and times the Post-wide queries the site runs, once
+as a plain Post query and once through PostWithSubtypes (the old default):
+
+    dropdown   every post by title (the photo form's post picker)
+    sitemap    every published post, newest first
+    recent     the ten newest posts (admin dashboard)
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_polymorphic
+    python -m benchmarks.bench_polymorphic --rows 10000 100000 --repeat 5
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta, timezone
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Imported first: points the app at a scratch database.
+from benchmarks.suite import time_call
+import sqlalchemy as sa
+from app import create_app
+from app.extensions import db
+from app.helpers import published_filter
+from app.models import Post, PostWithSubtypes, MusicItem, Video, Review
+
+TYPES = ('post', 'music_item', 'video', 'review')
+
+
+def seed(rows):
+    """Replace the posts with `rows` of them, spread evenly over the four types."""
+    db.drop_all()
+    db.create_all()
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    posts, subtypes = [], {post_type: [] for post_type in TYPES[1:]}
+    for n in range(1, rows + 1):
+        post_type = TYPES[n % len(TYPES)]
+        posts.append({'id': n, 'type': post_type, 'title': f"Post {n:06d}", 'content': f"Body {n}",
+                      'date_posted': start + timedelta(minutes=n), 'updated_at': start})
+        if post_type == 'music_item':
+            subtypes[post_type].append({'id': n, 'item_type': 'album', 'artist': f"Artist {n}",
+                                        'album_title': f"Album {n}", 'spotify_link': 'https://open.spotify.com/album/x'})
+        elif post_type == 'video':
+            subtypes[post_type].append({'id': n, 'video_url': 'https://example.org/v', 'embed_code': '<iframe></iframe>',
+                                        'source_type': 'youtube', 'duration': '3:00'})
+        elif post_type == 'review':
+            subtypes[post_type].append({'id': n, 'item_title': f"Book {n}", 'category': 'book', 'rating': '4',
+                                        'director_author': f"Author {n}", 'item_link': 'https://example.org/b'})
+    db.session.execute(sa.insert(Post.__table__), posts)
+    for cls in (MusicItem, Video, Review):
+        db.session.execute(sa.insert(cls.__table__), subtypes[cls.__mapper__.polymorphic_identity])
+    db.session.commit()
+
+
+def queries(entity):
+    """(name, callable) for each Post-wide query, selecting `entity`."""
+    return [
+        ('dropdown', lambda: db.session.query(entity).order_by(Post.title).all()),
+        ('sitemap', lambda: published_filter(db.session.query(entity)).order_by(Post.date_posted.desc()).all()),
+        ('recent', lambda: db.session.query(entity).order_by(Post.date_posted.desc()).limit(10).all()),
+    ]
+
+
+def fresh(fn):
+    """Run `fn` against an empty identity map, as each request does."""
+    def run():
+        fn()
+        db.session.remove()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time Post queries with and without the subclass joins.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='Table sizes (default: 10000 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Best of this many timings (default: 3)')
+    args = parser.parse_args()
+
+    app = create_app()
+    print(f"{'rows':>7} {'query':<9} {'posts only':>11} {'joined':>10} {'saved':>7}")
+    with app.app_context():
+        for rows in args.rows:
+            seed(rows)
+            for (name, plain), (_, joined) in zip(queries(Post), queries(PostWithSubtypes)):
+                plain_ms = time_call(fresh(plain), args.repeat)
+                joined_ms = time_call(fresh(joined), args.repeat)
+                print(f"{rows:>7} {name:<9} {plain_ms:>9.2f}ms {joined_ms:>8.2f}ms "
+                      f"{(1 - plain_ms / joined_ms) * 100:>6.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+SQL statement budgets for the listing pages.
+
+Seeds a small site, renders every listing with the view cache cleared and
+counts the statements each render sends, then grows every section tenfold
+and counts again. A listing fails when it exceeds its budget or when its
+count grows with the number of rows shown: either means a template is
+lazy-loading a relationship per card (an N+1), which on Neon costs one round
+trip per row. The renders run with SQLALCHEMY_RAISELOAD on, so a
+relationship the view's loader options do not cover raises instead of
+quietly loading. Exits with status 1 on any failure.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_queries
+    python -m benchmarks.bench_queries --small 5 --large 100
+"""
+import os
+import sys
+import argparse
+from contextlib import contextmanager
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Imported first: points the app at a scratch database.
+import benchmarks.suite  # noqa: F401
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db, cache
+from app.models import Photo, Project, ProjectImage, Post, PostImage, MusicItem, Video, Review, Tag
+
+# Most statements a cold render of each listing may send, whatever its size.
+# They include conditional GET's validator query and the next-publish lookup.
+BUDGETS = {
+    '/': 8,
+    '/api/posts': 8,
+    '/music': 8,
+    '/videos': 8,
+    '/reviews': 8,
+    '/projects': 8,
+    '/photo_album': 8,
+    '/project/1': 10,
+    '/sitemap.xml': 6,
+}
+
+
+def _photo(name):
+    return Photo(filename=f"{name}.jpg", description=f"Photo {name}", lqip='data:image/jpeg;base64,')
+
+
+def _gallery(item, image_cls, name):
+    for position in range(2):
+        key = f"{name}-g{position}"
+        item.images.append(image_cls(photo=_photo(key), placeholder_key=key, caption=f"Caption {key}",
+                                     alt_text=f"Alt {key}", alignment='center', position=position))
+
+
+def seed(start, stop, tags):
+    """Add items start..stop-1 of every section, each with its own photos and
+    project. Odd items have no cover photo, so their cards fall back to the
+    gallery; every Post also joins the first project, so /project/1 grows too.
+    """
+    first_project = db.session.get(Project, 1)
+    for n in range(start, stop):
+        project = Project(title=f"Project {n}", description=f"Project body {n}",
+                          photo=None if n % 2 else _photo(f"project-{n}"))
+        _gallery(project, ProjectImage, f"project-{n}")
+        db.session.add(project)
+        first_project = first_project or project
+        for cls, extra in ((Post, {}), (MusicItem, {'item_type': 'album', 'artist': f"Artist {n}"}),
+                           (Video, {'video_url': 'https://example.org/v'}),
+                           (Review, {'item_title': f"Book {n}", 'category': 'book'})):
+            name = f"{cls.__name__.lower()}-{n}"
+            item = cls(title=f"{cls.__name__} {n}", content=f"Body of {name}",
+                       project=first_project if cls is Post else project,
+                       photo=None if n % 2 else _photo(name), tags=tags, **extra)
+            _gallery(item, PostImage, name)
+            db.session.add(item)
+    db.session.commit()
+
+
+@contextmanager
+def counting(engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+
+def measure(app):
+    """{path: (statement count, error or None)} for a cold render of every listing."""
+    client = app.test_client()
+    results = {}
+    for path in BUDGETS:
+        with app.app_context():
+            cache.clear()
+            engine = db.engine
+        with counting(engine) as statements:
+            try:
+                response = client.get(path)
+                error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        results[path] = (len(statements), error)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', type=int, default=3, help="items per section in the first pass")
+    parser.add_argument('--large', type=int, default=30, help="items per section in the second pass")
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config.update(SQLALCHEMY_RAISELOAD=True, PROPAGATE_EXCEPTIONS=True)
+    with app.app_context():
+        db.create_all()
+        tags = [Tag(name='alpha'), Tag(name='beta')]
+        seed(0, args.small, tags)
+    small = measure(app)
+    with app.app_context():
+        seed(args.small, args.large, db.session.scalars(db.select(Tag)).all())
+    large = measure(app)
+
+    failures = 0
+    print(f"{'listing':15s} {'budget':>7s} {args.small:>6d}/sec {args.large:>6d}/sec")
+    for path, budget in BUDGETS.items():
+        (small_count, small_error), (large_count, large_error) = small[path], large[path]
+        problems = [error for error in (small_error, large_error) if error]
+        if large_count > budget:
+            problems.append("over budget")
+        if large_count != small_count:
+            problems.append("grows with rows (N+1)")
+        failures += bool(problems)
+        print(f"{path:15s} {budget:7d} {small_count:10d} {large_count:10d}  {'; '.join(problems) or 'ok'}")
+    if failures:
+        print(f"\n{failures} listing(s) failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
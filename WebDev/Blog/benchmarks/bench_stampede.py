@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stampede check for the view cache's single-flight.
+
+Seeds the benchmark corpus, then sends a burst of concurrent requests for the
+same cold page from a pool of threads (as a gthread worker would) and prints
+how many renders actually ran and how many requests were coalesced onto
+another's render. Asserts every response is identical and that the page was
+rendered fewer times than it was requested.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_stampede
+    python -m benchmarks.bench_stampede --threads 32 --rounds 5
+"""
+import os
+import sys
+import argparse
+import threading
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Imported first: points the app at a scratch database.
+from benchmarks.suite import seed_pages
+from app import create_app
+from app.extensions import db, cache
+from app.caching import single_flight_stats, _view_flight
+from benchmarks.corpus import build_corpus
+
+
+def burst(app, path, threads):
+    """GET `path` from `threads` threads released at once; return (ms, bodies)."""
+    barrier = threading.Barrier(threads)
+    bodies = [None] * threads
+
+    def fetch(n):
+        client = app.test_client()
+        barrier.wait()
+        response = client.get(path)
+        bodies[n] = (response.status_code, response.get_data())
+
+    workers = [threading.Thread(target=fetch, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) * 1000, bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check single-flight coalescing of concurrent cache misses.')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent requests per burst (default: 16)')
+    parser.add_argument('--rounds', type=int, default=3, help='Cold bursts per page (default: 3)')
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    with app.app_context():
+        db.create_all()
+        seed_pages(build_corpus())
+
+    print(f"{'page':<10} {'burst (ms)':>11} {'requests':>9} {'renders':>8} {'coalesced':>10}")
+    ok = True
+    for path in ('/', '/music', '/projects'):
+        for _ in range(args.rounds):
+            with app.app_context():
+                cache.clear()
+            _view_flight.reset_stats()
+            ms, bodies = burst(app, path, args.threads)
+            stats = single_flight_stats()['views']
+            print(f"{path:<10} {ms:>11.1f} {args.threads:>9} {stats['computed']:>8} {stats['coalesced']:>10}")
+            if len(set(bodies)) != 1 or bodies[0][0] != 200:
+                print(f"  MISMATCH: {path} returned differing responses")
+                ok = False
+            if stats['computed'] >= args.threads:
+                print(f"  NOT COALESCED: {path} rendered once per request")
+                ok = False
+
+    print("\nTotals:", single_flight_stats())
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Regression check + micro-benchmark for app.helpers.truncate_html().
+
+Compares the streaming truncator against the BeautifulSoup tree walk it replaced:
+first asserts both produce identical output over a corpus of sanitized HTML at a
+range of lengths, then times them on 1 KB, 50 KB (the content[:50000] cap) and
+code-heavy documents.
+
+Usage (from Blog/ root):
+    python -m benchmarks.bench_truncate
+    python -m benchmarks.bench_truncate --repeat 200
+"""
+import os
+import sys
+import argparse
+import timeit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from bs4 import BeautifulSoup, NavigableString, Comment
+from markupsafe import Markup
+
+from app.helpers import markdown_safe, truncate_html
+
+LENGTHS = (0, 1, 5, 20, 150, 200, 250, 300, 1000, 100000)
+
+
+def truncate_html_soup(html, length=250, ellipsis="…"):
+    """The previous BeautifulSoup implementation, kept as the reference output."""
+    if html is None:
+        return Markup("")
+    try:
+        length = int(length)
+    except (TypeError, ValueError):
+        length = 250
+    if length <= 0:
+        return Markup("")
+
+    soup = BeautifulSoup(str(html), "html.parser")
+    remaining = length
+    truncated = False
+
+    def walk(node):
+        nonlocal remaining, truncated
+        for child in list(getattr(node, "contents", [])):
+            if isinstance(child, Comment):
+                child.extract()
+                continue
+            if truncated:
+                child.extract()
+                continue
+            if isinstance(child, NavigableString):
+                text = str(child)
+                if len(text) <= remaining:
+                    remaining -= len(text)
+                    continue
+                cut = text[:remaining].rstrip()
+                child.replace_with(cut + ellipsis)
+                remaining = 0
+                truncated = True
+                continue
+            walk(child)
+    walk(soup)
+    return Markup("".join(str(child) for child in soup.contents))
+
+
+PROSE = (
+    "Some *emphasis*, some **strong** text & a [link](https://example.com/?a=1&b=2 \"t\") "
+    "with <angle> brackets, \"quotes\" and 'apostrophes' — plus unicode ✓.\n\n"
+)
+LIST = "- first item\n- second *item*\n    - nested `code`\n\n1. one\n2. two\n\n"
+QUOTE = "> A quote with **bold** text\n> over two lines.\n\n"
+CODE = "```python\ndef f(x):\n    return x < 2 and x > 0  # <tag> & co\n```\n\n"
+TABLE = "| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+HEADINGS = "# H1\n\n## H2 with `code`\n\n"
+IMAGE = "![alt \"text\"](/static/img/x.png 'title')\n\n"
+
+
+def _markdown_doc(unit, size):
+    text = ""
+    while len(text) < size:
+        text += unit
+    return str(markdown_safe(text[:size]))
+
+
+def build_corpus():
+    """Return (name, html) pairs of sanitized HTML exercising the truncator."""
+    corpus = [
+        ("prose", _markdown_doc(PROSE, 1500)),
+        ("mixed", _markdown_doc(HEADINGS + PROSE + LIST + QUOTE + CODE + TABLE + IMAGE, 6000)),
+        ("code", _markdown_doc(CODE * 3 + PROSE, 4000)),
+        ("entities", "<p>a &amp; b &lt;c&gt; &quot;d&quot; &#39;e&#39; &copy; &#x2713;</p>"),
+        ("comments", "<p>before<!-- hidden -->after   text that keeps going</p>"),
+        ("voids", '<p>line<br>break<br/>again <img src="a.png" alt="x"> end</p>'),
+        ("attrs", "<a href=\"/x?a=1&amp;b=2\" title='say \"hi\"'>link</a> <a title=\"it's\">q</a>"),
+        ("unclosed", "<p><strong>open tags that never close"),
+        ("stray-close", "<p>text</em> more</p></div>"),
+        ("whitespace", "<p>word       spaced       out</p>\n\n<p>second</p>"),
+        ("empty", ""),
+    ]
+    return corpus
+
+
+def check_regression():
+    """Assert the streaming truncator matches the reference on the corpus."""
+    failures = 0
+    checked = 0
+    for name, html in build_corpus():
+        for length in LENGTHS + tuple(range(0, min(len(html), 400), 7)):
+            expected = truncate_html_soup(html, length)
+            actual = truncate_html(html, length)
+            checked += 1
+            if str(expected) != str(actual):
+                failures += 1
+                print(f"MISMATCH {name} length={length}\n  soup:   {expected!r}\n  stream: {actual!r}")
+    print(f"Regression corpus: {checked} cases, {failures} mismatch(es).")
+    return failures == 0
+
+
+def run_benchmarks(repeat):
+    inputs = [
+        ("1 KB", _markdown_doc(PROSE + LIST, 1024)),
+        ("50 KB", _markdown_doc(HEADINGS + PROSE + LIST + QUOTE + TABLE, 50000)),
+        ("50 KB code-heavy", _markdown_doc(CODE * 4 + PROSE, 50000)),
+    ]
+    print(f"\n{'input':<18} {'html bytes':>10} {'soup (ms)':>10} {'stream (ms)':>12} {'speedup':>8}")
+    for label, html in inputs:
+        soup_s = min(timeit.repeat(lambda: truncate_html_soup(html, 300), number=repeat, repeat=3)) / repeat
+        stream_s = min(timeit.repeat(lambda: truncate_html(html, 300), number=repeat, repeat=3)) / repeat
+        print(f"{label:<18} {len(html):>10} {soup_s * 1000:>10.3f} {stream_s * 1000:>12.3f} {soup_s / stream_s:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark truncate_html against the BeautifulSoup reference.')
+    parser.add_argument('--repeat', type=int, default=50, help='Calls per timing run (default: 50)')
+    args = parser.parse_args()
+
+    if not check_regression():
+        sys.exit(1)
+    run_benchmarks(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic post corpus shared by the benchmark suite.
+
+Bodies are generated deterministically (fixed seed), so every run times the
+same input:
+
+    prose    — a ~4 KB article: paragraphs, emphasis, links, lists, quotes
+    code     — a technical post dominated by fenced code blocks
+    tables   — Markdown tables between short paragraphs
+    gallery  — MAX_GALLERY_IMAGES block [[img:KEY]] tokens with captions
+    max      — a 50,000-character mixed body (the content[:50000] form cap)
+"""
+import io
+import json
+import random
+
+from werkzeug.datastructures import FileStorage, MultiDict
+
+from app.helpers import MAX_GALLERY_IMAGES, GALLERY_BLOCK_TOKEN_RE
+
+SEED = 20240517
+MAX_BODY_LENGTH = 50000
+
+WORDS = (
+    "neural signal ambient texture archive render stream garden circuit memory "
+    "lattice horizon drift tide compile cache latency photon orbit vinyl chorus "
+    "syntax runtime kernel harbor canvas shader river index query vector pixel"
+).split()
+
+CODE_SNIPPETS = [
+    ("python", "def handler_{n}(request):\n    items = [x * {n} for x in range(10) if x % 2]\n"
+               "    return {{'ok': True, 'items': items}}\n"),
+    ("javascript", "function render{n}(el) {{\n  const data = JSON.parse(el.dataset.items || '[]');\n"
+                   "  return data.map((d) => `<li>${{d}}</li>`).join('');\n}}\n"),
+    ("sql", "SELECT id, title FROM posts\nWHERE id > {n}\nORDER BY date_posted DESC\nLIMIT 10;\n"),
+    ("bash", "for f in *.md; do\n  echo \"processing $f ({n})\"\ndone\n"),
+]
+
+LQIP = "data:image/jpeg;base64," + "A" * 600
+
+
+def _sentence(rng, words=12, emphasis=False):
+    picked = [rng.choice(WORDS) for _ in range(words)]
+    if emphasis and words > 6:
+        picked[2] = f"*{picked[2]}*"
+        picked[5] = f"**{picked[5]}**"
+    text = " ".join(picked)
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng, sentences=4):
+    parts = [_sentence(rng, rng.randint(8, 16), emphasis=(i == 1)) for i in range(sentences)]
+    parts.append(f"See [{rng.choice(WORDS)}](https://example.com/{rng.choice(WORDS)}) & `{rng.choice(WORDS)}()`.")
+    return " ".join(parts)
+
+
+def prose_body(rng, size=4000):
+    chunks = []
+    while sum(len(c) for c in chunks) < size:
+        chunks.append(f"## {_sentence(rng, 4)[:-1]}\n\n{_paragraph(rng)}\n\n")
+        chunks.append(f"- {_sentence(rng, 5)}\n- {_sentence(rng, 6)}\n- {_sentence(rng, 4)}\n\n")
+        chunks.append(f"> {_sentence(rng, 10)}\n\n{_paragraph(rng, 3)}\n\n")
+    return "".join(chunks)
+
+
+def code_body(rng, blocks=24):
+    chunks = []
+    for n in range(blocks):
+        lang, template = CODE_SNIPPETS[n % len(CODE_SNIPPETS)]
+        chunks.append(f"### Step {n}\n\n{_paragraph(rng, 2)}\n\n```{lang}\n{template.format(n=n)}```\n\n")
+    return "".join(chunks)
+
+
+def tables_body(rng, tables=12):
+    chunks = []
+    for n in range(tables):
+        rows = "".join(
+            f"| {rng.choice(WORDS)} | {rng.randint(1, 999)} | {_sentence(rng, 4)} |\n" for _ in range(6)
+        )
+        chunks.append(f"{_paragraph(rng, 2)}\n\n| name | count | note |\n|------|------:|------|\n{rows}\n")
+    return "".join(chunks)
+
+
+def gallery_keys(count=MAX_GALLERY_IMAGES):
+    return [f"img{n:02d}" for n in range(count)]
+
+
+def gallery_body(rng, keys):
+    return "".join(f"{_paragraph(rng, 2)}\n\n[[img:{key}]]\n\n" for key in keys)
+
+
+def max_body(rng, keys):
+    units = [
+        lambda: prose_body(rng, 3000),
+        lambda: code_body(rng, 6),
+        lambda: tables_body(rng, 3),
+        lambda: gallery_body(rng, keys[:5]),
+    ]
+    text = ""
+    while len(text) < MAX_BODY_LENGTH:
+        text += rng.choice(units)()
+    # Cut on a block boundary so no fence or token is left dangling.
+    return text[:text.rfind("\n\n", 0, MAX_BODY_LENGTH) + 2]
+
+
+def build_corpus():
+    """Return {name: markdown body} for every corpus entry."""
+    rng = random.Random(SEED)
+    keys = gallery_keys()
+    return {
+        "prose": prose_body(rng),
+        "code": code_body(rng),
+        "tables": tables_body(rng),
+        "gallery": gallery_body(rng, keys),
+        "max": max_body(rng, keys),
+    }
+
+
+def gallery_manifest(body):
+    """A valid (manifest JSON, request.files) pair for every block token in `body`."""
+    keys = GALLERY_BLOCK_TOKEN_RE.findall(body)
+    manifest = {
+        key: {"kind": "new", "caption": f"Caption {key}", "alt_text": f"Alt {key}",
+              "alignment": "center", "position": position}
+        for position, key in enumerate(dict.fromkeys(keys))
+    }
+    files = MultiDict(
+        (f"gallery_{key}", FileStorage(io.BytesIO(b""), filename=f"{key}.jpg")) for key in manifest
+    )
+    return json.dumps(manifest), files
+
+
+def attach_gallery(item, body, image_cls, photos=None):
+    """Attach gallery rows for each block token in `body` to `item`.
+
+    Pass the same `photos` dict for every item saved in one database: Photo
+    filenames are unique, so items sharing a key share the Photo row.
+    """
+    from app.models import Photo
+
+    photos = {} if photos is None else photos
+    for position, key in enumerate(dict.fromkeys(GALLERY_BLOCK_TOKEN_RE.findall(body))):
+        photo = photos.get(key)
+        if photo is None:
+            photo = photos[key] = Photo(filename=f"{key}.jpg", description=f"Photo {key}", lqip=LQIP)
+        item.images.append(image_cls(photo=photo, placeholder_key=key, caption=f"Caption {key}",
+                                     alt_text=f"Alt {key}", alignment="center", position=position))
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Rendering-pipeline benchmark suite with baseline comparison.
+
+Times every rendering helper on each corpus body (see benchmarks/corpus.py)
+and full page renders through the Flask test client against a throwaway
+SQLite database, then optionally writes the results as JSON and/or compares
+them with a stored baseline. A metric counts as a regression when it is more
+than --threshold (default 20%) slower than the baseline and the difference is
+above the noise floor; any regression makes the run exit with status 1.
+
+Helper timings are "cold": the block and highlight caches are cleared before
+every call, so they measure rendering work, not cache hits. Page renders clear
+the view cache before every request for the same reason.
+
+Usage (from Blog/ root):
+    python -m benchmarks.suite                                   # print timings
+    python -m benchmarks.suite --output benchmarks/baseline.json # store a baseline
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+    python -m benchmarks.suite --only markdown_safe --only page
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import timeit
+import warnings
+from datetime import datetime, timezone
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+# Point the app at a scratch database before config.py is read.
+_scratch_dir = tempfile.mkdtemp(prefix='blog-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_scratch_dir, 'bench.db')
+
+from app import create_app
+from app.extensions import db, cache
+from app.helpers import (
+    markdown_safe, render_body, prerender_body, post_excerpt, truncate_html,
+    strip_gallery_tokens_preserve_blocks, validate_gallery_manifest,
+    _markdown_block_cache, _highlight_cache,
+)
+from app.models import Post, PostImage, MusicItem
+from benchmarks.corpus import build_corpus, gallery_manifest, attach_gallery
+
+warnings.filterwarnings('ignore', module='bleach')
+
+DEFAULT_THRESHOLD = 0.20
+# Differences below this many milliseconds are treated as timer noise.
+NOISE_FLOOR_MS = 0.05
+MUSIC_LISTING_SIZE = 20
+
+
+def _clear_render_caches():
+    _markdown_block_cache.clear()
+    _highlight_cache.clear()
+
+
+def time_call(fn, repeat):
+    """Best-of-`repeat` milliseconds per call, with timeit choosing the loop count."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1000
+
+
+def helper_benchmarks(corpus):
+    """Yield (metric name, callable) for each helper on each corpus body."""
+    for name, body in corpus.items():
+        item = Post(title=name, content=body)
+        attach_gallery(item, body, PostImage)
+        prerender_body(item)
+        html = str(markdown_safe(body))
+        manifest_raw, files = gallery_manifest(body)
+
+        def cold_markdown(body=body):
+            _clear_render_caches()
+            return markdown_safe(body)
+
+        def cold_prerender(item=item):
+            _clear_render_caches()
+            item.body_html_key = None
+            return prerender_body(item)
+
+        def live_excerpt(item=item):
+            _clear_render_caches()
+            return post_excerpt(item, 250)
+
+        yield f"markdown_safe/{name}", cold_markdown
+        yield f"prerender_body/{name}", cold_prerender
+        yield f"render_body/{name}", lambda item=item: render_body(item)
+        yield f"post_excerpt_stored/{name}", lambda item=item: post_excerpt(item, 300)
+        yield f"post_excerpt_live/{name}", live_excerpt
+        yield f"truncate_html/{name}", lambda html=html: truncate_html(html, 300)
+        yield f"strip_gallery_tokens_preserve_blocks/{name}", (
+            lambda body=body: strip_gallery_tokens_preserve_blocks(body)
+        )
+        yield f"validate_gallery_manifest/{name}", (
+            lambda item=item, body=body, raw=manifest_raw, files=files:
+                validate_gallery_manifest(item, body, raw, files)
+        )
+
+
+def seed_pages(corpus):
+    """Create one post per corpus body plus a music listing; return page paths."""
+    pages = {}
+    photos = {}
+    for name, body in corpus.items():
+        post = Post(title=f"Bench {name}", content=body)
+        attach_gallery(post, body, PostImage, photos)
+        db.session.add(post)
+        db.session.flush()
+        pages[f"page/post/{name}"] = f"/post/{post.id}"
+    bodies = list(corpus.values())
+    for n in range(MUSIC_LISTING_SIZE):
+        body = bodies[n % len(bodies)]
+        item = MusicItem(title=f"Album {n}", content=body, item_type='album', artist=f"Artist {n}")
+        attach_gallery(item, body, PostImage, photos)
+        db.session.add(item)
+    db.session.flush()
+    pages["page/music"] = "/music"
+    db.session.commit()
+    return pages
+
+
+def page_benchmarks(app, pages):
+    client = app.test_client()
+    for metric, path in pages.items():
+        def get(path=path):
+            cache.clear()
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+            return response
+        yield metric, get
+
+
+def run(repeat, only=()):
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    results = {}
+    corpus = build_corpus()
+
+    def selected(metric):
+        return not only or any(metric.startswith(prefix) for prefix in only)
+
+    with app.app_context():
+        db.create_all()
+        with app.test_request_context('/'):
+            for metric, fn in helper_benchmarks(corpus):
+                if selected(metric):
+                    results[metric] = time_call(fn, repeat)
+                    print(f"{metric:<52} {results[metric]:>10.3f} ms", flush=True)
+        pages = seed_pages(corpus)
+        for metric, fn in page_benchmarks(app, pages):
+            if selected(metric):
+                results[metric] = time_call(fn, repeat)
+                print(f"{metric:<52} {results[metric]:>10.3f} ms", flush=True)
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'markdown_backend': app.config.get('MARKDOWN_BACKEND'),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD, noise_floor_ms=NOISE_FLOOR_MS):
+    """Print a comparison table; return the list of regressed metric names."""
+    regressions = []
+    print(f"\n{'metric':<52} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, base_ms in sorted(baseline['results'].items()):
+        current_ms = current['results'].get(metric)
+        if current_ms is None:
+            continue
+        change = current_ms / base_ms - 1 if base_ms else 0.0
+        regressed = change > threshold and current_ms - base_ms > noise_floor_ms
+        if regressed:
+            regressions.append(metric)
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:<52} {base_ms:>10.3f} {current_ms:>10.3f} {change:>+8.1%}{flag}")
+    missing = sorted(set(baseline['results']) - set(current['results']))
+    if missing and not current['meta'].get('partial'):
+        print(f"\nNot measured in this run: {', '.join(missing)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the rendering pipeline.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per metric, best is kept (default: 5)')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare against a baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before a metric fails (default: 0.20 = 20%%)')
+    parser.add_argument('--only', action='append', default=[], metavar='PREFIX',
+                        help='Only run metrics starting with PREFIX (repeatable)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    current = run(args.repeat, tuple(args.only))
+    current['meta']['partial'] = bool(args.only)
+    print(f"\n{len(current['results'])} metrics in {time.perf_counter() - started:.0f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) more than {args.threshold:.0%} slower than {args.compare}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -80,6 +80,11 @@ else:
         'max_overflow': 5,
     }
 
+# List pages name every relationship their templates touch (the *_loaders()
+# helpers in app/helpers.py). With this on, any other relationship raises
+# instead of lazy-loading once per card; benchmarks/bench_queries.py sets it.
+SQLALCHEMY_RAISELOAD = get_env_var('SQLALCHEMY_RAISELOAD', 'False').lower() in ['true', 'on', '1']
+
 # Session and security settings
 PERMANENT_SESSION_LIFETIME = timedelta(days=1)
 WTF_CSRF_TIME_LIMIT = 3600
@@ -88,6 +93,9 @@ WTF_CSRF_ENABLED = True
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
+# Answer GETs from visitors without a session cookie cookie-free, with
+# Cache-Control: public (see create_app).
+ANONYMOUS_FAST_PATH = get_env_var('ANONYMOUS_FAST_PATH', 'True').lower() in ['true', 'on', '1']
 
 # Email configuration
 MAIL_SERVER = get_env_var('MAIL_SERVER', 'smtp.gmail.com')
@@ -99,10 +107,54 @@ MAIL_DEFAULT_SENDER = get_env_var('MAIL_DEFAULT_SENDER')
 MAIL_RECIPIENT = get_env_var('MAIL_RECIPIENT')
 
 # Flask-Caching configuration
-# SimpleCache stores in-process memory — no external service needed.
-# Suitable for a single-worker Gunicorn deployment.
-CACHE_TYPE = 'SimpleCache'
+# The default backend is in-process memory, bounded by CACHE_MAX_BYTES with LRU
+# eviction, so each Gunicorn worker gets its own cache. With several workers
+# on one host use CACHE_TYPE=app.utils.shared_cache.SharedFileCache: a SQLite
+# file under CACHE_DIR (default instance/cache) shared by all workers, with a
+# small per-worker LRU tier of CACHE_LOCAL_SIZE entries in front of it.
+CACHE_TYPE = get_env_var('CACHE_TYPE', 'app.utils.memory_cache.MemoryBudgetCache')
+CACHE_MAX_BYTES = int(get_env_var('CACHE_MAX_BYTES', 64 * 1024 * 1024))
 CACHE_DEFAULT_TIMEOUT = 300  # 5-minute TTL for cached queries
+CACHE_DIR = get_env_var('CACHE_DIR')
+CACHE_LOCAL_SIZE = int(get_env_var('CACHE_LOCAL_SIZE', 256))
+
+# Cache warm-up (app/warmup.py): each Gunicorn worker re-renders the public
+# pages at boot and after content changes. Pages embed absolute URLs, so the
+# warmer needs the public site URL; until it is set, only warm-ups triggered
+# by an admin's request (which supplies its host) run.
+CACHE_WARMUP = get_env_var('CACHE_WARMUP', 'True').lower() in ['true', 'on', '1']
+CACHE_WARMUP_BASE_URL = get_env_var('CACHE_WARMUP_BASE_URL')
+CACHE_WARMUP_CONCURRENCY = int(get_env_var('CACHE_WARMUP_CONCURRENCY', 2))
+CACHE_WARMUP_API_PAGES = int(get_env_var('CACHE_WARMUP_API_PAGES', 3))
+CACHE_WARMUP_DETAIL_PAGES = int(get_env_var('CACHE_WARMUP_DETAIL_PAGES', 10))
+
+# Scheduled posts (app/publish_scheduler.py): each Gunicorn worker evicts,
+# purges and re-warms the affected lists when a post's published_at arrives.
+PUBLISH_SCHEDULER = get_env_var('PUBLISH_SCHEDULER', 'True').lower() in ['true', 'on', '1']
+
+# CDN purging (app/utils/purge.py): cached pages name their content in
+# Surrogate-Key/Cache-Tag headers and give the CDN their cache lifetime in
+# Surrogate-Control/CDN-Cache-Control, and edits purge those keys through
+# PURGE_BACKEND: 'null', 'http' (POST to PURGE_URL), 'recording' or a dotted
+# class path. PURGE_KEY_FIELD is the JSON field for the keys ('tags' for
+# Cloudflare).
+PURGE_BACKEND = get_env_var('PURGE_BACKEND', 'null')
+PURGE_URL = get_env_var('PURGE_URL')
+PURGE_TOKEN = get_env_var('PURGE_TOKEN')
+PURGE_KEY_FIELD = get_env_var('PURGE_KEY_FIELD', 'keys')
+
+# Metrics (app/metrics.py): request, cache, SQL, template, image and outbound
+# timings, summed across workers through a SQLite file in METRICS_DIR
+# (default instance/metrics). /metrics serves them in Prometheus text format
+# to logged-in admins or to scrapers sending `Authorization: Bearer METRICS_TOKEN`.
+METRICS_ENABLED = get_env_var('METRICS_ENABLED', 'True').lower() in ['true', 'on', '1']
+METRICS_DIR = get_env_var('METRICS_DIR')
+METRICS_TOKEN = get_env_var('METRICS_TOKEN')
+
+# Markdown engine behind markdown_safe(): 'markdown' (Python-Markdown) or
+# 'markdown-it' (markdown-it-py). Stored body HTML is keyed by engine, so
+# switching re-renders rows lazily; run `flask content prerender` to backfill.
+MARKDOWN_BACKEND = get_env_var('MARKDOWN_BACKEND', 'markdown')
 
 #Spotify SDK
 SPOTIFY_CLIENT_ID = os.environ.get('SPOTIFY_CLIENT_ID')
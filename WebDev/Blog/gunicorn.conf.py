@@ -0,0 +1,13 @@
+"""
+Gunicorn settings, read automatically from the working directory:
+    gunicorn wsgi:app
+"""
+
+
+def post_worker_init(worker):
+    """Warm the page caches in each new worker (see app/warmup.py) and start
+    its scheduled-publish thread (see app/publish_scheduler.py)."""
+    from app.warmup import start_warmup
+    from app.publish_scheduler import start_publish_scheduler
+    start_warmup(worker.wsgi)
+    start_publish_scheduler(worker.wsgi)
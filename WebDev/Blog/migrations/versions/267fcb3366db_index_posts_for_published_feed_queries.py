@@ -0,0 +1,53 @@
+"""Index posts for the published-feed queries
+
+Revision ID: 267fcb3366db
+Revises: f2a6d8c4b193
+Create Date: 2026-10-17 19:05:31.640217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '267fcb3366db'
+down_revision = 'f2a6d8c4b193'
+branch_labels = None
+depends_on = None
+
+SCHEDULED = sa.text('published_at IS NOT NULL')
+
+
+def _recreate():
+    # SQLite can only add a stored generated column by rebuilding the table.
+    return 'always' if op.get_context().dialect.name == 'sqlite' else 'auto'
+
+
+def upgrade():
+    # effective_published_at turns "published_at IS NULL OR published_at <= now"
+    # into one range test, carried at the end of the feed indexes; they replace
+    # the date_posted and type indexes they start with. The published_at index
+    # shrinks to the scheduled posts, the only rows ever looked up by it.
+    with op.batch_alter_table('posts', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.add_column(sa.Column(
+            'effective_published_at', sa.DateTime(timezone=True),
+            sa.Computed('coalesce(published_at, date_posted)', persisted=True), nullable=False,
+        ))
+        batch_op.create_index('ix_posts_feed', ['date_posted', 'id', 'effective_published_at'], unique=False)
+        batch_op.create_index('ix_posts_type_feed', ['type', 'date_posted', 'id', 'effective_published_at'], unique=False)
+        batch_op.create_index('ix_posts_scheduled', ['published_at', 'type'], unique=False,
+                              postgresql_where=SCHEDULED, sqlite_where=SCHEDULED)
+        batch_op.drop_index(batch_op.f('ix_posts_date_posted_id'))
+        batch_op.drop_index(batch_op.f('ix_posts_type'))
+        batch_op.drop_index(batch_op.f('ix_posts_published_at'))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None, recreate=_recreate()) as batch_op:
+        batch_op.create_index(batch_op.f('ix_posts_published_at'), ['published_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posts_type'), ['type'], unique=False)
+        batch_op.create_index(batch_op.f('ix_posts_date_posted_id'), ['date_posted', 'id'], unique=False)
+        batch_op.drop_index('ix_posts_scheduled')
+        batch_op.drop_index('ix_posts_type_feed')
+        batch_op.drop_index('ix_posts_feed')
+        batch_op.drop_column('effective_published_at')
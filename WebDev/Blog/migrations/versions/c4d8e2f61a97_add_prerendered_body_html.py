@@ -0,0 +1,38 @@
+"""Add pre-rendered body_html to posts and projects
+
+Revision ID: c4d8e2f61a97
+Revises: b7e3c9a1d4f2
+Create Date: 2026-10-17 09:12:44.512031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e2f61a97'
+down_revision = 'b7e3c9a1d4f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows start empty and render live until saved again or backfilled
+    # with `flask content prerender`.
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('body_html_key', sa.String(length=80), nullable=True))
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('body_html_key', sa.String(length=80), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('body_html_key')
+        batch_op.drop_column('body_html')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('body_html_key')
+        batch_op.drop_column('body_html')
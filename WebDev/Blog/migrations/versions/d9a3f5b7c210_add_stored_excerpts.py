@@ -0,0 +1,34 @@
+"""Add stored card excerpts to posts and projects
+
+Revision ID: d9a3f5b7c210
+Revises: c4d8e2f61a97
+Create Date: 2026-10-17 10:03:18.220417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3f5b7c210'
+down_revision = 'c4d8e2f61a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows render excerpts live until saved again or backfilled with
+    # `flask content prerender`.
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt_html', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt_html', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('excerpt_html')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('excerpt_html')
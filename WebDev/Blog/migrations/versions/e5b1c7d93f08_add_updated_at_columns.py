@@ -0,0 +1,40 @@
+"""Add updated_at to posts, projects and photos
+
+Revision ID: e5b1c7d93f08
+Revises: d9a3f5b7c210
+Create Date: 2026-10-17 13:41:05.918274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1c7d93f08'
+down_revision = 'd9a3f5b7c210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Added nullable, backfilled, then tightened: existing posts and projects
+    # start at their date_posted, photos (no date column) at migration time.
+    for table in ('posts', 'projects', 'photos'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("UPDATE posts SET updated_at = COALESCE(date_posted, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE projects SET updated_at = COALESCE(date_posted, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE photos SET updated_at = CURRENT_TIMESTAMP")
+
+    for table in ('posts', 'projects', 'photos'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    for table in ('photos', 'projects', 'posts'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_updated_at'))
+            batch_op.drop_column('updated_at')
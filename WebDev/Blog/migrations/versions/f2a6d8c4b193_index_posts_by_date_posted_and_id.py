@@ -0,0 +1,30 @@
+"""Index posts by (date_posted, id) for keyset pagination
+
+Revision ID: f2a6d8c4b193
+Revises: e5b1c7d93f08
+Create Date: 2026-10-17 16:12:47.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6d8c4b193'
+down_revision = 'e5b1c7d93f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The composite index also serves every date_posted-only lookup, so it
+    # replaces the single-column one instead of adding to each write.
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_posts_date_posted_id'), ['date_posted', 'id'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_posts_date_posted'))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_posts_date_posted'), ['date_posted'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_posts_date_posted_id'))
@@ -0,0 +1,59 @@
+/**
+ * Lazy CSRF tokens for public forms (contact, login).
+ *
+ * Pages for anonymous visitors are rendered without a session so they carry
+ * no cookie and can be cached publicly. Their forms hold an empty
+ * <input name="csrf_token" data-csrf-lazy>; the first time a form is used
+ * this fetches a token from /csrf-token (which starts the session) and fills
+ * it in, holding back submission until it has.
+ */
+(function () {
+    'use strict';
+
+    var pending = null;
+
+    function fetchToken() {
+        if (!pending) {
+            pending = fetch('/csrf-token', { credentials: 'same-origin', cache: 'no-store' })
+                .then(function (response) {
+                    if (!response.ok) {
+                        throw new Error('CSRF token request responded ' + response.status);
+                    }
+                    return response.json();
+                })
+                .then(function (data) { return data.csrf_token; })
+                .catch(function (error) {
+                    pending = null;
+                    throw error;
+                });
+        }
+        return pending;
+    }
+
+    function lazyInput(form) {
+        return form && form.querySelector ? form.querySelector('input[data-csrf-lazy]') : null;
+    }
+
+    function fill(input) {
+        return fetchToken().then(function (token) { input.value = token; });
+    }
+
+    // Start fetching as soon as someone begins filling a form in.
+    document.addEventListener('focusin', function (event) {
+        var input = lazyInput(event.target.form);
+        if (input && !input.value) {
+            fill(input).catch(function (error) { console.warn(error); });
+        }
+    });
+
+    document.addEventListener('submit', function (event) {
+        var form = event.target;
+        var input = lazyInput(form);
+        if (!input || input.value) return;
+
+        event.preventDefault();
+        // form.submit() skips this listener; without a token the server
+        // answers with its usual "form expired" message.
+        fill(input).then(function () { form.submit(); }, function () { form.submit(); });
+    });
+})();
@@ -168,7 +168,9 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
+        // Posts shown so far; /api/posts continues from `cursor` (its next_cursor).
         let offset = 0;
+        let cursor = null;
         const limit = 10;
 
         let loading = false;
@@ -347,17 +349,81 @@ document.addEventListener('DOMContentLoaded', function() {
             }, 120);
         }
 
+        function appendPosts(data) {
+            const existingError = postsContainer.querySelector('.error-msg');
+
+            if (existingError && existingError.parentNode) {
+                existingError.parentNode.removeChild(existingError);
+            }
+
+            data.posts.forEach(function(post, idx) {
+                const article = document.createElement('article');
+                article.className = 'post-card fade-in';
+
+                let imageTag = '';
+
+                if (post.photo_filename) {
+                    const thumbClass = post.photo_is_inline_fallback
+                        ? 'post-thumb inline-fallback-thumb'
+                        : 'post-thumb';
+
+                    if (window.USING_SPACES === true && window.SPACES_URL) {
+                        imageTag = `<a href="/post/${post.id}" class="post-image-link"><img src="${window.SPACES_URL}/thumbnail/${post.photo_filename}" alt="${post.title}" class="${thumbClass}"></a>`;
+                    } else {
+                        imageTag = `<a href="/post/${post.id}" class="post-image-link"><img src="/static/images/thumbnail/${post.photo_filename}" alt="${post.title}" class="${thumbClass}"></a>`;
+                    }
+                }
+
+                article.innerHTML = `
+                    <h2><a href="/post/${post.id}">${post.title}</a></h2>
+                    ${imageTag}
+                    <div class="post-excerpt">${post.content}</div>
+                    <div class="post-footer">
+                        <a href="/post/${post.id}" class="read-more-link">Read More <i class="fa-solid fa-angles-right"></i></a>
+                        ${post.github_link ? `<a href="${post.github_link}" target="_blank" class="github-link"><i class="fa-brands fa-github"></i> View on GitHub</a>` : ''}
+                    </div>`;
+
+                postsContainer.appendChild(article);
+
+                setTimeout(function() {
+                    article.classList.add('visible');
+                }, 50 * idx);
+            });
+
+            offset += data.posts.length;
+            cursor = data.next_cursor || null;
+
+            hasNext = !!data.has_next && cursor !== null;
+
+            if (!hasNext) {
+                console.log('Infinite Scroll: No more posts after this batch.');
+                showEndOfPostsMessage();
+            }
+        }
+
+        function nextPageUrl() {
+            if (cursor) {
+                return `/api/posts?cursor=${encodeURIComponent(cursor)}&limit=${limit}`;
+            }
+            // Posts rendered into the page have no cursor: fall back to offset once.
+            if (offset > 0) {
+                return `/api/posts?offset=${offset}&limit=${limit}`;
+            }
+            return `/api/posts?limit=${limit}`;
+        }
+
         async function loadPosts() {
             if (!hasNext || loading) return;
 
-            console.log(`Infinite Scroll: Loading posts from offset ${offset}`);
+            const url = nextPageUrl();
+            console.log(`Infinite Scroll: Loading posts from ${url}`);
 
             loading = true;
             showLoader();
             startLoaderTimeout();
 
             try {
-                const response = await fetch(`/api/posts?offset=${offset}&limit=${limit}`);
+                const response = await fetch(url);
 
                 if (loaderTimeoutId) {
                     clearTimeout(loaderTimeoutId);
@@ -370,7 +436,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     });
 
                     console.error(
-                        `Infinite Scroll: /api/posts?offset=${offset}&limit=${limit} responded ${response.status}.`,
+                        `Infinite Scroll: ${url} responded ${response.status}.`,
                         body.slice(0, 500)
                     );
 
@@ -379,63 +445,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
                 const data = await response.json();
 
-                console.log(`Infinite Scroll: API response for offset ${offset}:`, data);
+                console.log(`Infinite Scroll: API response for ${url}:`, data);
 
                 if (data.posts && data.posts.length > 0) {
-                    const existingError = postsContainer.querySelector('.error-msg');
-
-                    if (existingError && existingError.parentNode) {
-                        existingError.parentNode.removeChild(existingError);
-                    }
-
-                    data.posts.forEach(function(post, idx) {
-                        const article = document.createElement('article');
-                        article.className = 'post-card fade-in';
-
-                        let imageTag = '';
-
-                        if (post.photo_filename) {
-                            const thumbClass = post.photo_is_inline_fallback
-                                ? 'post-thumb inline-fallback-thumb'
-                                : 'post-thumb';
-
-                            if (window.USING_SPACES === true && window.SPACES_URL) {
-                                imageTag = `<a href="/post/${post.id}" class="post-image-link"><img src="${window.SPACES_URL}/thumbnail/${post.photo_filename}" alt="${post.title}" class="${thumbClass}"></a>`;
-                            } else {
-                                imageTag = `<a href="/post/${post.id}" class="post-image-link"><img src="/static/images/thumbnail/${post.photo_filename}" alt="${post.title}" class="${thumbClass}"></a>`;
-                            }
-                        }
-
-                        article.innerHTML = `
-                            <h2><a href="/post/${post.id}">${post.title}</a></h2>
-                            ${imageTag}
-                            <div class="post-excerpt">${post.content}</div>
-                            <div class="post-footer">
-                                <a href="/post/${post.id}" class="read-more-link">Read More <i class="fa-solid fa-angles-right"></i></a>
-                                ${post.github_link ? `<a href="${post.github_link}" target="_blank" class="github-link"><i class="fa-brands fa-github"></i> View on GitHub</a>` : ''}
-                            </div>`;
-
-                        postsContainer.appendChild(article);
-
-                        setTimeout(function() {
-                            article.classList.add('visible');
-                        }, 50 * idx);
-                    });
-
-                    offset = Number.isInteger(data.next_offset)
-                        ? data.next_offset
-                        : offset + data.posts.length;
-
-                    hasNext = !!data.has_next;
-
-                    if (!hasNext) {
-                        console.log('Infinite Scroll: No more posts after this batch.');
-                        showEndOfPostsMessage();
-                    }
+                    appendPosts(data);
                 } else {
                     hasNext = false;
 
-                    console.log('Infinite Scroll: API returned no posts for this offset.');
+                    console.log('Infinite Scroll: API returned no more posts.');
 
                     if (offset === 0) {
                         if (!postsContainer.querySelector('.no-posts-msg')) {
@@ -499,14 +516,22 @@ document.addEventListener('DOMContentLoaded', function() {
         window.addEventListener('resize', scheduleLoadCheck);
         window.addEventListener('pageshow', scheduleLoadCheck);
 
+        const firstPage = document.getElementById('feed-first-page');
         const initialPostElements = postsContainer.querySelectorAll('article');
         offset = initialPostElements.length;
 
-        if (initialPostElements.length === 0 && window.location.pathname === '/') {
-            console.log('Infinite Scroll: No initial posts on home page. Loading from offset 0.');
+        if (firstPage) {
+            // The index embeds its first /api/posts page (see main.index()).
+            console.log('Infinite Scroll: Rendering the inline first page.');
+            appendPosts(JSON.parse(firstPage.textContent));
+            if (hasNext) {
+                requestAnimationFrame(maybeLoadMore);
+            }
+        } else if (initialPostElements.length === 0 && window.location.pathname === '/') {
+            console.log('Infinite Scroll: No initial posts on home page. Loading the first page.');
             loadPosts();
         } else if (initialPostElements.length > 0) {
-            console.log(`Infinite Scroll: ${initialPostElements.length} initial posts found. Loading from offset ${offset}.`);
+            console.log(`Infinite Scroll: ${initialPostElements.length} initial posts found. Loading the posts after them.`);
             requestAnimationFrame(maybeLoadMore);
         }
     }